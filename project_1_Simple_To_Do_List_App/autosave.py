@@ -0,0 +1,95 @@
+"""
+Debounced background autosave for the To-Do app.
+
+The task manager calls notify() after every change. A background thread
+waits until no change has arrived for `delay` seconds and then saves once,
+so a burst of changes costs a single write. `max_delay` caps how long a
+steady stream of changes can postpone the save. save_soon() skips the
+wait, e.g. when the journal is due for compaction.
+"""
+import threading
+import time
+
+DELAY = 2.0
+MAX_DELAY = 10.0
+
+
+class AutoSaver:
+    """Background thread that saves once changes have gone quiet."""
+
+    def __init__(self, save, delay=DELAY, max_delay=MAX_DELAY):
+        """
+        Initializes the autosaver; call start() to launch its thread.
+
+        args:
+            save: zero-argument callable that writes the data.
+            delay: quiet period, in seconds, after the last change.
+            max_delay: longest time, in seconds, a change may stay unsaved.
+        """
+        self.save = save
+        self.delay = delay
+        self.max_delay = max_delay
+        self.saves = 0
+        self._condition = threading.Condition()
+        self._first_change = None
+        self._last_change = None
+        self._urgent = False
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+
+    def start(self):
+        """Starts the background thread and returns the autosaver."""
+        self._thread.start()
+        return self
+
+    def notify(self):
+        """Records that the data changed."""
+        now = time.monotonic()
+        with self._condition:
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._condition.notify()
+
+    def save_soon(self):
+        """Asks for a save now rather than once changes go quiet."""
+        with self._condition:
+            if self._first_change is None:
+                self._first_change = self._last_change = time.monotonic()
+            self._urgent = True
+            self._condition.notify()
+
+    def _run(self):
+        """Waits for changes to go quiet, then saves; repeats until stopped."""
+        with self._condition:
+            while True:
+                if self._first_change is None:
+                    if self._stopped:
+                        return
+                    self._condition.wait()
+                    continue
+                due = min(self._last_change + self.delay, self._first_change + self.max_delay)
+                remaining = due - time.monotonic()
+                if remaining > 0 and not self._stopped and not self._urgent:
+                    self._condition.wait(remaining)
+                    continue
+
+                self._first_change = self._last_change = None
+                self._urgent = False
+                # Changes arriving during the save start a new quiet period.
+                self._condition.release()
+                try:
+                    self.save()
+                except Exception as error:
+                    print(f"Warning: Autosave failed: {error}")
+                finally:
+                    self._condition.acquire()
+                self.saves += 1
+
+    def stop(self):
+        """Saves any pending change and stops the background thread."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread.is_alive():
+            self._thread.join()
@@ -0,0 +1,193 @@
+"""
+Project 1 - E: Benchmark suite for simpleToDoList.py
+Project Description: Generates task lists of 10k, 100k and 1M tasks and
+times the task manager's main operations on each: loading (without and
+with the startup cache), add_task, delete_task, mark_as_complete,
+list_tasks and data_persistence, with the journal enabled as in the app.
+Each size runs in a fresh process so its peak memory can be reported.
+Results are written as JSON, and a previous results file can be given to
+flag regressions. Run with:
+python benchmark_suite.py [--sizes N ...] [--output FILE] [--compare FILE]
+"""
+
+import argparse
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from simpleToDoList import App, Task, TaskManager
+from snapshot_cache import SnapshotCache
+from task_journal import TaskJournal
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak memory is then not reported.
+    resource = None
+
+SIZES = (10_000, 100_000, 1_000_000)
+OPERATIONS = 200
+TOLERANCE = 0.25
+
+
+def write_tasks(filename, count, seed=0):
+    """Writes a To_Do_List.json with `count` tasks, about a quarter of them complete."""
+    rng = random.Random(seed)
+    tasks = []
+    for task_id in range(1, count + 1):
+        task = Task(f"task {task_id} {rng.choice(('buy', 'call', 'pay', 'fix'))} item {rng.randrange(1000)}", task_id)
+        task._complete = rng.random() < 0.25
+        tasks.append(task)
+    with open(filename, 'w') as json_file:
+        TaskManager.write_json(json_file, tasks)
+
+
+def peak_memory_bytes():
+    """Returns this process's peak resident set size in bytes, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def time_operation(operation, count=1):
+    """Runs operation(i) for i in range(count) and returns {'seconds', 'count'}."""
+    start = time.perf_counter()
+    for i in range(count):
+        operation(i)
+    return {'seconds': time.perf_counter() - start, 'count': count}
+
+
+def run_size(count, operations=OPERATIONS, seed=0):
+    """
+    Benchmarks every operation on a freshly generated `count`-task list.
+
+    returns:
+        dict: 'metrics' maps each operation to its total seconds and the
+            number of times it ran; 'peak_memory_bytes' is the process's
+            peak resident set size.
+    """
+    rng = random.Random(seed)
+    metrics = {}
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'To_Do_List.json')
+        journal_file = os.path.join(directory, 'To_Do_List.journal')
+        write_tasks(filename, count, seed)
+
+        managers = []
+
+        def load(_):
+            managers.append(App(filename, TaskJournal(journal_file)).task_manager)
+
+        cache_filename = SnapshotCache(filename).cache_filename
+        if os.path.exists(cache_filename):
+            os.remove(cache_filename)
+        metrics['load_cold'] = time_operation(load)
+        managers.pop().journal.close()
+        metrics['load_warm'] = time_operation(load)
+        manager = managers.pop()
+
+        metrics['add_task'] = time_operation(lambda i: manager.add_task(Task(f"new task {i}")), operations)
+        size = len(manager.task_index)
+        positions = [rng.randrange(size - operations) for _ in range(operations)]
+        metrics['mark_as_complete'] = time_operation(lambda i: manager.mark_as_complete(positions[i]), operations)
+        metrics['delete_task'] = time_operation(lambda i: manager.delete_task(positions[i]), operations)
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            metrics['list_tasks'] = time_operation(lambda _: manager.list_tasks())
+        metrics['data_persistence'] = time_operation(lambda _: manager.data_persistence())
+        manager.journal.close()
+    return {'metrics': metrics, 'peak_memory_bytes': peak_memory_bytes()}
+
+
+def run_suite(sizes, operations=OPERATIONS):
+    """
+    Runs run_size() for each size in a child process of its own, so peak
+    memory is per size and earlier sizes do not warm later ones.
+
+    returns:
+        dict: environment details and the results keyed by size.
+    """
+    results = {}
+    for count in sizes:
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', str(count),
+                                '--operations', str(operations)],
+                               check=True, stdout=subprocess.PIPE, text=True)
+        results[str(count)] = json.loads(child.stdout)
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'operations': operations,
+        'results': results,
+    }
+
+
+def compare(baseline, current, tolerance=TOLERANCE):
+    """
+    Lists the metrics present in both result sets whose time per run grew
+    by more than `tolerance` (0.25 = 25%).
+
+    returns:
+        list of (size, metric, baseline seconds per run, current seconds per run).
+    """
+    regressions = []
+    for size, result in current['results'].items():
+        old_metrics = baseline['results'].get(size, {}).get('metrics', {})
+        for name, metric in result['metrics'].items():
+            if name not in old_metrics:
+                continue
+            old = old_metrics[name]['seconds'] / old_metrics[name]['count']
+            new = metric['seconds'] / metric['count']
+            if new > old * (1 + tolerance):
+                regressions.append((size, name, old, new))
+    return regressions
+
+
+if __name__ == "__main__":
+    """ main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="list sizes to benchmark")
+    parser.add_argument('--operations', type=int, default=OPERATIONS,
+                        help="how many adds, deletes and completions to time per size")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', metavar='FILE', help="results of an earlier run to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="slowdown allowed before a metric counts as a regression (0.25 = 25%%)")
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        # The app's own messages would corrupt the JSON sent to the parent.
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            result = run_size(args.worker, args.operations)
+        json.dump(result, sys.stdout)
+        sys.exit()
+
+    suite = run_suite(args.sizes, args.operations)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(suite, output_file, indent=2)
+
+    for size, result in suite['results'].items():
+        peak = result['peak_memory_bytes']
+        print(f"{int(size):,} tasks (peak memory {'n/a' if peak is None else f'{peak / 2**20:.1f} MiB'}):")
+        for name, metric in result['metrics'].items():
+            per_run = metric['seconds'] / metric['count']
+            print(f"  {name:<18} {per_run * 1000:10.3f} ms per run  ({metric['count']} runs)")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(json.load(baseline_file), suite, args.tolerance)
+        for size, name, old, new in regressions:
+            print(f"Regression at {int(size):,} tasks: {name} {old * 1000:.3f} ms -> {new * 1000:.3f} ms")
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
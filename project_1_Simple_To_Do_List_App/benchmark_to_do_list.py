@@ -0,0 +1,311 @@
+"""
+Project 1 - C: Benchmarks for simpleToDoList.py
+Project Description: Measures how much memory the task manager needs per
+task, what loading a task file costs, how long the app takes to start
+with and without its startup cache, how fast searches, next-due
+queries and sorted listings are and how many saves per second concurrent writers get. Run with:
+python benchmark_to_do_list.py [--tasks N]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from unittest import mock
+
+from simpleToDoList import App, Task, TaskManager
+from snapshot_cache import SnapshotCache
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'simpleToDoList.py')
+
+
+class PlainTask:
+    """The original Task layout (per-instance __dict__, string status), for comparison."""
+
+    def __init__(self, description):
+        """Initializes description and status."""
+        self._description = description
+        self._status = 'Incomplete'
+
+
+def measure_bytes(build):
+    """
+    Returns the number of bytes still allocated by build() once it returns.
+
+    args:
+        build: zero-argument callable; its return value is kept alive
+            while measuring.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def benchmark_memory(count):
+    """
+    Measures bytes per task for `count` tasks. Descriptions are created
+    up front so only the task representation is measured.
+
+    returns:
+        dict: bytes per task for each representation.
+    """
+    descriptions = [f"task {i}" for i in range(count)]
+    results = {
+        'plain_task': measure_bytes(lambda: [PlainTask(d) for d in descriptions]),
+        'slotted_task': measure_bytes(lambda: [Task(d) for d in descriptions]),
+        'task_manager': measure_bytes(lambda: TaskManager([Task(d) for d in descriptions])),
+    }
+    return {name: total / count for name, total in results.items()}
+
+
+def write_task_file(filename, count):
+    """Writes a To_Do_List.json-style file with `count` tasks."""
+    with open(filename, 'w') as json_file:
+        tasks = [Task(f"task {i}", i + 1).to_dict() for i in range(count)]
+        json.dump(tasks, json_file, indent=5)
+
+
+def benchmark_load(count):
+    """
+    Times loading a `count`-task file and records peak traced memory, for
+    the streaming loader and for the old json.load() approach.
+
+    returns:
+        dict: seconds and peak bytes for each loader.
+    """
+    def load_with_json_load(filename):
+        """The original loader: decode the whole file, then build every task."""
+        with open(filename) as json_file:
+            return TaskManager([Task.from_dict(d) for d in json.load(json_file)])
+
+    def load_with_app(filename):
+        """The streaming loader used by App."""
+        with mock.patch('builtins.print'):
+            return App(filename).task_manager
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'To_Do_List.json')
+        write_task_file(filename, count)
+        for name, loader in (('json_load', load_with_json_load), ('streaming', load_with_app)):
+            gc.collect()
+            tracemalloc.start()
+            start = time.perf_counter()
+            manager = loader(filename)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            del manager
+            results[name] = {'seconds': elapsed, 'peak_bytes': peak}
+    return results
+
+
+def benchmark_startup(count, runs=3):
+    """
+    Times starting the app on a `count`-task file: a bare interpreter, the
+    import of simpleToDoList, and a whole `simpleToDoList.py ls 0 0`
+    process (load, list nothing, exit) without the startup cache (cold)
+    and with it (warm). Each figure is the best of `runs`.
+
+    returns:
+        dict: seconds for each measurement.
+    """
+    def best_time(command, directory, before=None):
+        times = []
+        for _ in range(runs):
+            if before is not None:
+                before()
+            start = time.perf_counter()
+            subprocess.run(command, cwd=directory, check=True, stdout=subprocess.DEVNULL)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'To_Do_List.json')
+        write_task_file(filename, count)
+        cache_filename = SnapshotCache(filename).cache_filename
+
+        def drop_cache():
+            if os.path.exists(cache_filename):
+                os.remove(cache_filename)
+
+        app = [sys.executable, APP_SCRIPT, 'ls', '0', '0']
+        return {
+            'interpreter': best_time([sys.executable, '-c', 'pass'], directory),
+            'import': best_time([sys.executable, '-c', 'import simpleToDoList'],
+                                os.path.dirname(APP_SCRIPT)),
+            'cold_start': best_time(app, directory, drop_cache),
+            # The last cold run left a fresh cache behind.
+            'warm_start': best_time(app, directory),
+        }
+
+
+def benchmark_search(count, queries=200):
+    """
+    Builds a search index over `count` generated tasks and times queries.
+
+    returns:
+        dict: index build seconds and mean milliseconds per query type.
+    """
+    words = [f"word{i}" for i in range(5000)]
+    chooser = random.Random(0)
+    manager = TaskManager([Task(' '.join(chooser.sample(words, 4))) for _ in range(count)])
+
+    start = time.perf_counter()
+    manager.search_index
+    results = {'build_seconds': time.perf_counter() - start}
+    query_types = {
+        'one_term_ms': lambda: chooser.choice(words),
+        'two_terms_ms': lambda: ' '.join(chooser.sample(words, 2)),
+        'prefix_and_term_ms': lambda: f"{chooser.choice(words)} {chooser.choice(words)[:7]}*",
+    }
+    for name, make_query in query_types.items():
+        batch = [make_query() for _ in range(queries)]
+        start = time.perf_counter()
+        for query in batch:
+            manager.search_index.search(query)
+        results[name] = (time.perf_counter() - start) / queries * 1000
+    return results
+
+
+def benchmark_next_due(count, queries=200):
+    """
+    Gives `count` generated tasks random due dates and priorities, then
+    times "next 10 due" through the heap queue against sorting every task,
+    with a share of the queued tasks completed in between.
+
+    returns:
+        dict: queue build seconds and milliseconds per query.
+    """
+    chooser = random.Random(0)
+    tasks = [Task(f"task {i}", priority=chooser.choice([None, 1, 2, 3]),
+                  due=f"2026-{chooser.randint(1, 12):02d}-{chooser.randint(1, 28):02d}") for i in range(count)]
+    manager = TaskManager(tasks)
+
+    start = time.perf_counter()
+    manager.due_queue
+    results = {'build_seconds': time.perf_counter() - start}
+    start = time.perf_counter()
+    for _ in range(queries):
+        # Completing the first task due leaves a stale entry at the front.
+        manager.mark_as_complete_by_id(manager.next_due(10)[0]._id)
+    results['heap_next_10_ms'] = (time.perf_counter() - start) / queries * 1000
+
+    start = time.perf_counter()
+    for _ in range(3):
+        sorted((task for task in manager.task_index.values() if task._due and not task._complete),
+               key=lambda task: (task._due, task._priority or float('inf')))[:10]
+    results['sort_next_10_ms'] = (time.perf_counter() - start) / 3 * 1000
+    return results
+
+
+def benchmark_sorted_views(count, queries=200):
+    """
+    Builds the sorted views over `count` generated tasks, then times
+    completing a task followed by listing the first 10 by description from
+    a random point, against sorting every task for the same page.
+
+    returns:
+        dict: views build seconds and milliseconds per query.
+    """
+    chooser = random.Random(0)
+    manager = TaskManager([Task(f"task {chooser.randrange(count * 10)}") for _ in range(count)])
+
+    start = time.perf_counter()
+    manager.sorted_views
+    results = {'build_seconds': time.perf_counter() - start}
+    start = time.perf_counter()
+    for _ in range(queries):
+        manager.mark_as_complete_by_id(chooser.randrange(1, count + 1))
+        manager.sorted_tasks('description', f"task {chooser.randrange(count * 10)}", limit=10)
+    results['views_page_10_ms'] = (time.perf_counter() - start) / queries * 1000
+
+    start = time.perf_counter()
+    for _ in range(3):
+        low = f"task {chooser.randrange(count * 10)}"
+        sorted((task for task in manager.task_index.values() if task._description.casefold() >= low),
+               key=lambda task: (task._description.casefold(), task._id))[:10]
+    results['sort_page_10_ms'] = (time.perf_counter() - start) / 3 * 1000
+    return results
+
+
+def benchmark_save(count, threads=8, saves_per_thread=20):
+    """
+    Has `threads` writers each add a task and save, `saves_per_thread`
+    times, on a `count`-task list. Runs once with group commit and once
+    with every request running its own write and fsync.
+
+    returns:
+        dict: saves per second and number of commits run for each mode.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ('group_commit', 'commit_per_save'):
+            filename = os.path.join(directory, f'{mode}.json')
+            manager = TaskManager([Task(f"task {i}") for i in range(count)], filename)
+            save = manager.data_persistence if mode == 'group_commit' else manager._write_snapshot
+
+            def writer():
+                for _ in range(saves_per_thread):
+                    manager.add_task(Task("new task"))
+                    save()
+
+            workers = [threading.Thread(target=writer) for _ in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+            requests = threads * saves_per_thread
+            commits = manager.committer.commits if mode == 'group_commit' else requests
+            results[mode] = {'saves_per_second': requests / elapsed, 'commits': commits}
+    return results
+
+
+if __name__ == "__main__":
+    """ main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=1_000_000, help="number of tasks to create")
+    args = parser.parse_args()
+
+    print(f"Bytes per task at {args.tasks:,} tasks:")
+    for name, bytes_per_task in benchmark_memory(args.tasks).items():
+        print(f"  {name:<14} {bytes_per_task:8.1f}")
+
+    print(f"Loading a {args.tasks:,}-task file:")
+    for name, result in benchmark_load(args.tasks).items():
+        print(f"  {name:<14} {result['seconds']:8.2f} s  peak {result['peak_bytes'] / 2**20:8.1f} MiB")
+
+    print(f"Starting the app on a {args.tasks:,}-task file (best of 3):")
+    for name, seconds in benchmark_startup(args.tasks).items():
+        print(f"  {name:<14} {seconds:8.3f} s")
+
+    save_tasks = min(args.tasks, 10_000)
+    print(f"Concurrent saves of a {save_tasks:,}-task list (8 threads x 20 saves):")
+    for name, result in benchmark_save(save_tasks).items():
+        print(f"  {name:<16} {result['saves_per_second']:8.1f} saves/s  {result['commits']:4d} commits")
+
+    print(f"Searching {args.tasks:,} tasks:")
+    for name, value in benchmark_search(args.tasks).items():
+        print(f"  {name:<20} {value:8.3f}")
+
+    print(f"Next 10 due among {args.tasks:,} tasks:")
+    for name, value in benchmark_next_due(args.tasks).items():
+        print(f"  {name:<20} {value:8.3f}")
+
+    print(f"First 10 by description among {args.tasks:,} tasks:")
+    for name, value in benchmark_sorted_views(args.tasks).items():
+        print(f"  {name:<20} {value:8.3f}")
@@ -0,0 +1,203 @@
+"""
+Binary, memory-mapped task file for the To-Do app.
+
+Layout (all integers little-endian):
+
+    header        magic b'TDLB', version, record count, deleted count,
+                  offset table capacity, offset table position
+    records       flags (u8: 1 = complete, 2 = deleted), task ID (u64),
+                  description length (u32), UTF-8 description
+    offset table  one u64 file position per record slot
+
+Completing or deleting a task rewrites its one flags byte in place and
+adding a task appends a record, so saving costs the size of the change.
+The offset table has spare capacity and moves to the end of the file with
+double the room when it fills up. rewrite() drops deleted records and
+stale tables.
+"""
+import mmap
+import os
+import struct
+from array import array
+
+BINARY_FILE = 'To_Do_List.bin'
+MAGIC = b'TDLB'
+VERSION = 1
+HEADER = struct.Struct('<4sHxxQQQQ')
+RECORD = struct.Struct('<BQI')
+OFFSET = struct.Struct('<Q')
+COMPLETE = 0x01
+DELETED = 0x02
+INITIAL_CAPACITY = 1024
+
+
+class BinaryTaskStore:
+    """Task records in a binary file, read through mmap and updated in place."""
+
+    def __init__(self, filename=BINARY_FILE):
+        """
+        Opens the store, creating an empty one if the file does not exist.
+
+        args:
+            filename: path of the binary task file.
+        """
+        self.filename = filename
+        if not os.path.exists(filename) or os.path.getsize(filename) == 0:
+            self._write_file(filename, ())
+        self._open()
+
+    def _open(self):
+        """Opens the file and reads its header."""
+        self._file = open(self.filename, 'r+b')
+        self._map = None
+        header = self._file.read(HEADER.size)
+        if len(header) == HEADER.size:
+            magic, version, self.count, self.deleted, self.capacity, self.table_offset = HEADER.unpack(header)
+        if len(header) != HEADER.size or magic != MAGIC or version != VERSION:
+            self._file.close()
+            raise ValueError(f"{self.filename} is not a version {VERSION} task file")
+
+    @staticmethod
+    def _write_file(filename, records):
+        """
+        Writes a fresh store holding `records` ((task_id, description,
+        complete) tuples), laid out as header, records, offset table.
+        """
+        offsets = array('Q')
+        with open(filename, 'wb') as binary_file:
+            binary_file.write(bytes(HEADER.size))
+            for task_id, description, complete in records:
+                offsets.append(binary_file.tell())
+                data = description.encode('utf-8')
+                binary_file.write(RECORD.pack(COMPLETE if complete else 0, task_id, len(data)) + data)
+            table_offset = binary_file.tell()
+            capacity = max(INITIAL_CAPACITY, 2 * len(offsets))
+            binary_file.write(offsets.tobytes() + bytes(OFFSET.size * (capacity - len(offsets))))
+            binary_file.seek(0)
+            binary_file.write(HEADER.pack(MAGIC, VERSION, len(offsets), 0, capacity, table_offset))
+            binary_file.flush()
+            os.fsync(binary_file.fileno())
+
+    def _view(self):
+        """Returns a read-only mapping of the file, remapping after it grew."""
+        if self._map is None:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _unmap(self):
+        """Drops the current mapping so the next read maps the grown file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _write_at(self, position, data):
+        """Writes bytes at a file position."""
+        self._file.seek(position)
+        self._file.write(data)
+
+    def _write_header(self):
+        """Writes the header; updating the count is what commits an append."""
+        self._write_at(0, HEADER.pack(MAGIC, VERSION, self.count, self.deleted,
+                                      self.capacity, self.table_offset))
+        self._file.flush()
+
+    def _record_offset(self, slot):
+        """Returns the file position of the record in a slot."""
+        if not 0 <= slot < self.count:
+            raise IndexError(slot)
+        return OFFSET.unpack_from(self._view(), self.table_offset + slot * OFFSET.size)[0]
+
+    def __len__(self):
+        """Returns the number of record slots, deleted ones included."""
+        return self.count
+
+    def read(self, slot):
+        """Returns (flags, task_id, description) for a record slot."""
+        view = self._view()
+        offset = self._record_offset(slot)
+        flags, task_id, length = RECORD.unpack_from(view, offset)
+        start = offset + RECORD.size
+        return flags, task_id, view[start:start + length].decode('utf-8')
+
+    def iter_records(self):
+        """
+        Yields (slot, task_id, complete) for every live record. Descriptions
+        are not decoded; read() fetches one when it is needed.
+        """
+        view = self._view()
+        table = self.table_offset
+        for slot in range(self.count):
+            offset = OFFSET.unpack_from(view, table + slot * OFFSET.size)[0]
+            flags, task_id, _ = RECORD.unpack_from(view, offset)
+            if not flags & DELETED:
+                yield slot, task_id, bool(flags & COMPLETE)
+
+    def append(self, task_id, description, complete=False):
+        """Appends a record and returns its slot."""
+        if self.count == self.capacity:
+            self._grow_table()
+        data = description.encode('utf-8')
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(RECORD.pack(COMPLETE if complete else 0, task_id, len(data)) + data)
+        self._write_at(self.table_offset + self.count * OFFSET.size, OFFSET.pack(offset))
+        self.count += 1
+        self._write_header()
+        self._unmap()
+        return self.count - 1
+
+    def _grow_table(self):
+        """Moves the offset table to the end of the file with twice the capacity."""
+        view = self._view()
+        table = view[self.table_offset:self.table_offset + self.count * OFFSET.size]
+        self._file.seek(0, os.SEEK_END)
+        self.table_offset = self._file.tell()
+        self.capacity *= 2
+        self._file.write(table + bytes(OFFSET.size * (self.capacity - self.count)))
+        self._write_header()
+        self._unmap()
+
+    def _set_flag(self, slot, flag):
+        """Sets a flag bit in a record's flags byte; returns False if it was already set."""
+        offset = self._record_offset(slot)
+        flags = self._view()[offset]
+        if flags & flag:
+            return False
+        self._write_at(offset, bytes((flags | flag,)))
+        self._file.flush()
+        return True
+
+    def mark_complete(self, slot):
+        """Flips a record's status to complete in place."""
+        return self._set_flag(slot, COMPLETE)
+
+    def mark_deleted(self, slot):
+        """Marks a record as deleted in place; rewrite() reclaims its space."""
+        if self._set_flag(slot, DELETED):
+            self.deleted += 1
+            self._write_header()
+
+    def needs_compaction(self):
+        """Returns True once deleted records make up most of the file."""
+        return self.deleted > INITIAL_CAPACITY and self.deleted * 2 > self.count
+
+    def rewrite(self, records):
+        """
+        Replaces the whole store with `records` ((task_id, description,
+        complete) tuples), dropping deleted records. Record i ends up in slot i.
+        """
+        temporary = self.filename + '.tmp'
+        self._write_file(temporary, records)
+        self.close()
+        os.replace(temporary, self.filename)
+        self._open()
+
+    def flush(self):
+        """Forces written changes to disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        """Closes the mapping and the file."""
+        self._unmap()
+        self._file.close()
@@ -0,0 +1,87 @@
+"""
+Due-date queue for the To-Do app.
+
+A binary heap of (due date, priority, task ID) entries answers "what is due
+next" and "what is overdue" by looking only at the front of the heap, so
+finding the next k tasks costs O(k log n) instead of sorting every task.
+When a task is completed, deleted or rescheduled its old entry is not
+searched for; it stays in the heap and is skipped as stale when reached
+(lazy invalidation). The owner rebuilds the queue once stale entries make
+up half of it.
+"""
+import heapq
+
+# Rank of a task without a priority: after every numbered priority.
+NO_PRIORITY = float('inf')
+
+
+class DueQueue:
+    """Heap of scheduled task IDs with lazily discarded stale entries."""
+
+    def __init__(self, key):
+        """
+        Initializes an empty queue.
+
+        args:
+            key: callable mapping a task ID to its current (due, rank) pair,
+                or None when the task should not be queued (deleted,
+                complete or without a due date). An entry is live only
+                while it still matches its task's key.
+        """
+        self.key = key
+        self.heap = []
+        self.stale = 0
+
+    @classmethod
+    def build(cls, key, task_ids):
+        """Builds a queue over the given task IDs in O(n)."""
+        queue = cls(key)
+        for task_id in task_ids:
+            current = key(task_id)
+            if current is not None:
+                queue.heap.append((*current, task_id))
+        heapq.heapify(queue.heap)
+        return queue
+
+    def push(self, task_id):
+        """Queues a task under its current key, if it has one."""
+        current = self.key(task_id)
+        if current is not None:
+            heapq.heappush(self.heap, (*current, task_id))
+
+    def invalidate(self):
+        """Records that one queued entry no longer matches its task."""
+        self.stale += 1
+
+    def needs_rebuild(self):
+        """Returns True once stale entries make up half the heap."""
+        return self.stale * 2 > len(self.heap)
+
+    def _is_live(self, entry):
+        """Returns True when an entry still matches its task."""
+        return self.key(entry[2]) == entry[:2]
+
+    def iter_task_ids(self):
+        """
+        Yields the IDs of queued tasks in (due, rank) order without
+        emptying the heap. Stale entries at the front are dropped for good;
+        further down the heap is walked in order with a small frontier heap
+        of positions, so taking the first k IDs touches O(k) entries.
+        The queue must not change while the generator is in use.
+        """
+        heap = self.heap
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+            self.stale = max(self.stale - 1, 0)
+        frontier = [(heap[0], 0)] if heap else []
+        seen = set()
+        while frontier:
+            entry, position = heapq.heappop(frontier)
+            task_id = entry[2]
+            # A task rescheduled back to an earlier key has two live entries.
+            if task_id not in seen and self._is_live(entry):
+                seen.add(task_id)
+                yield task_id
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
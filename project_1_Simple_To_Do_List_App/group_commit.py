@@ -0,0 +1,68 @@
+"""
+Group commit for the To-Do app's saves.
+
+When several threads ask to save at about the same time, one of them (the
+leader) runs the commit and every request that arrived before the leader
+started is satisfied by that single write and fsync. Requests arriving
+while a commit is in progress wait and are then covered together by the
+next one.
+"""
+import threading
+import time
+
+
+class GroupCommitter:
+    """Runs a commit function once for each group of concurrent requests."""
+
+    def __init__(self, commit, window=0.0):
+        """
+        Initializes the committer.
+
+        args:
+            commit: zero-argument callable that performs the save.
+            window: seconds a leader waits for more requests to join its
+                group before committing (0 commits immediately).
+        """
+        self.commit = commit
+        self.window = window
+        self.commits = 0
+        self._condition = threading.Condition()
+        self._requested = 0
+        self._completed = 0
+        self._leader_active = False
+        self._last_result = None
+
+    def request(self):
+        """
+        Blocks until a commit that started after this call has finished, and
+        returns that commit's result.
+        """
+        with self._condition:
+            self._requested += 1
+            ticket = self._requested
+            while True:
+                if self._completed >= ticket:
+                    return self._last_result
+                if not self._leader_active:
+                    self._leader_active = True
+                    break
+                self._condition.wait()
+
+        covered = ticket
+        committed = False
+        try:
+            if self.window:
+                time.sleep(self.window)
+            with self._condition:
+                covered = self._requested
+            result = self.commit()
+            committed = True
+        finally:
+            with self._condition:
+                if committed:
+                    self._completed = max(self._completed, covered)
+                    self._last_result = result
+                    self.commits += 1
+                self._leader_active = False
+                self._condition.notify_all()
+        return result
@@ -0,0 +1,89 @@
+"""
+Incremental reader for files holding one large top-level JSON array.
+
+json.load() needs the whole file text and the whole decoded list in memory
+at once. iter_json_array() instead reads the file in fixed-size chunks and
+yields one array element at a time, so memory stays proportional to the
+largest element rather than to the file.
+"""
+import json
+import re
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = ' \t\n\r'
+SKIP_WHITESPACE = re.compile(r'[ \t\n\r]*').match
+
+
+def iter_json_array(json_file, chunk_size=CHUNK_SIZE):
+    """
+    Yields the elements of the top-level JSON array stored in json_file.
+
+    args:
+        json_file: a text file object positioned at the start of the array.
+        chunk_size: number of characters read per chunk.
+
+    raises:
+        json.JSONDecodeError: if the file is empty or not a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    at_eof = False
+
+    def fill():
+        """Drops consumed text and reads the next chunk; returns False at EOF."""
+        nonlocal buffer, position, at_eof
+        chunk = json_file.read(chunk_size)
+        buffer = buffer[position:] + chunk
+        position = 0
+        at_eof = not chunk
+        return not at_eof
+
+    def next_token():
+        """Skips whitespace and returns the next character ('' at EOF)."""
+        nonlocal position
+        while True:
+            position = SKIP_WHITESPACE(buffer, position).end()
+            if position < len(buffer):
+                return buffer[position]
+            if not fill():
+                return ''
+
+    if next_token() != '[':
+        raise json.JSONDecodeError("Expecting '['", buffer, position)
+    position += 1
+
+    expect_value = False
+    while True:
+        token = next_token()
+        if token == ']' and not expect_value:
+            return
+        if token == '':
+            raise json.JSONDecodeError("Unterminated array", buffer, position)
+
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if at_eof or not fill():
+                    raise
+                continue
+            # A number cut by the chunk boundary (e.g. "1.5e|3") decodes to a
+            # shorter number, so only accept it once a delimiter follows.
+            number_cut = (isinstance(element, (int, float)) and not isinstance(element, bool)
+                          and (end == len(buffer) or buffer[end] not in ',]' + WHITESPACE))
+            if number_cut and not at_eof:
+                fill()
+                continue
+            break
+        position = end
+        yield element
+
+        token = next_token()
+        if token == ',':
+            position += 1
+            expect_value = True
+        elif token == ']':
+            return
+        else:
+            raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position)
@@ -0,0 +1,138 @@
+"""
+Project 1 - D: Load test for the To-Do HTTP service
+Project Description: Starts `simpleToDoList.py serve` on a scratch task
+file already holding many tasks (or targets a running server), has many
+concurrent keep-alive clients add, list and complete tasks, and reports
+requests per second and latency percentiles. With a large list, every
+snapshot rewrite (autosave and journal compaction) is slow enough to show
+in p99 if it holds up requests. Run with:
+python load_test_server.py [--clients N] [--requests N] [--tasks N] [--port PORT]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'simpleToDoList.py')
+SERVING = re.compile(r'http://[^:]+:(\d+)/')
+TASKS = 200_000
+
+
+async def request(reader, writer, method, target, payload=None):
+    """Sends one request on an open connection and returns (status, decoded body)."""
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ')[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def run_client(host, port, client, requests, latencies):
+    """
+    One client: cycles through add, list a page and complete its own task,
+    recording each request's latency in seconds.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    task_id = None
+    try:
+        for n in range(requests):
+            step = n % 3
+            start = time.perf_counter()
+            if step == 0:
+                status, task = await request(reader, writer, 'POST', '/tasks',
+                                             {'description': f"client {client} task {n}"})
+                task_id = task['id']
+            elif step == 1:
+                status, _ = await request(reader, writer, 'GET', '/tasks?status=incomplete&limit=20')
+            else:
+                status, _ = await request(reader, writer, 'POST', f'/tasks/{task_id}/complete')
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                raise RuntimeError(f"request failed with status {status}")
+    finally:
+        writer.close()
+
+
+async def load_test(host, port, clients, requests):
+    """
+    Runs the clients concurrently.
+
+    returns:
+        dict with the request count, elapsed seconds, requests per second
+        and p50/p99/max latency in milliseconds.
+    """
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, client, requests, latencies) for client in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+
+    return {'requests': len(latencies), 'seconds': elapsed, 'requests_per_second': len(latencies) / elapsed,
+            'p50_ms': percentile(0.50), 'p99_ms': percentile(0.99), 'max_ms': latencies[-1] * 1000}
+
+
+def write_task_file(directory, count):
+    """Writes a To_Do_List.json holding `count` tasks, a fifth of them complete."""
+    with open(os.path.join(directory, 'To_Do_List.json'), 'w') as json_file:
+        json.dump([{'id': task_id, 'description': f"existing task {task_id}",
+                    'status': 'Complete' if task_id % 5 == 0 else 'Incomplete'}
+                   for task_id in range(1, count + 1)], json_file)
+
+
+def start_server(directory):
+    """Starts the service on a free port in a scratch directory; returns (process, port)."""
+    server = subprocess.Popen([sys.executable, SERVER_SCRIPT, 'serve', '--port', '0'], cwd=directory,
+                              stdout=subprocess.PIPE, text=True)
+    for line in server.stdout:
+        match = SERVING.search(line)
+        if match:
+            return server, int(match.group(1))
+    raise RuntimeError("server exited before it started listening")
+
+
+if __name__ == "__main__":
+    """ main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=100, help="number of concurrent connections")
+    parser.add_argument('--requests', type=int, default=300, help="requests sent by each client")
+    parser.add_argument('--tasks', type=int, default=TASKS, help="tasks in the started server's list")
+    parser.add_argument('--host', default='127.0.0.1', help="server address")
+    parser.add_argument('--port', type=int, help="port of a running server (default: start one)")
+    args = parser.parse_args()
+
+    server = None
+    port = args.port
+    with tempfile.TemporaryDirectory() as directory:
+        if port is None:
+            write_task_file(directory, args.tasks)
+            server, port = start_server(directory)
+        try:
+            result = asyncio.run(load_test(args.host, port, args.clients, args.requests))
+        finally:
+            if server is not None:
+                # Interrupt rather than kill, so the server's save-on-exit runs too.
+                server.send_signal(signal.SIGINT)
+                server.wait()
+
+    print(f"{result['requests']:,} requests from {args.clients} clients in {result['seconds']:.2f} s:")
+    print(f"  {'requests/s':<14} {result['requests_per_second']:10.1f}")
+    for name in ('p50_ms', 'p99_ms', 'max_ms'):
+        print(f"  {name:<14} {result[name]:10.2f}")
@@ -0,0 +1,152 @@
+"""
+Inverted index over task descriptions for the To-Do app.
+
+Each lowercase word maps to the set of task IDs whose description contains
+it, and a sorted vocabulary list answers prefix queries with bisect. The
+index is updated one task at a time as tasks are added and deleted. It can
+be saved next to the task file and is only reused while that file is
+unchanged.
+"""
+import bisect
+import json
+import os
+import re
+
+TOKEN = re.compile(r'\w+')
+QUERY_TERM = re.compile(r'\w+\*?')
+
+
+def tokenize(text):
+    """Returns the set of lowercase words in a text."""
+    return set(TOKEN.findall(text.lower()))
+
+
+def matches(query, description):
+    """
+    Returns True if a description contains every term of the query, with
+    the same rules as SearchIndex.search, for backends without an index.
+    """
+    terms = QUERY_TERM.findall(query.lower())
+    tokens = tokenize(description)
+    return bool(terms) and all(
+        any(token.startswith(term[:-1]) for token in tokens) if term.endswith('*') else term in tokens
+        for term in terms)
+
+
+def file_signature(filename):
+    """Returns (size, mtime_ns) for a file, or None if it does not exist."""
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class SearchIndex:
+    """Token -> task ID index supporting prefix and multi-term AND queries."""
+
+    def __init__(self):
+        """Initializes an empty index."""
+        self.postings = {}
+        self.vocabulary = []
+
+    @classmethod
+    def build(cls, tasks):
+        """
+        Builds an index from (task_id, description) pairs.
+
+        args:
+            tasks: iterable of (task_id, description) pairs.
+        """
+        index = cls()
+        postings = index.postings
+        for task_id, description in tasks:
+            for token in tokenize(description):
+                postings.setdefault(token, set()).add(task_id)
+        index.vocabulary = sorted(postings)
+        return index
+
+    def add(self, task_id, description):
+        """Indexes a task's description."""
+        for token in tokenize(description):
+            task_ids = self.postings.get(token)
+            if task_ids is None:
+                task_ids = self.postings[token] = set()
+                bisect.insort(self.vocabulary, token)
+            task_ids.add(task_id)
+
+    def remove(self, task_id, description):
+        """Removes a task's description from the index."""
+        for token in tokenize(description):
+            task_ids = self.postings.get(token)
+            if task_ids is None:
+                continue
+            task_ids.discard(task_id)
+            if not task_ids:
+                del self.postings[token]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+
+    def _prefix_postings(self, prefix):
+        """Returns the posting sets of every token starting with prefix."""
+        groups = []
+        position = bisect.bisect_left(self.vocabulary, prefix)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(prefix):
+            groups.append(self.postings[self.vocabulary[position]])
+            position += 1
+        return groups
+
+    def search(self, query):
+        """
+        Returns the set of task IDs matching every term in the query, e.g.
+        "buy milk" or "buy mil*" (a trailing '*' makes a term a prefix).
+        """
+        terms = QUERY_TERM.findall(query.lower())
+        exact = sorted((self.postings.get(term, set()) for term in terms if not term.endswith('*')), key=len)
+        prefixes = sorted((self._prefix_postings(term[:-1]) for term in terms if term.endswith('*')),
+                          key=lambda group: sum(map(len, group)))
+        if exact:
+            # Intersect starting from the rarest term so each step stays small.
+            result = set(exact[0])
+            for task_ids in exact[1:]:
+                result &= task_ids
+        elif prefixes:
+            result = set().union(*prefixes.pop(0))
+        else:
+            return set()
+        for group in prefixes:
+            if not result:
+                break
+            # A few candidates are cheaper to check one by one than building
+            # the union of a large prefix group; otherwise let set ops do it.
+            if len(result) * len(group) * 8 < sum(map(len, group)):
+                result = {task_id for task_id in result if any(task_id in task_ids for task_ids in group)}
+            else:
+                result &= set().union(*group)
+        return result
+
+    def save(self, filename, signature):
+        """
+        Writes the index to a file, tagged with the signature of the task
+        file it describes.
+        """
+        with open(filename, 'w') as index_file:
+            postings = {token: list(task_ids) for token, task_ids in self.postings.items()}
+            json.dump({'signature': signature, 'postings': postings}, index_file)
+
+    @classmethod
+    def load(cls, filename, signature):
+        """
+        Reads an index saved by save(). Returns None when the file is
+        missing, unreadable or was saved for a different task file.
+        """
+        try:
+            with open(filename, 'r') as index_file:
+                saved = json.load(index_file)
+        except (OSError, ValueError):
+            return None
+        if signature is None or saved.get('signature') != signature:
+            return None
+        index = cls()
+        index.postings = {token: set(task_ids) for token, task_ids in saved['postings'].items()}
+        index.vocabulary = sorted(index.postings)
+        return index
@@ -1,8 +1,163 @@
 """A simple command-line to-do Python application."""
 from abc import ABC, abstractmethod
+import argparse
+import atexit
+from contextlib import contextmanager, nullcontext
+from datetime import date, timedelta
+import itertools
 import json
 import os
+import re
 import sys
+import threading
+
+from autosave import AutoSaver
+from binary_task_store import BINARY_FILE, BinaryTaskStore
+from due_queue import NO_PRIORITY, DueQueue
+from group_commit import GroupCommitter
+from json_stream import iter_json_array
+from search_index import SearchIndex, file_signature, matches
+from snapshot_cache import SnapshotCache
+from sorted_views import SortedViews
+from store_lock import StoreLock, file_identity
+from task_archive import TaskArchive
+from task_journal import TaskJournal
+from task_shards import DEFAULT_PROJECT, ShardManifest, project_name
+from task_transfer import FORMATS, description_key, format_of, read_tasks, write_tasks
+from undo_history import UNDO_MAX_TASKS, UndoHistory
+
+TASK_FILE = 'To_Do_List.json'
+DATABASE_FILE = 'To_Do_List.db'
+PAGE_SIZE = 20
+TASK_LINE = "Task {0}: {2} | Status: {3} | ID: {1}\n"
+WRITE_CHUNK_ROWS = 1000
+# A task number or an inclusive range of them in a bulk selection, e.g. "3-10".
+TASK_RANGE = re.compile(r'(\d+)(?:-(\d+))?')
+NEXT_COUNT = 10
+# add_tasks() adds and journals tasks this many at a time; one batch is
+# also the most a change may touch and still be undone.
+ADD_BATCH = UNDO_MAX_TASKS
+SELECTION_HELP = "'3-10' (task numbers), 'id 4 7', 'complete', 'incomplete' or 'has WORDS'"
+# One element of To_Do_List.json exactly as json.dump(..., indent=5) lays it out.
+SNAPSHOT_ENTRY = ('     {{\n          "id": {},\n          "description": {},\n'
+                  '          "status": "{}"\n     }}')
+SNAPSHOT_COMPLETED_ENTRY = ('     {{\n          "id": {},\n          "description": {},\n'
+                            '          "status": "Complete",\n          "completed": "{}"\n     }}')
+# Sort keys of the sorted views (see sorted_views); each ends with the
+# task ID, so keys are unique and ties keep creation order.
+SORT_KEYS = {
+    'description': lambda task: (task._description.casefold(), task._id),
+    'created': lambda task: (task._id,),
+    'status': lambda task: (task._complete, task._id),
+}
+# Completed tasks move to the compressed archive this many days after completion.
+ARCHIVE_AFTER_DAYS = 30
+# Defaults of the serve command. The server module itself (and asyncio) is
+# only imported when serving, which keeps it off the start-up path.
+HOST = '127.0.0.1'
+PORT = 8080
+AUTOSAVE_DELAY = 1.0
+# Default port of 'sync serve'; task_replication is likewise only imported
+# for lists set up for replication.
+SYNC_PORT = 8081
+
+
+def write_task_rows(rows):
+    """
+    Writes task rows ((task_number, task_id, description, status) tuples)
+    to stdout, framed by blank lines. Rows are formatted and written in
+    chunks rather than with one print() per task, and are only pulled from
+    `rows` as they are written. Returns the number of rows written.
+    """
+    rows = iter(rows)
+    write = sys.stdout.write
+    write('\n')
+    count = 0
+    while True:
+        chunk = [TASK_LINE.format(*row) for row in itertools.islice(rows, WRITE_CHUNK_ROWS)]
+        if not chunk:
+            break
+        write(''.join(chunk))
+        count += len(chunk)
+    write('\n')
+    return count
+
+
+def fsync_directory(path):
+    """Flushes the directory entry of a file to disk (a no-op off POSIX)."""
+    if os.name != 'posix':
+        return
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+def parse_due(text):
+    """
+    Returns a due date given as YYYY-MM-DD in its canonical form, or None
+    for 'none'. Raises ValueError for anything else.
+    """
+    if text.lower() == 'none':
+        return None
+    return date.fromisoformat(text).isoformat()
+
+
+def parse_status(text):
+    """Returns 'Complete' or 'Incomplete' for either word in any case; raises ValueError otherwise."""
+    if text.lower() not in ('complete', 'incomplete'):
+        raise ValueError(f"status must be complete or incomplete, not {text!r}")
+    return text.capitalize()
+
+
+def parse_priority(text):
+    """
+    Returns a priority given as a whole number (1 is the most urgent), or
+    None for 'none'. Raises ValueError for anything else.
+    """
+    if text.lower() == 'none':
+        return None
+    priority = int(text)
+    if priority < 1:
+        raise ValueError(f"priority must be 1 or more, not {priority}")
+    return priority
+
+
+def read_snapshot(filename, cache=None):
+    """
+    Yields the tasks of a snapshot file one at a time. The file is decoded
+    incrementally, so neither the file text nor a list of decoded dicts
+    is ever held in memory as a whole.
+
+    args:
+        filename: path of the snapshot file.
+        cache: optional SnapshotCache. While it matches the file its rows
+            are used instead of parsing; otherwise it is refilled from a
+            complete parse.
+    """
+    if not os.path.exists(filename):
+        print(f"Warning: {filename} not found. Starting with an empty list.")
+        return
+
+    if cache is not None:
+        rows = cache.load()
+        if rows is not None:
+            yield from map(Task.from_row, rows)
+            return
+    rows = [] if cache is not None else None
+    with open(filename, 'r') as json_file:
+        try:
+            for task_dict in iter_json_array(json_file):
+                task = Task.from_dict(task_dict)
+                if rows is not None:
+                    rows.append(task.to_row())
+                yield task
+        except json.JSONDecodeError:
+            print("Warning: File is empty or corrupt. Keeping the tasks read so far.")
+            return
+    if rows is not None:
+        cache.save(rows)
 
 
 class OpenApp(ABC):
@@ -25,45 +180,190 @@ class OpenApp(ABC):
 class App(OpenApp):
     """Main application class for the To-Do app."""
 
-    def __init__(self):
-        """Initializes the task manager and loads tasks."""
-        self.tasks = self.load_tasks()
-        self.task_manager = TaskManager(self.tasks)
+    def __init__(self, filename=TASK_FILE, journal=None, task_manager=None, store_lock=None,
+                 manifest=None, project=DEFAULT_PROJECT):
+        """
+        Initializes the task manager and loads tasks.
+
+        args:
+            filename: path of the task snapshot file.
+            journal: optional TaskJournal; when given, changes are appended
+                to it and replayed on startup instead of rewriting the file.
+            task_manager: optional storage backend implementing
+                TaskManagerInterface (e.g. SQLiteTaskManager). When given,
+                the JSON file is not loaded at all.
+            store_lock: optional StoreLock shared with other processes using
+                the same files (see TaskManager).
+            manifest: optional ShardManifest of the projects, when the
+                file is the shard of `project` (see task_shards).
+            project: name of the project the tasks belong to.
+        """
+        self.filename = filename
+        self.journal = journal
+        self.task_manager = task_manager
+        self.manifest = manifest
+        self.project = project
+        # Task managers of the other projects opened so far, by name.
+        self.shards = {}
+        # Highest task ID named by the journal replayed in load_tasks().
+        self.journal_max_id = 0
+        if self.task_manager is None:
+            # Snapshot and journal must be read as one consistent version.
+            with store_lock.shared() if store_lock is not None else nullcontext():
+                tasks = self.load_tasks()
+                self.task_manager = TaskManager(tasks, filename, journal, store_lock, self.journal_max_id)
+
+    @property
+    def tasks(self):
+        """Returns the loaded tasks as a list (None for other backends)."""
+        return getattr(self.task_manager, 'task_list', None)
 
     def menu(self):
-        """Displays the main menu and prompts for user input."""
-        print("**************************")
-        print("* To-Do_Python_App       *")
-        print("*                        *")
-        print("* 1. Add Task            *")
-        print("* 2. Delete Task         *")
-        print("* 3. View Tasks          *")
-        print("* 4. Mark Task Complete  *")
-        print("* 5. Save Task           *")
-        print("* 6. Exit                *")
-        print("**************************")
-
-        user_input = int(input("Enter Option: "))
-        self.menu_functions(user_input)
+        """
+        Displays the main menu and prompts for user input, in a loop until
+        the user picks Exit.
+        """
+        while True:
+            print("**************************")
+            print("* To-Do_Python_App       *")
+            print("*                        *")
+            print("* 1. Add Task            *")
+            print("* 2. Delete Task         *")
+            print("* 3. View Tasks          *")
+            print("* 4. Mark Task Complete  *")
+            print("* 5. Save Task           *")
+            print("* 6. Exit                *")
+            print("* 7. Delete Task by ID   *")
+            print("* 8. Complete Task by ID *")
+            print("* 9. Search Tasks        *")
+            print("* 10. Bulk Complete      *")
+            print("* 11. Bulk Delete        *")
+            print("* 12. Next Up            *")
+            print("* 13. View Archive       *")
+            print("* 14. Undo               *")
+            print("* 15. Redo               *")
+            print("* 16. Import Tasks       *")
+            print("* 17. Export Tasks       *")
+            print("* 18. Projects           *")
+            print("**************************")
 
-    def load_tasks(self):
+            user_input = int(input("Enter Option: "))
+            self.menu_functions(user_input)
+
+    def run_commands(self, commands):
         """
-        Reads tasks from the To_Do_List.json file and returns them as a list.
+        Runs commands without prompting and saves once at the end.
+
+        args:
+            commands: iterable of (command, arguments) pairs:
+                ('add', [description, ...]), ('done', [task_id, ...]),
+                ('rm', [task_id, ...]), ('ls', [[status], [offset, [limit]]]) with
+                status 'complete' or 'incomplete', ('find', [word, ...]), or
+                ('done-where', selection words) and ('rm-where', selection words)
+                with a selection as accepted by bulk_update(), ('due', [task_id,
+                date]), ('priority', [task_id, number]), ('next', [[count]]),
+                ('overdue', []), ('archive', [[days]]), ('archived', [word, ...]),
+                ('undo', [[count]]), ('redo', [[count]]) or ('sorted', [view,
+                [from, [to]]]).
         """
-        filename = 'To_Do_List.json'
+        with self.task_manager.batch() as manager:
+            for command, arguments in commands:
+                if command == 'add':
+                    for description in arguments:
+                        manager.add_task(Task(description))
+                elif command in ('done', 'rm'):
+                    task_ids = []
+                    for task_id in arguments:
+                        try:
+                            task_ids.append(int(task_id))
+                        except ValueError:
+                            print(f"Warning: Invalid Task ID {task_id!r}!")
+                    if command == 'done':
+                        manager.complete_ids(task_ids)
+                    else:
+                        manager.delete_ids(task_ids)
+                elif command in ('done-where', 'rm-where'):
+                    self.bulk_update('complete' if command == 'done-where' else 'delete', ' '.join(arguments))
+                elif command == 'ls':
+                    status = None
+                    if arguments and arguments[0].lower() in ('complete', 'incomplete'):
+                        status = arguments.pop(0).capitalize()
+                    try:
+                        page = [int(number) for number in arguments[:2]]
+                    except ValueError:
+                        print(f"Warning: Invalid offset or limit {arguments!r}!")
+                        continue
+                    manager.refresh()
+                    manager.list_tasks(status, *page)
+                elif command == 'find':
+                    self.print_search_results(' '.join(arguments))
+                elif command == 'sorted':
+                    self.print_sorted(*arguments[:3])
+                elif command in ('due', 'priority', 'next', 'overdue'):
+                    self.schedule_command(command, arguments)
+                elif command == 'archive':
+                    try:
+                        days = int(arguments[0]) if arguments else ARCHIVE_AFTER_DAYS
+                    except ValueError:
+                        print(f"Warning: Invalid number of days {arguments[0]!r}!")
+                        continue
+                    self.archive_tasks(days)
+                elif command == 'archived':
+                    self.print_archived(' '.join(arguments))
+                elif command in ('undo', 'redo'):
+                    try:
+                        count = int(arguments[0]) if arguments else 1
+                    except ValueError:
+                        print(f"Warning: Invalid count {arguments[0]!r}!")
+                        continue
+                    self.step_history(command, count)
+                else:
+                    print(f"Warning: Unknown command {command!r}!")
 
-        if not os.path.exists(filename):
-            print("Warning: To_Do_List.json not found. Starting with an empty list.")
-            return []
+    @staticmethod
+    def parse_command_stream(lines):
+        """
+        Yields (command, arguments) pairs from lines such as "add buy milk",
+        "done 3 4", "rm 5", "rm-where complete", "ls" or "find buy mil*".
+        Blank lines and '#' comments are skipped.
+        """
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            command, _, rest = line.partition(' ')
+            if command == 'add':
+                yield command, [rest.strip()]
+            else:
+                yield command, rest.split()
 
-        with open('To_Do_List.json', 'r') as json_file:
-            try:
-                tasks_as_dicts = json.load(json_file)
-                tasks_as_objects = [Task(d['description']) for d in tasks_as_dicts]
-                return tasks_as_objects
-            except json.JSONDecodeError:
-                print("Warning: File is empty or corrupt. Starting with an empty list.")
-                return []
+    def load_tasks(self):
+        """
+        Reads tasks from the To_Do_List.json file and returns them as an
+        iterable of Task objects. When journaling is enabled, the journal
+        is replayed on top of it.
+        """
+        tasks = self._load_snapshot()
+        if self.journal is not None:
+            task_index = TaskManager.index_tasks(tasks)
+            skipped = 0
+            for record in self.journal.replay():
+                # Records for tasks lost from a damaged snapshot are skipped.
+                skipped += TaskManager.apply_record(task_index, record)
+                # Tasks added and deleted again since the snapshot keep their IDs taken.
+                self.journal_max_id = max([self.journal_max_id, *TaskManager.record_ids(record)])
+            if skipped:
+                print(f"Warning: Skipped journal changes to {skipped} {'task' if skipped == 1 else 'tasks'} "
+                      "that are no longer listed.")
+            tasks = task_index.values()
+        return tasks
+
+    def _load_snapshot(self):
+        """
+        Yields the snapshot's tasks one at a time (see read_snapshot), from
+        the startup cache when it is still valid.
+        """
+        return read_snapshot(self.filename, SnapshotCache(self.filename))
 
     def menu_functions(self, user_input):
         """This function manages all the application's functions."""
@@ -77,13 +377,13 @@ class App(OpenApp):
 
         # Delete task
         elif user_input == 2:
-            start_function.list_tasks()
+            self.page_tasks()
             task_to_delete = int(input("Enter Task Number: "))
             start_function.delete_task(task_to_delete)
 
         # View task
         elif user_input == 3:
-            start_function.list_tasks()
+            self.page_tasks()
 
         # Mark task as complete
         elif user_input == 4:
@@ -100,7 +400,501 @@ class App(OpenApp):
             start_function.data_persistence()
             sys.exit()
 
-        self.menu()
+        # Delete task by ID
+        elif user_input == 7:
+            self.page_tasks()
+            task_id = int(input("Enter Task ID: "))
+            start_function.delete_task_by_id(task_id)
+
+        # Mark task as complete by ID
+        elif user_input == 8:
+            task_id = int(input("Enter Task ID: "))
+            start_function.mark_as_complete_by_id(task_id)
+
+        # Search tasks
+        elif user_input == 9:
+            query = input("Search for (end a word with * to match prefixes): ")
+            self.print_search_results(query)
+
+        # Complete or delete many tasks at once
+        elif user_input in (10, 11):
+            selection = input(f"Select tasks ({SELECTION_HELP}): ")
+            self.bulk_update('complete' if user_input == 10 else 'delete', selection)
+
+        # Overdue tasks and the next ones due
+        elif user_input == 12:
+            self.schedule_command('overdue', [])
+            self.schedule_command('next', [])
+
+        # View archived tasks
+        elif user_input == 13:
+            self.print_archived(input("Show archived tasks containing (Enter for all): "))
+
+        # Undo or redo the latest change
+        elif user_input in (14, 15):
+            self.step_history('undo' if user_input == 14 else 'redo')
+
+        # Import tasks from, or export them to, a .jsonl or .csv file
+        elif user_input == 16:
+            filename = input("Import from (.jsonl or .csv): ")
+            dedupe = input("Skip tasks whose description is already listed? (y/n): ").strip().lower() == 'y'
+            self.import_tasks(filename, dedupe=dedupe)
+        elif user_input == 17:
+            self.export_tasks(input("Export to (.jsonl or .csv): "))
+
+        # List the projects with their task counts
+        elif user_input == 18:
+            self.list_projects()
+
+    def archive_tasks(self, days=ARCHIVE_AFTER_DAYS):
+        """Moves tasks completed at least `days` days ago to the archive file."""
+        if not hasattr(self.task_manager, 'archive_completed'):
+            print("Warning: Archiving needs the JSON or binary backend.")
+            return
+        count = self.task_manager.archive_completed(days)
+        print(f"Message: Archived {count} tasks.")
+
+    def print_archived(self, text=''):
+        """Prints the archived tasks, optionally only those whose description contains text."""
+        if not hasattr(self.task_manager, 'archived_tasks'):
+            print("Warning: Archiving needs the JSON or binary backend.")
+            return
+        text = text.strip().lower()
+        print()
+        for task in self.task_manager.archived_tasks():
+            if text in task._description.lower():
+                print(f"{task._description} | Completed: {task._completed_on} | ID: {task._id}")
+        print()
+
+    def step_history(self, action, count=1):
+        """Undoes ('undo') or redoes ('redo') the latest `count` changes."""
+        step = getattr(self.task_manager, action, None)
+        if step is None:
+            print("Warning: Undo needs the JSON or binary backend.")
+            return
+        done = 0
+        while done < count and step():
+            done += 1
+        if done:
+            print(f"Message: {'Undid' if action == 'undo' else 'Redid'} {done} "
+                  f"{'change' if done == 1 else 'changes'}.")
+        else:
+            print(f"Message: Nothing to {action}.")
+
+    def shard(self, project):
+        """
+        Returns the task manager of a project, opening its shard on first
+        use; the app's own project is its task manager.
+        """
+        if project == self.project:
+            return self.task_manager
+        if project not in self.shards:
+            self.manifest.add(project)
+            filename = self.manifest.shard_filename(project)
+            self.shards[project] = App(filename, TaskJournal(self.manifest.journal_filename(project)),
+                                       store_lock=StoreLock(filename), manifest=self.manifest,
+                                       project=project).task_manager
+        return self.shards[project]
+
+    def save_shards(self):
+        """
+        Saves the open projects that have unsaved changes, and only those,
+        recording their new counts in the manifest.
+        """
+        for project, manager in [(self.project, self.task_manager), *self.shards.items()]:
+            if manager.is_dirty:
+                manager.data_persistence()
+                if self.manifest is not None:
+                    self.manifest.record(project, manager.task_index.values())
+
+    def _counts(self, project):
+        """
+        Returns a project's task counts from the manifest, or from its
+        tasks when the manifest's are out of date (recording them again).
+        """
+        counts = self.manifest.counts(project)
+        if counts is None:
+            manager = self.shard(project)
+            tasks = manager.task_index.values()
+            if not manager.is_dirty:
+                self.manifest.record(project, tasks)
+            counts = {'tasks': len(tasks), 'incomplete': sum(1 for task in tasks if not task._complete)}
+        return counts
+
+    def list_projects(self):
+        """Prints each project with its task counts, marking the one in use."""
+        if self.manifest is None:
+            print("Warning: Projects need the JSON backend.")
+            return
+        print()
+        for project in self.manifest.projects():
+            counts = self._counts(project)
+            marker = '*' if project == self.project else ' '
+            print(f"{marker} {project} | Tasks: {counts['tasks']} | Incomplete: {counts['incomplete']}")
+        print()
+
+    def use_project(self, project):
+        """Makes a project (new or existing) the one commands work on by default."""
+        if self.manifest is None:
+            print("Warning: Projects need the JSON backend.")
+            return
+        try:
+            self.manifest.use(project)
+        except ValueError as error:
+            print(f"Warning: {error}")
+            return
+        print(f"Message: Now using project {project!r}.")
+
+    def search_projects(self, query):
+        """
+        Prints the tasks of every project whose description matches a
+        search query. Projects whose saved index has no match are skipped
+        without loading them.
+        """
+        if self.manifest is None:
+            print("Warning: Projects need the JSON backend.")
+            return
+        print()
+        for project in self.manifest.projects():
+            index = self.manifest.saved_index(project) if project != self.project else None
+            if index is not None and not index.search(query):
+                continue
+            manager = self.shard(project)
+            manager.refresh()
+            tasks = manager.search(query)
+            if index is None and not manager.is_dirty:
+                manager.save_search_index()
+                self.manifest.record(project, manager.task_index.values())
+            for task in tasks:
+                print(f"{project} | {task._description} | Status: {task.status} | ID: {task._id}")
+        print()
+
+    def move_to_project(self, task_id, project):
+        """Moves the task with the given ID to another project, saving both shards."""
+        if self.manifest is None:
+            print("Warning: Projects need the JSON backend.")
+            return
+        task = self.task_manager.get_task(task_id)
+        if task is None:
+            print("Warning: Invalid Task ID!")
+            return
+        try:
+            self.manifest.add(project)
+        except ValueError as error:
+            print(f"Warning: {error}")
+            return
+        if project == self.project:
+            print(f"Message: Task {task_id} is already in project {project!r}.")
+            return
+        moved = Task.from_dict({**task.to_dict(), 'id': None})
+        self.shard(project).add_task(moved)
+        self.task_manager.delete_task_by_id(task_id)
+        self.save_shards()
+        print(f"Message: Moved task {task_id} to project {project!r} as task {moved._id}.")
+
+    def open_replica(self):
+        """
+        Attaches replication (see task_replication) to the task manager if
+        this copy of the list was set up with 'sync init'. Returns the
+        Replica, or None.
+        """
+        manager = self.task_manager
+        if (not isinstance(manager, TaskManager) or isinstance(manager, BinaryTaskManager)
+                or not os.path.exists(os.path.splitext(self.filename)[0] + '.replica')):
+            return None
+        # Imported here: lists that are not replicated never need it.
+        from task_replication import Replica
+        return Replica.open(self.filename, manager)
+
+    def sync(self, action, target=None, host=HOST, port=SYNC_PORT):
+        """
+        Replicates the list with other copies of it (see task_replication).
+
+        args:
+            action: 'init' names this copy (`target`, or a random name);
+                'file' exchanges changes through the file `target`;
+                'serve' answers other copies on host:port until
+                interrupted; 'connect' exchanges changes with the copy
+                serving on host:port.
+        """
+        manager = self.task_manager
+        if not isinstance(manager, TaskManager) or isinstance(manager, BinaryTaskManager):
+            print("Warning: Sync needs the JSON backend.")
+            return
+        from task_replication import Replica, serve_sync, sync_file, sync_socket
+
+        if action == 'init':
+            replica_id = Replica.initialize(self.filename, target)
+            if manager.replica is None:
+                self.open_replica()
+            else:
+                manager.replica.replica_id = replica_id
+            print(f"Message: This list is now replica {replica_id!r}.")
+            return
+        replica = manager.replica
+        if replica is None:
+            print("Warning: Run 'sync init' before syncing.")
+            return
+        if action == 'serve':
+            def started(server):
+                print(f"Syncing replica {replica.replica_id!r} on {host}:{server.server_address[1]} "
+                      "(Ctrl+C to stop)", flush=True)
+            try:
+                serve_sync(replica, host, port, started)
+            except KeyboardInterrupt:
+                pass
+            finally:
+                manager.data_persistence()
+            return
+        try:
+            if action == 'file':
+                received, sent = sync_file(replica, target)
+            else:
+                received, sent = sync_socket(replica, host, port)
+        except (OSError, ValueError, KeyError) as error:
+            print(f"Warning: Sync failed: {error}")
+            return
+        manager.data_persistence()
+        print(f"Message: Received {received} and sent {sent} changes.")
+
+    def _tasks_from_rows(self, rows, seen=None):
+        """
+        Yields a Task for each (line number, task dictionary) pair read by
+        task_transfer.read_tasks(), warning about and skipping rows that do
+        not describe a valid task. With `seen`, a set of description_key()
+        values, descriptions already in it are skipped as duplicates and
+        new ones are added to it.
+        """
+        for line_number, task_dict in rows:
+            try:
+                if task_dict is None:
+                    raise ValueError("not a task")
+                description = task_dict.get('description')
+                if not isinstance(description, str) or not description.strip():
+                    raise ValueError("description is missing")
+                priority = task_dict.get('priority')
+                due = task_dict.get('due')
+                task = Task(description, None, None if priority is None else parse_priority(str(priority)),
+                            None if due is None else parse_due(str(due)))
+                status = task_dict.get('status')
+                if status is not None and str(status).lower() == 'complete':
+                    task._complete = True
+                    completed = task_dict.get('completed')
+                    task._completed_on = None if completed is None else parse_due(str(completed))
+            except ValueError as error:
+                print(f"Warning: Skipping line {line_number}: {error}.")
+                continue
+            if seen is not None:
+                key = description_key(description)
+                if key in seen:
+                    continue
+                seen.add(key)
+            yield task
+
+    def import_tasks(self, filename, file_format=None, dedupe=False):
+        """
+        Adds the tasks of a JSON lines or CSV file ('-' reads stdin) as new
+        tasks, streaming them into the task manager in batches and saving
+        once at the end. Returns the number of tasks added.
+
+        args:
+            filename: file to read; its extension gives the format unless
+                file_format does.
+            file_format: 'jsonl' or 'csv'.
+            dedupe: skip tasks whose description (ignoring case and extra
+                spaces) is already listed or came earlier in the file.
+        """
+        try:
+            file_format = format_of(filename, file_format or ('jsonl' if filename == '-' else None))
+            source = nullcontext(sys.stdin) if filename == '-' else open(filename, 'r', newline='', encoding='utf-8')
+        except (OSError, ValueError) as error:
+            print(f"Warning: Cannot import {filename}: {error}")
+            return 0
+        manager = self.task_manager
+        with source as import_file:
+            seen = None
+            if dedupe:
+                manager.refresh()
+                seen = {description_key(description) for _, _, description, _ in manager.iter_task_rows()}
+            rows = read_tasks(import_file, file_format)
+            with manager.batch():
+                count = manager.add_tasks(self._tasks_from_rows(rows, seen))
+        print(f"Message: Imported {count} tasks.")
+        return count
+
+    def export_tasks(self, filename, file_format=None):
+        """
+        Writes every task to a JSON lines or CSV file ('-' writes stdout),
+        one task at a time. Returns the number of tasks written.
+
+        args:
+            filename: file to create; its extension gives the format unless
+                file_format does.
+            file_format: 'jsonl' or 'csv'.
+        """
+        try:
+            file_format = format_of(filename, file_format or ('jsonl' if filename == '-' else None))
+            target = nullcontext(sys.stdout) if filename == '-' else open(filename, 'w', newline='', encoding='utf-8')
+        except (OSError, ValueError) as error:
+            print(f"Warning: Cannot export to {filename}: {error}")
+            return 0
+        self.task_manager.refresh()
+        with target as export_file:
+            count = write_tasks(export_file, file_format, self.task_manager.iter_task_dicts())
+        if filename != '-':
+            print(f"Message: Exported {count} tasks.")
+        return count
+
+    def schedule_command(self, command, arguments):
+        """
+        Runs a due-date command: 'due ID DATE' and 'priority ID N' (either
+        value may be 'none' to clear it), 'next [COUNT]' or 'overdue'.
+        """
+        manager = self.task_manager
+        if not hasattr(manager, 'due_queue'):
+            print("Warning: Due dates and priorities need the JSON or binary backend.")
+            return
+        try:
+            if command in ('due', 'priority'):
+                task_id, value = arguments
+                if command == 'due':
+                    manager.set_due(int(task_id), value)
+                else:
+                    manager.set_priority(int(task_id), parse_priority(value))
+                return
+            count = int(arguments[0]) if arguments else NEXT_COUNT
+        except ValueError:
+            print(f"Warning: Invalid {command} arguments {' '.join(arguments)!r}!")
+            return
+        manager.refresh()
+        if command == 'next':
+            tasks = manager.next_due(count)
+            print("\nNext Up:")
+        else:
+            tasks = manager.overdue()
+            print("\nOverdue:")
+        for task in tasks:
+            priority = '-' if task._priority is None else task._priority
+            print(f"{task._due} | Priority: {priority} | {task._description} | ID: {task._id}")
+        print()
+
+    def print_sorted(self, view='description', start=None, stop=None):
+        """
+        Prints the tasks in the order of a sorted view ('description',
+        'created' or 'status'), optionally only those from `start` up to
+        (not including) `stop`: descriptions, task IDs or statuses.
+        """
+        manager = self.task_manager
+        if not hasattr(manager, 'sorted_tasks'):
+            print("Warning: Sorted views need the JSON or binary backend.")
+            return
+        if view not in SORT_KEYS:
+            print(f"Warning: Unknown view {view!r}! Use {', '.join(SORT_KEYS)}.")
+            return
+        bounds = [start, stop]
+        try:
+            if view == 'created':
+                bounds = [None if value is None else int(value) for value in bounds]
+            elif view == 'status':
+                bounds = [None if value is None else parse_status(value) for value in bounds]
+        except ValueError:
+            print(f"Warning: Invalid range {' '.join(value for value in (start, stop) if value)!r} for {view}!")
+            return
+        manager.refresh()
+        print()
+        for task in manager.sorted_tasks(view, *bounds):
+            print(f"{task._description} | Status: {task.status} | ID: {task._id}")
+        print()
+
+    def bulk_update(self, action, selection):
+        """
+        Completes or deletes every task picked by a selection with a single
+        bulk call on the task manager. Returns the number of tasks changed.
+
+        args:
+            action: 'complete' or 'delete'.
+            selection: '3-10' (task numbers, inclusive) or '3', 'id 4 7 9',
+                'complete', 'incomplete', or 'has WORDS' (description
+                contains WORDS, ignoring case).
+        """
+        manager = self.task_manager
+        if action == 'complete':
+            by_range, by_ids, where = manager.complete_range, manager.complete_ids, manager.complete_where
+        else:
+            by_range, by_ids, where = manager.delete_range, manager.delete_ids, manager.delete_where
+
+        kind, _, rest = selection.strip().partition(' ')
+        rest = rest.strip()
+        numbers = TASK_RANGE.fullmatch(kind)
+        if numbers and not rest:
+            first = int(numbers.group(1))
+            last = int(numbers.group(2) or first)
+            count = by_range(first, last + 1)
+        elif kind == 'id' and rest and all(word.isdigit() for word in rest.split()):
+            count = by_ids([int(word) for word in rest.split()])
+        elif kind in ('complete', 'incomplete') and not rest:
+            complete = kind == 'complete'
+            count = where(lambda task: task._complete == complete)
+        elif kind == 'has' and rest:
+            text = rest.lower()
+            count = where(lambda task: text in task._description.lower())
+        else:
+            print(f"Warning: Invalid selection {selection!r}! Use {SELECTION_HELP}.")
+            return 0
+        print(f"Message: {'Completed' if action == 'complete' else 'Deleted'} {count} tasks.")
+        return count
+
+    def page_tasks(self, status=None, page_size=PAGE_SIZE):
+        """
+        Shows tasks one page at a time. Each page is read when it is shown,
+        so showing page 1 costs only that page and nothing is held across
+        input() while a background save may archive tasks.
+        """
+        self.task_manager.refresh()
+        offset = 0
+        while write_task_rows(self.task_manager.iter_task_rows(status, offset, page_size)) == page_size:
+            if input("Press Enter for more, or q to stop: ").strip().lower() == 'q':
+                break
+            offset += page_size
+
+    def print_search_results(self, query):
+        """Prints the tasks whose description matches a search query."""
+        self.task_manager.refresh()
+        print()
+        for task in self.task_manager.search(query):
+            print(f"{task._description} | Status: {task.status} | ID: {task._id}")
+        print()
+
+    def serve(self, host=HOST, port=PORT, autosave=AUTOSAVE_DELAY):
+        """
+        Serves the tasks as an HTTP/JSON service (see task_server) instead
+        of the menu, until interrupted, then saves.
+
+        args:
+            host: address to listen on.
+            port: TCP port (0 picks a free one).
+            autosave: seconds changes must be quiet before the snapshot is
+                written in the background.
+        """
+        # Imported here: the menu and one-shot commands never need them.
+        import asyncio
+        from task_server import TaskServer
+
+        server = TaskServer(self.task_manager, Task)
+        self.task_manager.enable_autosave(autosave)
+
+        def started(listener):
+            port = listener.sockets[0].getsockname()[1]
+            print(f"Serving tasks on http://{host}:{port}/ (Ctrl+C to stop)", flush=True)
+
+        try:
+            asyncio.run(server.serve(host, port, started))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print("Stopping server. Saving Tasks...")
+            self.task_manager.disable_autosave()
+            self.task_manager.data_persistence()
 
 
 class TaskManagerInterface(ABC):
@@ -113,11 +907,47 @@ class TaskManagerInterface(ABC):
         """This function adds a task to the list."""
         pass
 
+    def add_tasks(self, tasks):
+        """
+        This function adds every task of an iterable, which may be a
+        stream, and returns how many were added.
+        """
+        count = 0
+        for task_obj in tasks:
+            self.add_task(task_obj)
+            count += 1
+        return count
+
     @abstractmethod
-    def list_tasks(self):
-        """This function lists tasks from the list."""
+    def iter_task_rows(self, status=None, offset=0, limit=None):
+        """
+        This function lazily yields (task_number, task_id, description,
+        status) rows in list order, optionally only those with a status.
+        """
         pass
 
+    def iter_task_dicts(self):
+        """This function lazily yields every task, in list order, as a Task.to_dict() dictionary."""
+        for _, task_id, description, status in self.iter_task_rows():
+            yield {'id': task_id, 'description': description, 'status': status}
+
+    def search(self, query):
+        """
+        This function returns the tasks, in list order, whose description
+        contains every word of the query. A word ending in '*' matches as a
+        prefix. Backends without a search index scan every row.
+        """
+        return [Task.from_dict({'id': task_id, 'description': description, 'status': status})
+                for _, task_id, description, status in self.iter_task_rows() if matches(query, description)]
+
+    def list_tasks(self, status=None, offset=0, limit=None):
+        """
+        This function lists tasks from the list: all of them, or the page
+        given by offset and limit, optionally only those with a status
+        ('Complete' or 'Incomplete'). Returns the number of tasks listed.
+        """
+        return write_task_rows(self.iter_task_rows(status, offset, limit))
+
     @abstractmethod
     def mark_as_complete(self, task_number):
         """This function marks tasks as complete."""
@@ -128,75 +958,1607 @@ class TaskManagerInterface(ABC):
         """This function deletes specific tasks from the list."""
         pass
 
+    @abstractmethod
+    def mark_as_complete_by_id(self, task_id):
+        """This function marks the task with the given ID as complete."""
+        pass
+
+    @abstractmethod
+    def delete_task_by_id(self, task_id):
+        """This function deletes the task with the given ID."""
+        pass
+
+    @abstractmethod
+    def complete_ids(self, task_ids):
+        """
+        This function marks every task whose ID is in task_ids as complete,
+        in one pass, and returns how many changed.
+        """
+        pass
+
+    @abstractmethod
+    def delete_ids(self, task_ids):
+        """
+        This function deletes every task whose ID is in task_ids, in one
+        pass, and returns how many were deleted.
+        """
+        pass
+
+    def _ids_where(self, predicate):
+        """Returns the IDs of the tasks (as Task objects) accepted by predicate."""
+        return [task_id for _, task_id, description, status in self.iter_task_rows()
+                if predicate(Task.from_dict({'id': task_id, 'description': description, 'status': status}))]
+
+    def _ids_in_range(self, start, stop=None):
+        """Returns the IDs of the tasks numbered start (inclusive) to stop (exclusive)."""
+        limit = None if stop is None else max(stop - start, 0)
+        return [task_id for _, task_id, _, _ in self.iter_task_rows(None, start, limit)]
+
+    def complete_where(self, predicate):
+        """
+        This function marks every task for which predicate(task) is true as
+        complete and returns how many changed.
+        """
+        return self.complete_ids(self._ids_where(predicate))
+
+    def delete_where(self, predicate):
+        """
+        This function deletes every task for which predicate(task) is true
+        and returns how many were deleted.
+        """
+        return self.delete_ids(self._ids_where(predicate))
+
+    def complete_range(self, start, stop=None):
+        """
+        This function marks the tasks numbered start up to (not including)
+        stop as complete and returns how many changed.
+        """
+        return self.complete_ids(self._ids_in_range(start, stop))
+
+    def delete_range(self, start, stop=None):
+        """
+        This function deletes the tasks numbered start up to (not including)
+        stop and returns how many were deleted.
+        """
+        return self.delete_ids(self._ids_in_range(start, stop))
+
     @abstractmethod
     def data_persistence(self):
         """This function puts the task list into a .json file."""
         pass
 
+    def refresh(self):
+        """
+        This function picks up changes other processes made to the stored
+        tasks. Backends that read storage on every call need not override it.
+        """
+        pass
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups many operations and saves once when the block ends.
+        Backends may also skip per-operation persistence inside the block.
+        """
+        try:
+            yield self
+        finally:
+            self.data_persistence()
+
 
 class TaskManager(TaskManagerInterface):
-    """Main functionalities of the To-Do Application."""
+    """
+    Main functionalities of the To-Do Application.
+
+    Tasks are kept in a dict keyed by task ID. Dicts preserve insertion
+    order, so the same structure gives O(1) lookup and removal by ID and the
+    list order used by task numbers.
+
+    Several processes can share the same snapshot and journal when each is
+    given a StoreLock. The files' version is the snapshot's identity plus
+    how far into the journal this process has read. Before every change the
+    manager takes the exclusive lock and, if the version moved, applies the
+    records other processes appended since (or reloads, if one of them
+    wrote a new snapshot). Changes to different tasks therefore merge, and
+    a change to a task another process already deleted is reported as an
+    invalid ID. Each change still costs only one journal append.
+    """
+
+    def __init__(self, tasks, filename=TASK_FILE, journal=None, store_lock=None, max_id=0):
+        """
+        Initializes task list.
+
+        args:
+            tasks: list of Task objects.
+            filename: path of the task snapshot file.
+            journal: optional TaskJournal receiving one record per change.
+            store_lock: optional StoreLock for sharing the files with other
+                processes, used together with a journal; it should be
+                held while `tasks` is read.
+            max_id: highest task ID known to be issued, e.g. to a task the
+                replayed journal added and deleted again (see App.load_tasks).
+        """
+        self.task_index = self.index_tasks(tasks)
+        self.filename = filename
+        self.index_filename = self._sidecar_filename('.index')
+        self.snapshot_cache = SnapshotCache(filename, self._sidecar_filename('.cache'))
+        self.archive = TaskArchive(self._sidecar_filename('.archive.gz'))
+        # The highest ID issued is recorded whenever a snapshot is written, so
+        # IDs of deleted tasks are not handed out again after a restart.
+        self.ids_filename = self._sidecar_filename('.ids')
+        self.saved_max_id = self._read_max_id()
+        self.next_id = max(max(self.task_index, default=0), self.archive.max_id, self.saved_max_id, max_id) + 1
+        # Saving moves tasks completed this many days ago to the archive (None: never).
+        self.archive_after_days = ARCHIVE_AFTER_DAYS
+        self.journal = journal
+        self.store_lock = store_lock
+        # Kept next to the journal, as that is emptied whenever a snapshot is written.
+        self.history = UndoHistory(
+            TaskJournal(os.path.splitext(journal.filename)[0] + '.history') if journal is not None else None)
+        # Replica (see task_replication) stamping and logging every change, if replicated.
+        self.replica = None
+        self.snapshot_identity = file_identity(filename)
+        # Changes not yet in the snapshot, including journal records replayed on load.
+        self.unsaved_changes = journal.record_count if journal is not None else 0
+        self._search_index = None
+        self._due_queue = None
+        self._sorted_views = None
+        self._archived = None
+        self._batching = False
+        # Changes made through this manager, so batch() can tell whether its block changed anything.
+        self.changes = 0
+        self.autosaver = None
+        # Guards the tasks against a background autosave running mid-change.
+        self.lock = threading.RLock()
+        self.committer = GroupCommitter(self._save_snapshot)
+
+    @property
+    def version(self):
+        """Returns (snapshot identity, journal position) for the tasks held."""
+        return self.snapshot_identity, self.journal.position if self.journal is not None else 0
+
+    @property
+    def is_dirty(self):
+        """Returns True when there are changes the snapshot does not have yet."""
+        return self.unsaved_changes > 0
+
+    def enable_autosave(self, delay=None, max_delay=None):
+        """
+        Starts a background thread that saves once changes have been quiet
+        for `delay` seconds (see autosave.AutoSaver).
+        """
+        options = {name: value for name, value in (('delay', delay), ('max_delay', max_delay))
+                   if value is not None}
+        self.autosaver = AutoSaver(self.data_persistence, **options).start()
+
+    def disable_autosave(self):
+        """Saves pending changes and stops the autosave thread."""
+        if self.autosaver is not None:
+            self.autosaver.stop()
+            self.autosaver = None
+
+    @property
+    def task_list(self):
+        """Returns the tasks in insertion order as a list."""
+        return list(self.task_index.values())
+
+    def _sidecar_filename(self, extension):
+        """Returns the path of a file kept next to the snapshot, e.g. To_Do_List.index."""
+        return os.path.splitext(self.filename)[0] + extension
+
+    @staticmethod
+    def index_tasks(tasks):
+        """
+        Returns an insertion-ordered ID -> Task dict built in one pass over
+        any iterable of tasks, giving an ID to any task saved before tasks
+        had one.
+        """
+        task_index = {}
+        placeholder = 0
+        for task in tasks:
+            if task._id is None:
+                # Real IDs are positive; number these once the maximum is known.
+                placeholder -= 1
+                task_index[placeholder] = task
+            else:
+                task_index[task._id] = task
+        if not placeholder:
+            return task_index
+
+        next_id = max(max(task_index), 0) + 1
+        numbered_index = {}
+        for task_id, task in task_index.items():
+            if task_id < 0:
+                task._id = task_id = next_id
+                next_id += 1
+            numbered_index[task_id] = task
+        return numbered_index
+
+    @staticmethod
+    def record_ids(record):
+        """Returns the task IDs a journal record names (none for position-addressed records)."""
+        if 'tasks' in record:
+            return [task_dict['id'] for task_dict in record['tasks']]
+        return [task_id for task_id in record.get('ids', [record.get('id')]) if task_id is not None]
+
+    @staticmethod
+    def apply_record(task_index, record):
+        """
+        Applies a single journal record to an ID -> Task dict. Replaying is
+        idempotent: a record may meet tasks it already changed, e.g. when a
+        crash struck between writing a snapshot and emptying the journal,
+        or tasks lost from a damaged snapshot. Changes to tasks that are not
+        there are skipped. Returns how many task IDs were skipped.
+        """
+        op = record['op']
+        if op == 'add':
+            # add_tasks() writes one record listing a whole batch.
+            for task_dict in record.get('tasks', (record,)):
+                task = Task.from_dict(task_dict)
+                if task._id is None:
+                    task._id = max(task_index, default=0) + 1
+                task_index[task._id] = task
+            return 0
+        if op == 'restore':
+            # Undoing a delete: the tasks keep their IDs but go back at the
+            # end of the list, so restoring costs nothing per other task.
+            for task_dict in record['tasks']:
+                task = Task.from_dict(task_dict)
+                task_index[task._id] = task
+            return 0
+
+        # Bulk operations write a single record listing every ID they changed.
+        task_ids = record.get('ids')
+        if task_ids is None:
+            task_id = record.get('id')
+            if task_id is None:
+                # Journals written before tasks had IDs address them by position.
+                if not 0 <= record['task'] < len(task_index):
+                    return 1
+                task_id = next(itertools.islice(task_index, record['task'], None))
+            task_ids = [task_id]
+        if op in ('delete', 'archive'):
+            # Archived tasks are already in the archive file; they only leave the list.
+            removed = [task_index.pop(task_id, None) for task_id in task_ids]
+            return removed.count(None)
+        tasks = [task_index[task_id] for task_id in task_ids if task_id in task_index]
+        if op == 'complete':
+            for task in tasks:
+                task._complete = True
+                task._completed_on = record.get('on')
+        elif op == 'reopen':
+            for task in tasks:
+                task._complete = False
+                task._completed_on = None
+        elif op == 'update':
+            for task in tasks:
+                if 'priority' in record:
+                    task._priority = record['priority']
+                if 'due' in record:
+                    task._due = record['due']
+        return len(task_ids) - len(tasks)
+
+    @contextmanager
+    def _mutation(self):
+        """
+        Holds the tasks for a change. When shared with other processes, the
+        store is locked exclusively and caught up with their changes first.
+        """
+        with self.lock:
+            if self.store_lock is None:
+                yield
+                return
+            with self.store_lock.exclusive():
+                self._sync()
+                yield
+
+    def refresh(self):
+        """Picks up changes other processes appended to the shared files."""
+        if self.store_lock is None:
+            return
+        with self.lock, self.store_lock.shared():
+            self._sync()
+
+    def _sync(self):
+        """
+        Brings the tasks up to the files' current version: a new snapshot
+        means reloading, otherwise only the new journal records are applied.
+        The caller holds the store lock.
+        """
+        journal = self.journal
+        if (file_identity(self.filename) != self.snapshot_identity
+                or journal is not None and (journal.size() < journal.position or journal.replaced())):
+            self._reload()
+        elif journal is not None:
+            for record in journal.replay(journal.position):
+                self._merge(record)
+        self.history.sync()
+        if self.replica is not None:
+            self.replica.catch_up()
+
+    def _reload(self):
+        """Reloads the snapshot and replays the whole journal over it."""
+        self.task_index = self.index_tasks(read_snapshot(self.filename, self.snapshot_cache))
+        max_id = self.saved_max_id = max(self.saved_max_id, self._read_max_id())
+        if self.journal is not None:
+            for record in self.journal.replay():
+                self.apply_record(self.task_index, record)
+                max_id = max([max_id, *self.record_ids(record)])
+        self.snapshot_identity = file_identity(self.filename)
+        self.next_id = max(self.next_id, max(self.task_index, default=0) + 1, max_id + 1)
+        self.unsaved_changes = self.journal.record_count if self.journal is not None else 0
+        self._search_index = None
+        self._due_queue = None
+        self._sorted_views = None
+        self._archived = None
+
+    def _merge(self, record):
+        """Applies a journal record written by another process."""
+        self._apply_change(record)
+        self.unsaved_changes += 1
+
+    def _apply_change(self, record):
+        """
+        Applies a journal record to the tasks, keeping the search index,
+        due queue and sorted views in step with it.
+        """
+        op = record['op']
+        if 'tasks' in record:
+            changed_ids = [task_dict['id'] for task_dict in record['tasks']]
+        elif op == 'add':
+            changed_ids = [record.get('id')]
+        else:
+            changed_ids = record.get('ids', [record.get('id')])
+        for changed_id in changed_ids:
+            task = self.task_index.get(changed_id)
+            if task is None:
+                continue
+            self._unschedule(task)
+            self._leave_views(task)
+            if self._search_index is not None and op in ('delete', 'archive'):
+                self._search_index.remove(changed_id, task._description)
+        self.apply_record(self.task_index, record)
+        if self._sorted_views is not None:
+            for changed_id in changed_ids:
+                if changed_id in self.task_index:
+                    self._sorted_views.add(self.task_index[changed_id])
+        if op in ('add', 'restore'):
+            self.next_id = max(self.next_id, max(changed_ids) + 1)
+            if self._search_index is not None:
+                for changed_id in changed_ids:
+                    self._search_index.add(changed_id, self.task_index[changed_id]._description)
+        if self._due_queue is not None and op in ('add', 'update', 'reopen', 'restore'):
+            for changed_id in changed_ids:
+                self._due_queue.push(changed_id)
+
+    def _journal(self, record, inverse=None):
+        """
+        Marks the tasks dirty, then appends a record to the journal and
+        compacts it when due, through the autosave thread when there is one.
+        A change given with its inverse record can be undone (see undo()).
+        """
+        if inverse is not None:
+            self.history.record(record, inverse, persist=not self._batching)
+        if self.replica is not None:
+            self.replica.record_local(record)
+        self.changes += 1
+        self.unsaved_changes += 1
+        if self.autosaver is not None:
+            self.autosaver.notify()
+        if self.journal is None or self._batching:
+            return
+        self.journal.append(record)
+        if self.journal.needs_compaction():
+            if self.autosaver is not None:
+                # The autosave thread rewrites the snapshot, so the change
+                # that crossed the threshold does not wait for it.
+                self.autosaver.save_soon()
+            else:
+                # The caller holds self.lock, so write directly rather than
+                # queueing behind a group commit that may be waiting for it.
+                self._write_snapshot()
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups many operations: nothing is journaled inside the block and a
+        single snapshot (which also empties the journal) is written at the
+        end, unless nothing in the block changed. When the files are
+        shared, each change is still locked and journaled on its own, so
+        reads in the block (refresh() takes only the shared lock) and other
+        processes are not held up for the whole block.
+        """
+        changes = self.changes
+        self._batching = self.store_lock is None
+        try:
+            yield self
+        finally:
+            self._batching = False
+            self.history.flush()
+            if self.changes != changes:
+                self.data_persistence()
 
-    def __init__(self, tasks):
-        """Initializes task list."""
-        self.task_list = tasks
+    def _task_id_at(self, task_number):
+        """Returns the ID of the task at a list position; raises IndexError."""
+        count = len(self.task_index)
+        if task_number < 0:
+            task_number += count
+        if not 0 <= task_number < count:
+            raise IndexError(task_number)
+        return next(itertools.islice(self.task_index, task_number, None))
 
     def add_task(self, task_obj):
-        """Adds a task to the task list."""
-        self.task_list.append(task_obj)
+        """Adds a task to the task list, giving it the next free ID."""
+        with self._mutation():
+            if task_obj._id is None:
+                task_obj._id = self.next_id
+            self.next_id = max(self.next_id, task_obj._id + 1)
+            self.task_index[task_obj._id] = task_obj
+            if self._search_index is not None:
+                self._search_index.add(task_obj._id, task_obj._description)
+            if self._due_queue is not None:
+                self._due_queue.push(task_obj._id)
+            self._enter_views(task_obj)
+            self._journal({'op': 'add', **task_obj.to_dict()}, {'op': 'delete', 'ids': [task_obj._id]})
 
-    def list_tasks(self):
-        """Lists all tasks in the list."""
-        print()
-        for i, task in enumerate(self.task_list):
-            specific_task = task.to_dict()
-            print(f"Task {i}: {specific_task['description']} | Status: {specific_task['status']}")
-        print()
+    def add_tasks(self, tasks):
+        """
+        Adds every task of an iterable, giving each the next free ID. The
+        iterable is consumed ADD_BATCH tasks at a time and each batch is
+        added under one lock and journaled as one record, so a stream of
+        any length can be added with only two batches read ahead. Adding a
+        single batch can be undone as one change; adding more clears the
+        undo history instead. Returns how many were added.
+        """
+        tasks = iter(tasks)
+        count = 0
+        batch = list(itertools.islice(tasks, ADD_BATCH))
+        while batch:
+            following = list(itertools.islice(tasks, ADD_BATCH))
+            with self._mutation():
+                task_index = self.task_index
+                for task_obj in batch:
+                    task_obj._id = self.next_id
+                    self.next_id += 1
+                    task_index[task_obj._id] = task_obj
+                    if self._search_index is not None:
+                        self._search_index.add(task_obj._id, task_obj._description)
+                    if self._due_queue is not None:
+                        self._due_queue.push(task_obj._id)
+                    self._enter_views(task_obj)
+                inverse = None
+                if not count and not following:
+                    inverse = {'op': 'delete', 'ids': [task_obj._id for task_obj in batch]}
+                elif not count:
+                    self.history.clear(persist=not self._batching)
+                self._journal({'op': 'add', 'tasks': [task_obj.to_dict() for task_obj in batch]}, inverse)
+            count += len(batch)
+            batch = following
+        return count
+
+    def get_task(self, task_id):
+        """Returns the task with the given ID, or None."""
+        return self.task_index.get(task_id)
+
+    def _index_signature(self):
+        """Identifies the saved state a persisted search index belongs to."""
+        signature = file_signature(self.filename)
+        return signature and signature + [len(self.task_index)]
+
+    @property
+    def search_index(self):
+        """
+        Returns the description index. It is loaded from disk (or built
+        from the tasks) on first use, so startup does not pay for it.
+        """
+        if self._search_index is None:
+            if not self.unsaved_changes:
+                self._search_index = SearchIndex.load(self.index_filename, self._index_signature())
+            if self._search_index is None:
+                self._search_index = SearchIndex.build(
+                    (task._id, task._description) for task in self.task_index.values())
+        return self._search_index
+
+    def save_search_index(self):
+        """
+        Writes the search index next to the snapshot, so later runs (and
+        searches across projects) need not build it. Nothing is written
+        while there are unsaved changes, as the index would not match the file.
+        """
+        if not self.is_dirty:
+            self.search_index.save(self.index_filename, self._index_signature())
+
+    def search(self, query):
+        """
+        Returns the tasks, in ID order, whose description contains every
+        word of the query. A word ending in '*' matches as a prefix.
+        """
+        with self.lock:
+            return [self.task_index[task_id] for task_id in sorted(self.search_index.search(query))]
+
+    def iter_task_rows(self, status=None, offset=0, limit=None):
+        """
+        Lazily yields (task_number, task_id, description, status) rows in
+        list order, optionally only those with the given status. The page's
+        tasks are picked under the lock before the first row is yielded, so
+        a background save archiving tasks meanwhile cannot break it.
+        """
+        stop = None if limit is None else offset + limit
+        with self.lock:
+            if status is None:
+                # Skip to the page inside islice instead of row by row.
+                page = list(enumerate(itertools.islice(self.task_index.values(), offset, stop), offset))
+            else:
+                complete = status == 'Complete'
+                page = list(itertools.islice(
+                    ((i, task) for i, task in enumerate(self.task_index.values()) if task._complete == complete),
+                    offset, stop))
+        for i, task in page:
+            yield i, task._id, task._description, task.status
+
+    def iter_task_dicts(self):
+        """Lazily yields every task, in list order, with all its fields (see Task.to_dict)."""
+        with self.lock:
+            tasks = list(self.task_index.values())
+        for task in tasks:
+            yield task.to_dict()
 
     def mark_as_complete(self, task_number):
         """Marks a specific task as complete."""
         try:
-            self.task_list[task_number].mark_complete()
+            task_id = self._task_id_at(task_number)
         except IndexError:
             print("Warning: Invalid Task Number!")
+            return
+        self.mark_as_complete_by_id(task_id)
+
+    def mark_as_complete_by_id(self, task_id):
+        """Marks the task with the given ID as complete."""
+        with self._mutation():
+            task = self.task_index.get(task_id)
+            if task is None:
+                print("Warning: Invalid Task ID!")
+                return
+            self._unschedule(task)
+            self._leave_views(task)
+            completed = task.mark_complete()
+            self._enter_views(task)
+            if completed:
+                self._journal({'op': 'complete', 'id': task_id, 'on': task._completed_on},
+                              {'op': 'reopen', 'ids': [task_id]})
 
     def delete_task(self, task_number):
         """Deletes a specific task from the list."""
         try:
-            del self.task_list[task_number]
+            task_id = self._task_id_at(task_number)
         except IndexError:
             print("Warning: Invalid Task Number!")
+            return
+        self.delete_task_by_id(task_id)
+
+    def delete_task_by_id(self, task_id):
+        """Deletes the task with the given ID without renumbering the others."""
+        with self._mutation():
+            task = self.task_index.pop(task_id, None)
+            if task is None:
+                print("Warning: Invalid Task ID!")
+                return
+            if self._search_index is not None:
+                self._search_index.remove(task_id, task._description)
+            self._unschedule(task)
+            self._leave_views(task)
+            self._journal({'op': 'delete', 'id': task_id}, {'op': 'restore', 'tasks': [task.to_dict()]})
+
+    def _existing_ids(self, task_ids):
+        """Returns the given IDs that name a task, warning about the others."""
+        task_index = self.task_index
+        found = []
+        missing = []
+        for task_id in dict.fromkeys(task_ids):
+            (found if task_id in task_index else missing).append(task_id)
+        if missing:
+            print(f"Warning: Invalid Task IDs {', '.join(map(str, missing))}!")
+        return found
+
+    def complete_ids(self, task_ids):
+        """
+        Marks the tasks with the given IDs complete in one pass and journals
+        them as a single record. Returns how many changed.
+        """
+        with self._mutation():
+            task_index = self.task_index
+            today = date.today().isoformat()
+            changed = []
+            for task_id in self._existing_ids(task_ids):
+                task = task_index[task_id]
+                if not task._complete:
+                    self._unschedule(task)
+                    self._leave_views(task)
+                    task._complete = True
+                    task._completed_on = today
+                    self._enter_views(task)
+                    changed.append(task_id)
+            if changed:
+                self._journal({'op': 'complete', 'ids': changed, 'on': today}, {'op': 'reopen', 'ids': changed})
+            return len(changed)
+
+    def delete_ids(self, task_ids):
+        """
+        Deletes the tasks with the given IDs in one pass and journals them
+        as a single record. Returns how many were deleted.
+        """
+        with self._mutation():
+            deleted = self._existing_ids(task_ids)
+            self._remove_tasks(deleted)
+            return len(deleted)
+
+    def _remove_tasks(self, task_ids):
+        """Removes existing tasks from the index and journals one record for them."""
+        if not task_ids:
+            return
+        task_index = self.task_index
+        search_index = self._search_index
+        removed = []
+        for task_id in task_ids:
+            task = task_index.pop(task_id)
+            if search_index is not None:
+                search_index.remove(task_id, task._description)
+            self._unschedule(task)
+            self._leave_views(task)
+            removed.append(task.to_dict())
+        self._journal({'op': 'delete', 'ids': task_ids}, {'op': 'restore', 'tasks': removed})
+
+    def complete_where(self, predicate):
+        """
+        Marks every task for which predicate(task) is true as complete, in
+        a single pass over the tasks. Returns how many changed.
+        """
+        with self._mutation():
+            today = date.today().isoformat()
+            changed = []
+            for task_id, task in self.task_index.items():
+                if not task._complete and predicate(task):
+                    self._unschedule(task)
+                    self._leave_views(task)
+                    task._complete = True
+                    task._completed_on = today
+                    self._enter_views(task)
+                    changed.append(task_id)
+            if changed:
+                self._journal({'op': 'complete', 'ids': changed, 'on': today}, {'op': 'reopen', 'ids': changed})
+            return len(changed)
+
+    def delete_where(self, predicate):
+        """
+        Deletes every task for which predicate(task) is true, selecting them
+        in a single pass over the tasks. Returns how many were deleted.
+        """
+        with self._mutation():
+            deleted = [task_id for task_id, task in self.task_index.items() if predicate(task)]
+            self._remove_tasks(deleted)
+            return len(deleted)
+
+    def _due_key(self, task_id):
+        """Returns the (due, rank) a task is queued under, or None if it is not queued."""
+        task = self.task_index.get(task_id)
+        if task is None or task._complete or task._due is None:
+            return None
+        return task._due, NO_PRIORITY if task._priority is None else task._priority
+
+    def _unschedule(self, task):
+        """Notes that a task's due-queue entry is about to go stale."""
+        if self._due_queue is not None and task._due is not None and not task._complete:
+            self._due_queue.invalidate()
+
+    @property
+    def due_queue(self):
+        """
+        Returns the queue of incomplete tasks with a due date. It is built
+        on first use and rebuilt once it holds mostly stale entries.
+        """
+        if self._due_queue is None or self._due_queue.needs_rebuild():
+            self._due_queue = DueQueue.build(self._due_key, self.task_index)
+        return self._due_queue
+
+    def _leave_views(self, task):
+        """Takes a task out of the sorted views before it changes or leaves the list."""
+        if self._sorted_views is not None:
+            self._sorted_views.remove(task)
+
+    def _enter_views(self, task):
+        """Lists a new or changed task in the sorted views."""
+        if self._sorted_views is not None:
+            self._sorted_views.add(task)
+
+    @property
+    def sorted_views(self):
+        """
+        Returns the sorted views of the tasks (see SORT_KEYS). They are
+        built on first use and kept up to date by every change after that.
+        """
+        if self._sorted_views is None:
+            self._sorted_views = SortedViews(SORT_KEYS, self.task_index.values())
+        return self._sorted_views
+
+    def sorted_tasks(self, view, start=None, stop=None, limit=None):
+        """
+        Returns tasks in the order of a sorted view, from `start` up to (not
+        including) `stop`, in O(log n + k) for k tasks returned.
+
+        args:
+            view: 'description' (ignoring case), 'created' (task ID order)
+                or 'status' (incomplete tasks first).
+            start, stop: optional bounds: text compared with descriptions,
+                task IDs, or 'Incomplete' / 'Complete'.
+            limit: most tasks to return.
+        """
+        def bound(value):
+            if value is None:
+                return None
+            if view == 'description':
+                return (value.casefold(),)
+            if view == 'status':
+                return (value == 'Complete',)
+            return (value,)
+
+        with self.lock:
+            keys = itertools.islice(self.sorted_views.irange(view, bound(start), bound(stop)), limit)
+            return [self.task_index[key[-1]] for key in keys]
+
+    def _update_task(self, task_id, changes):
+        """Changes a task's priority and/or due date and journals the change."""
+        with self._mutation():
+            task = self.task_index.get(task_id)
+            if task is None:
+                print("Warning: Invalid Task ID!")
+                return False
+            self._unschedule(task)
+            previous = {'op': 'update', 'id': task_id}
+            previous.update((field, getattr(task, '_' + field)) for field in changes)
+            record = {'op': 'update', 'id': task_id, **changes}
+            self.apply_record(self.task_index, record)
+            if self._due_queue is not None:
+                self._due_queue.push(task_id)
+            self._journal(record, previous)
+            return True
+
+    def set_due(self, task_id, due):
+        """Sets (or with None clears) a task's YYYY-MM-DD due date."""
+        return self._update_task(task_id, {'due': None if due is None else parse_due(due)})
+
+    def set_priority(self, task_id, priority):
+        """Sets (or with None clears) a task's priority; 1 is the most urgent."""
+        return self._update_task(task_id, {'priority': priority})
+
+    def next_due(self, count=NEXT_COUNT):
+        """
+        Returns up to `count` incomplete tasks with a due date, soonest
+        first and, on the same day, most urgent first.
+        """
+        with self.lock:
+            return [self.task_index[task_id]
+                    for task_id in itertools.islice(self.due_queue.iter_task_ids(), count)]
+
+    def overdue(self, today=None):
+        """Returns the incomplete tasks due before today (a date), soonest first."""
+        today = (today or date.today()).isoformat()
+        with self.lock:
+            tasks = (self.task_index[task_id] for task_id in self.due_queue.iter_task_ids())
+            return list(itertools.takewhile(lambda task: task._due < today, tasks))
+
+    def _move_to_archive(self, older_than_days, today):
+        """
+        Appends the tasks completed at least `older_than_days` days before
+        `today` to the archive and drops them from the list, in one pass.
+        A completed task without a completion date (saved before tasks had
+        one) is dated today, so it is archived once the threshold passes.
+        Returns the archived IDs.
+        """
+        cutoff = (today - timedelta(days=older_than_days)).isoformat()
+        stamp = today.isoformat()
+        archived = []
+        for task in self.task_index.values():
+            if task._complete:
+                if task._completed_on is None:
+                    task._completed_on = stamp
+                if task._completed_on <= cutoff:
+                    archived.append(task)
+        if not archived:
+            return []
+        # The archive is on disk before the tasks leave the list, so a crash
+        # in between at worst archives a task twice (see TaskArchive.load).
+        self.archive.append(task.to_dict() for task in archived)
+        if self._archived is not None:
+            self._archived.update((task._id, task) for task in archived)
+        for task in archived:
+            del self.task_index[task._id]
+            if self._search_index is not None:
+                self._search_index.remove(task._id, task._description)
+            self._leave_views(task)
+        return [task._id for task in archived]
+
+    def archive_completed(self, older_than_days=ARCHIVE_AFTER_DAYS, today=None):
+        """
+        Moves tasks completed at least `older_than_days` days ago to the
+        compressed archive file. Returns how many were archived.
+        """
+        with self._mutation():
+            archived = self._move_to_archive(older_than_days, today or date.today())
+            if archived:
+                self._journal({'op': 'archive', 'ids': archived})
+            return len(archived)
+
+    def archived_tasks(self):
+        """
+        Returns the archived tasks, oldest archived first. The archive file
+        is read on the first call only.
+        """
+        with self.lock:
+            if self._archived is None:
+                self._archived = {task_id: Task.from_dict(task_dict)
+                                  for task_id, task_dict in self.archive.load().items()}
+            return list(self._archived.values())
+
+    def _applicable(self, record):
+        """
+        Returns the part of an undo or redo record that still applies, or
+        None: tasks deleted or archived since are skipped, as are tasks
+        already in the state the record would put them in.
+        """
+        task_index = self.task_index
+        op = record['op']
+        if 'tasks' in record:
+            tasks = [task_dict for task_dict in record['tasks'] if task_dict['id'] not in task_index]
+            return {'op': op, 'tasks': tasks} if tasks else None
+        if op == 'add':
+            return None if record['id'] in task_index else record
+        task_ids = [task_id for task_id in record.get('ids', [record.get('id')]) if task_id in task_index]
+        if op == 'complete':
+            task_ids = [task_id for task_id in task_ids if not task_index[task_id]._complete]
+        elif op == 'reopen':
+            task_ids = [task_id for task_id in task_ids if task_index[task_id]._complete]
+        if not task_ids:
+            return None
+        record = {field: value for field, value in record.items() if field != 'id'}
+        record['ids'] = task_ids
+        return record
+
+    def _step_history(self, take):
+        """Applies the record take() pulls from the history; see undo() and redo()."""
+        with self._mutation():
+            record = take(persist=not self._batching)
+            if record is None:
+                return False
+            record = self._applicable(record)
+            if record is None:
+                print("Message: The tasks that change touched have since been deleted or archived.")
+            else:
+                self._apply_change(record)
+                self._journal(record)
+            return True
+
+    @contextmanager
+    def locked(self):
+        """
+        Holds the tasks, as a single change does, across a group of changes
+        made from outside the manager (e.g. by task_replication).
+        """
+        with self._mutation():
+            yield self
+
+    def apply_replicated(self, record):
+        """
+        Applies a journal record received from another replica. The change
+        is journaled but cannot be undone. Tasks it adds (given without IDs)
+        get the next free IDs. Returns the IDs the change applied to.
+        """
+        with self._mutation():
+            if 'tasks' in record:
+                record = {'op': record['op'], 'tasks': [{**task_dict, 'id': self.next_id + i}
+                                                        for i, task_dict in enumerate(record['tasks'])]}
+            record = self._applicable(record)
+            if record is None:
+                return []
+            self._apply_change(record)
+            self._journal(record)
+            if 'tasks' in record:
+                return [task_dict['id'] for task_dict in record['tasks']]
+            return record['ids']
+
+    def undo(self):
+        """
+        Takes back the latest change that has not been undone. Returns
+        False when there is nothing to undo.
+        """
+        return self._step_history(self.history.undo)
+
+    def redo(self):
+        """Makes the latest undone change again. Returns False when there is nothing to redo."""
+        return self._step_history(self.history.redo)
 
     def data_persistence(self):
-        """Stores the tasks collected in a .json file."""
-        with open('To_Do_List.json', 'w') as json_file:
-            list_of_dicts = [task.to_dict() for task in self.task_list]
-            json.dump(list_of_dicts, json_file, indent=5)
+        """
+        Stores the tasks collected in a .json file. With a journal attached
+        this is the compaction step: the fresh snapshot replaces the journal.
+
+        Saves requested by several threads at once are grouped so that one
+        write and fsync serves all of them (see group_commit). Returns True
+        when the file was written.
+        """
+        return self.committer.request()
+
+    @staticmethod
+    def write_json(json_file, tasks):
+        """
+        Writes tasks in the To_Do_List.json layout, byte for byte what
+        json.dump(..., indent=5) produces but using the C string encoder
+        rather than the pure-Python indenting encoder.
+        """
+        encode = json.encoder.encode_basestring_ascii
+
+        def format_entry(task):
+            if task._priority is not None or task._due is not None:
+                # Tasks with a priority or due date are rare enough to leave to json.dumps.
+                return '     ' + json.dumps(task.to_dict(), indent=5).replace('\n', '\n     ')
+            if task._completed_on is not None:
+                return SNAPSHOT_COMPLETED_ENTRY.format(task._id, encode(task._description), task._completed_on)
+            return SNAPSHOT_ENTRY.format(task._id, encode(task._description), task.status)
+
+        entries = map(format_entry, tasks)
+        first_chunk = list(itertools.islice(entries, WRITE_CHUNK_ROWS))
+        if not first_chunk:
+            json_file.write('[]')
+            return
+        json_file.write('[\n' + ',\n'.join(first_chunk))
+        while True:
+            chunk = list(itertools.islice(entries, WRITE_CHUNK_ROWS))
+            if not chunk:
+                break
+            json_file.write(',\n' + ',\n'.join(chunk))
+        json_file.write('\n]')
+
+    def _write_snapshot(self):
+        """
+        Writes the snapshot crash-safely: the tasks go to a temporary file
+        that is fsync'ed and then renamed over the old file, and the
+        directory is fsync'ed so the rename itself is durable. A crash at
+        any point leaves either the old or the new list, never a truncated
+        one. Nothing is written when the manager is clean and the file exists.
+        Shared files are caught up first, so other processes' journal
+        records end up in the snapshot rather than being dropped. Tasks due
+        for archiving (see archive_after_days) are moved out first.
+        """
+        with self._mutation():
+            if self.archive_after_days is not None and self._move_to_archive(self.archive_after_days, date.today()):
+                self.unsaved_changes += 1
+            if not self.is_dirty and os.path.exists(self.filename):
+                return False
+            temporary = self.filename + '.tmp'
+            self._write_temporary(temporary, self.task_index.values())
+            os.replace(temporary, self.filename)
+            fsync_directory(self.filename)
+            self.snapshot_identity = file_identity(self.filename)
+            self.snapshot_cache.save([task.to_row() for task in self.task_index.values()])
+            self._record_max_id()
+            if self.journal is not None:
+                self.journal.reset()
+            self.unsaved_changes = 0
+            if self._search_index is not None:
+                self._search_index.save(self.index_filename, self._index_signature())
+            return True
+
+    def _read_max_id(self):
+        """Returns the highest task ID recorded as issued (0 if none is)."""
+        try:
+            with open(self.ids_filename) as ids_file:
+                return json.load(ids_file)['max_id']
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    def _record_max_id(self):
+        """
+        Records the highest task ID issued so far, if it is above the one
+        recorded. Called before the journal, whose records show the IDs of
+        tasks added since the last snapshot, is emptied.
+        """
+        max_id = self.next_id - 1
+        if max_id <= self.saved_max_id:
+            return
+        temporary = self.ids_filename + '.tmp'
+        with open(temporary, 'w') as ids_file:
+            json.dump({'max_id': max_id}, ids_file)
+            ids_file.flush()
+            os.fsync(ids_file.fileno())
+        os.replace(temporary, self.ids_filename)
+        self.saved_max_id = max_id
+
+    def _write_temporary(self, temporary, tasks):
+        """Writes tasks to a temporary snapshot file and fsyncs it."""
+        with open(temporary, 'w') as json_file:
+            self.write_json(json_file, tasks)
+            json_file.flush()
+            os.fsync(json_file.fileno())
+
+    def _save_snapshot(self):
+        """
+        Writes the snapshot for data_persistence() like _write_snapshot(),
+        but holds the tasks (and shared files) only to copy them and to
+        install the file: formatting and fsyncing a large list happen while
+        changes go on. The journal records of those changes are kept (see
+        TaskJournal.discard); should a crash leave the whole old journal,
+        replaying it onto the new snapshot is harmless (see apply_record).
+        The group committer runs one save at a time in this process; the
+        temporary file is named after the process, as other processes
+        sharing the files may be saving too. A save that finds a newer
+        snapshot in place when it is done drops its own.
+        """
+        with self._mutation():
+            if self.archive_after_days is not None and self._move_to_archive(self.archive_after_days, date.today()):
+                self.unsaved_changes += 1
+            if not self.is_dirty and os.path.exists(self.filename):
+                return False
+            rows = [task.to_row() for task in self.task_index.values()]
+            identity = self.snapshot_identity
+            saved_changes = self.unsaved_changes
+            journal = self.journal
+            saved_journal = (journal.position, journal.record_count) if journal is not None else None
+
+        temporary = f"{self.filename}.{os.getpid()}.tmp"
+        self._write_temporary(temporary, map(Task.from_row, rows))
+
+        with self._mutation():
+            if self.snapshot_identity != identity:
+                # A snapshot taken after the copy was written meanwhile.
+                os.remove(temporary)
+                return True
+            os.replace(temporary, self.filename)
+            fsync_directory(self.filename)
+            self.snapshot_identity = identity = file_identity(self.filename)
+            self._record_max_id()
+            if journal is not None:
+                journal.discard(*saved_journal)
+            self.unsaved_changes -= saved_changes
+            if self._search_index is not None and not self.is_dirty:
+                self._search_index.save(self.index_filename, self._index_signature())
+        self.snapshot_cache.save(rows, identity)
+        return True
+
+
+class BinaryTaskManager(TaskManager):
+    """
+    TaskManager persisted in a BinaryTaskStore instead of To_Do_List.json.
+
+    Every change is written through to the store as it happens: completing
+    or deleting a task flips one flags byte in place and adding a task
+    appends one record. Saving therefore never rewrites the whole list.
+    The binary format has no fields for priorities, due dates and
+    completion dates, so they are kept in memory only, as is the undo
+    history. Undoing a completion or deletion rewrites the store.
+    """
+
+    def __init__(self, store):
+        """
+        Loads the tasks from a store.
+
+        args:
+            store: an open BinaryTaskStore.
+        """
+        self.store = store
+        self.slots = {}
+        super().__init__(self._read_store(), store.filename)
+
+    def _sidecar_filename(self, extension):
+        """
+        Names sidecars after the whole store file name, e.g.
+        To_Do_List.bin.archive.gz, so they never collide with those of the
+        To_Do_List.json list next to it.
+        """
+        return self.filename + extension
+
+    def _read_store(self):
+        """
+        Yields the store's live tasks, remembering which slot holds each.
+        Descriptions stay in the memory map until a task's is first read.
+        """
+        for slot, task_id, complete in self.store.iter_records():
+            self.slots[task_id] = slot
+            yield StoredTask(self.store, slot, task_id, complete)
+
+    def _journal(self, record, inverse=None):
+        """Writes a single change through to the store."""
+        self.changes += 1
+        if inverse is not None:
+            self.history.record(record, inverse)
+        op = record['op']
+        if op == 'add':
+            for task_dict in record.get('tasks', (record,)):
+                complete = task_dict['status'] == 'Complete'
+                self.slots[task_dict['id']] = self.store.append(task_dict['id'], task_dict['description'], complete)
+        elif op == 'complete':
+            for task_id in record.get('ids', [record.get('id')]):
+                self.store.mark_complete(self.slots[task_id])
+        elif op in ('delete', 'archive'):
+            for task_id in record.get('ids', [record.get('id')]):
+                self.store.mark_deleted(self.slots.pop(task_id))
+        elif op in ('reopen', 'restore'):
+            # Only undo writes these; the store has no in-place way to make them.
+            self.compact()
+            return
+        if self.store.needs_compaction():
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrites the store without deleted records. Every live description
+        is read first, so StoredTasks do not depend on their old slots.
+        """
+        tasks = self.task_index.values()
+        self.store.rewrite((task._id, task._description, task._complete) for task in tasks)
+        self.slots = {task_id: slot for slot, task_id in enumerate(self.task_index)}
+
+    def data_persistence(self):
+        """Changes are already in the file; this only forces them to disk."""
+        self.store.flush()
+
+
+class SQLiteTaskManager(TaskManagerInterface):
+    """
+    Task manager backed by a SQLite database instead of an in-memory list.
+
+    Every operation touches only the rows it needs, so startup cost does not
+    depend on how many tasks are stored. Task numbers keep the same meaning
+    as in TaskManager: the position of the task in insertion order.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            description TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'Incomplete'
+        );
+        -- Filtered listings read one status in ID order straight off this index.
+        CREATE INDEX IF NOT EXISTS tasks_status_id ON tasks (status, id);
+        DROP INDEX IF EXISTS tasks_status;
+        -- Searches match words anywhere in a description, which an index on
+        -- the whole description cannot answer; drop it from older databases.
+        DROP INDEX IF EXISTS tasks_description;
+    """
+    INSERT_TASK = "INSERT INTO tasks (id, description, status) VALUES (?, ?, ?)"
+    SELECT_ID_AT = "SELECT id FROM tasks ORDER BY id LIMIT 1 OFFSET ?"
+    SELECT_ALL = "SELECT id, description, status FROM tasks ORDER BY id LIMIT ? OFFSET ?"
+    SELECT_BY_STATUS = "SELECT id, description, status FROM tasks WHERE status = ? ORDER BY id LIMIT ? OFFSET ?"
+    COUNT_BETWEEN = "SELECT count(*) FROM tasks WHERE id >= ? AND id < ?"
+    COMPLETE_TASK = "UPDATE tasks SET status = 'Complete' WHERE id = ? AND status = 'Incomplete'"
+    DELETE_TASK = "DELETE FROM tasks WHERE id = ?"
+    SELECT_EXISTS = "SELECT 1 FROM tasks WHERE id = ?"
+    COUNT_TASKS = "SELECT count(*) FROM tasks"
+
+    def __init__(self, database=DATABASE_FILE):
+        """
+        Opens (and creates, if needed) the task database.
+
+        args:
+            database: path of the SQLite file, or ':memory:'.
+        """
+        # Imported here so the JSON backend does not pay for loading it.
+        import sqlite3
+
+        self.connection = sqlite3.connect(database)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+
+    def _task_id(self, task_number):
+        """Translates a task number into a row id; raises IndexError if absent."""
+        if task_number < 0:
+            task_number += self.count_tasks()
+        row = None
+        if task_number >= 0:
+            row = self.connection.execute(self.SELECT_ID_AT, (task_number,)).fetchone()
+        if row is None:
+            raise IndexError(task_number)
+        return row[0]
+
+    def count_tasks(self):
+        """Returns the number of stored tasks."""
+        return self.connection.execute(self.COUNT_TASKS).fetchone()[0]
+
+    def add_task(self, task_obj):
+        """Inserts a task into the database."""
+        task = task_obj.to_dict()
+        with self.connection:
+            cursor = self.connection.execute(
+                self.INSERT_TASK, (task['id'], task['description'], task['status']))
+        task_obj._id = cursor.lastrowid
+
+    def add_tasks(self, tasks):
+        """
+        Inserts every task of an iterable in a single transaction, streaming
+        them into executemany(). The database assigns the IDs. Returns how
+        many were added.
+        """
+        count = 0
+
+        def rows():
+            nonlocal count
+            for task_obj in tasks:
+                count += 1
+                yield None, task_obj._description, task_obj.status
+
+        with self.connection:
+            self.connection.executemany(self.INSERT_TASK, rows())
+        return count
+
+    def import_tasks(self, tasks):
+        """Inserts many tasks, keeping their IDs, in a single transaction."""
+        rows = ((task['id'], task['description'], task['status']) for task in map(Task.to_dict, tasks))
+        with self.connection:
+            self.connection.executemany(self.INSERT_TASK, rows)
+
+    def iter_task_rows(self, status=None, offset=0, limit=None):
+        """
+        Lazily yields (task_number, task_id, description, status) rows in
+        insertion order; the database skips to the requested page.
+        """
+        page = (-1 if limit is None else limit, offset)
+        if status is None:
+            cursor = self.connection.execute(self.SELECT_ALL, page)
+            return ((i, *row) for i, row in enumerate(cursor, offset))
+        return self._number_rows(self.connection.execute(self.SELECT_BY_STATUS, (status, *page)))
+
+    def _number_rows(self, rows):
+        """
+        Yields filtered rows with their task numbers. Only the IDs up to each
+        returned row are counted, off the primary key, instead of numbering
+        the whole table.
+        """
+        position, previous_id = 0, 0
+        for task_id, description, status in rows:
+            position += self.connection.execute(self.COUNT_BETWEEN, (previous_id, task_id)).fetchone()[0]
+            previous_id = task_id
+            yield position, task_id, description, status
+
+    def mark_as_complete(self, task_number):
+        """Marks a specific task as complete."""
+        try:
+            task_id = self._task_id(task_number)
+        except IndexError:
+            print("Warning: Invalid Task Number!")
+            return
+        self.mark_as_complete_by_id(task_id)
+
+    def mark_as_complete_by_id(self, task_id):
+        """Marks the task with the given row ID as complete."""
+        with self.connection:
+            updated = self.connection.execute(self.COMPLETE_TASK, (task_id,)).rowcount
+        if updated:
+            return
+        if self.connection.execute(self.SELECT_EXISTS, (task_id,)).fetchone() is None:
+            print("Warning: Invalid Task ID!")
+        else:
+            print("Message: Task is already Completed!")
+
+    def delete_task(self, task_number):
+        """Deletes a specific task from the database."""
+        try:
+            task_id = self._task_id(task_number)
+        except IndexError:
+            print("Warning: Invalid Task Number!")
+            return
+        self.delete_task_by_id(task_id)
+
+    def delete_task_by_id(self, task_id):
+        """Deletes the task with the given row ID."""
+        with self.connection:
+            deleted = self.connection.execute(self.DELETE_TASK, (task_id,)).rowcount
+        if not deleted:
+            print("Warning: Invalid Task ID!")
+
+    def _existing_ids(self, task_ids):
+        """Returns the given IDs that name a row, warning about the others."""
+        found = []
+        missing = []
+        for task_id in dict.fromkeys(task_ids):
+            exists = self.connection.execute(self.SELECT_EXISTS, (task_id,)).fetchone() is not None
+            (found if exists else missing).append(task_id)
+        if missing:
+            print(f"Warning: Invalid Task IDs {', '.join(map(str, missing))}!")
+        return found
+
+    def complete_ids(self, task_ids):
+        """Marks the rows with the given IDs complete in one transaction."""
+        rows = [(task_id,) for task_id in self._existing_ids(task_ids)]
+        with self.connection:
+            return self.connection.executemany(self.COMPLETE_TASK, rows).rowcount
+
+    def delete_ids(self, task_ids):
+        """Deletes the rows with the given IDs in one transaction."""
+        rows = [(task_id,) for task_id in self._existing_ids(task_ids)]
+        with self.connection:
+            return self.connection.executemany(self.DELETE_TASK, rows).rowcount
+
+    def data_persistence(self):
+        """
+        Every change is already committed; this folds the WAL back into the
+        main database file.
+        """
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        """Closes the database connection."""
+        self.connection.close()
 
 
 class Task:
-    """Task class: Handles the class variables."""
+    """
+    Task class: Handles the class variables.
+
+    Tasks are declared with __slots__ and keep their status as a bool, so a
+    task costs a small fixed-size object instead of an object plus a
+    per-instance __dict__. This matters once lists hold millions of tasks.
+    """
+
+    __slots__ = ('_id', '_description', '_complete', '_priority', '_due', '_completed_on')
 
-    def __init__(self, description):
-        """Initializes description and status."""
+    def __init__(self, description, task_id=None, priority=None, due=None):
+        """
+        Initializes description and status. The ID is normally handed out
+        by the task manager when the task is added. Priority (1 is the most
+        urgent) and due date (a YYYY-MM-DD string) are optional.
+        """
+        self._id = task_id
         self._description = description
-        self._status = 'Incomplete'
+        self._complete = False
+        self._priority = priority
+        self._due = due
+        self._completed_on = None
+
+    @classmethod
+    def from_dict(cls, task_dict):
+        """Builds a Task from a dictionary produced by to_dict()."""
+        task = cls(task_dict['description'], task_dict.get('id'), task_dict.get('priority'), task_dict.get('due'))
+        task._complete = task_dict.get('status') == 'Complete'
+        task._completed_on = task_dict.get('completed')
+        return task
+
+    @classmethod
+    def from_row(cls, row):
+        """Builds a Task from a tuple produced by to_row()."""
+        task = cls.__new__(cls)
+        task._id, task._description, task._complete, task._priority, task._due, task._completed_on = row
+        return task
+
+    def to_row(self):
+        """
+        Returns every field as a plain tuple, the compact form kept in the
+        startup cache (see snapshot_cache).
+        """
+        return self._id, self._description, self._complete, self._priority, self._due, self._completed_on
+
+    @property
+    def status(self):
+        """Returns the status as 'Complete' or 'Incomplete'."""
+        return 'Complete' if self._complete else 'Incomplete'
 
     def to_dict(self):
-        """Returns description and status as a dictionary."""
-        return {"description": self._description, "status": self._status}
+        """
+        Returns ID, description and status as a dictionary, plus priority,
+        due date and completion date when they are set.
+        """
+        task_dict = {"id": self._id, "description": self._description, "status": self.status}
+        if self._priority is not None:
+            task_dict["priority"] = self._priority
+        if self._due is not None:
+            task_dict["due"] = self._due
+        if self._completed_on is not None:
+            task_dict["completed"] = self._completed_on
+        return task_dict
 
     def mark_complete(self):
         """
-        Changes the status to 'Complete' if it's currently 'Incomplete'.
+        Changes the status to 'Complete' if it's currently 'Incomplete',
+        noting today as the completion date. Returns True when the status
+        actually changed.
         """
-        if self._status == "Incomplete":
-            self._status = 'Complete'
-        else:
-            print("Message: Task is already Completed!")
+        if not self._complete:
+            self._complete = True
+            self._completed_on = date.today().isoformat()
+            return True
+        print("Message: Task is already Completed!")
+        return False
+
+
+class StoredTask(Task):
+    """
+    Task loaded from a BinaryTaskStore. Its description is decoded from the
+    store's memory map the first time it is read, so opening a store only
+    reads each record's flags and ID.
+    """
+
+    __slots__ = ('_store', '_slot', '_text')
+
+    def __init__(self, store, slot, task_id, complete):
+        """Initializes a task whose description is in `store`'s record `slot`."""
+        self._store = store
+        self._slot = slot
+        super().__init__(None, task_id)
+        self._complete = complete
+
+    @property
+    def _description(self):
+        """The description, read from the store on first use."""
+        if self._text is None:
+            self._text = self._store.read(self._slot)[2]
+        return self._text
+
+    @_description.setter
+    def _description(self, description):
+        self._text = description
+
+
+def open_app(backend='json', project=None):
+    """
+    Builds the App for a storage backend: 'json' (snapshot plus journal),
+    'sqlite' or 'binary'. A new SQLite or binary store is seeded from the
+    existing JSON list. The JSON backend opens only the shard of `project`
+    (default: the active project; see task_shards).
+    """
+    if backend == 'binary':
+        binary_store_is_new = not os.path.exists(BINARY_FILE)
+        binary_store = BinaryTaskStore()
+        if binary_store_is_new and os.path.exists(TASK_FILE):
+            tasks = App(journal=TaskJournal()).tasks
+            binary_store.rewrite((task._id, task._description, task._complete) for task in tasks)
+        return App(task_manager=BinaryTaskManager(binary_store))
+    if backend == 'sqlite':
+        database_is_new = not os.path.exists(DATABASE_FILE)
+        sqlite_manager = SQLiteTaskManager()
+        if database_is_new and os.path.exists(TASK_FILE):
+            sqlite_manager.import_tasks(App(journal=TaskJournal()).tasks)
+        return App(task_manager=sqlite_manager)
+    manifest = ShardManifest(TASK_FILE)
+    project = project or manifest.active
+    manifest.add(project)
+    filename = manifest.shard_filename(project)
+    app = App(filename, TaskJournal(manifest.journal_filename(project)), store_lock=StoreLock(filename),
+              manifest=manifest, project=project)
+    app.open_replica()
+    return app
+
+
+def enable_metrics(metrics_file):
+    """
+    Times every App and task manager operation from now on, plus start-up
+    (the constructors) and snapshot writes, and writes the latency
+    histograms to metrics_file when the program exits (Prometheus text for
+    a .prom file, JSON otherwise). Returns the Instrumentation.
+    """
+    # Imported here so runs without --metrics do not load it.
+    from task_metrics import Instrumentation
+
+    instrumentation = Instrumentation()
+    instrumentation.install(App, TaskManagerInterface, TaskManager, BinaryTaskManager, SQLiteTaskManager,
+                            skip=('menu', 'serve'), include=('__init__', '_write_snapshot', '_save_snapshot'))
+    atexit.register(instrumentation.dump, metrics_file)
+    return instrumentation
+
+
+def parse_arguments(argv=None):
+    """Parses the command line; without a command the interactive menu runs."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument('--sqlite', dest='backend', action='store_const', const='sqlite',
+                         default='json', help="store tasks in To_Do_List.db")
+    backend.add_argument('--binary', dest='backend', action='store_const', const='binary',
+                         help="store tasks in To_Do_List.bin")
+    parser.add_argument('--autosave', type=float, metavar='SECONDS',
+                        help="in the menu or server, save automatically once changes are quiet for SECONDS")
+    parser.add_argument('--project', type=project_name,
+                        help="work on this project's tasks instead of the active project's")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="time every operation and write the figures to FILE on exit "
+                             "(Prometheus text for a .prom file, JSON otherwise)")
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('add', help="add tasks").add_argument('arguments', nargs='+', metavar='DESCRIPTION')
+    commands.add_parser('done', help="mark tasks complete").add_argument('arguments', nargs='+', metavar='ID')
+    commands.add_parser('rm', help="delete tasks").add_argument('arguments', nargs='+', metavar='ID')
+    commands.add_parser('ls', help="list tasks, e.g. 'ls incomplete 40 20' for the third page").add_argument(
+        'arguments', nargs='*', metavar='[complete|incomplete] [OFFSET [LIMIT]]')
+    commands.add_parser('done-where', help=f"mark the selected tasks complete: {SELECTION_HELP}").add_argument(
+        'arguments', nargs='+', metavar='SELECTION')
+    commands.add_parser('rm-where', help=f"delete the selected tasks: {SELECTION_HELP}").add_argument(
+        'arguments', nargs='+', metavar='SELECTION')
+    due = commands.add_parser('due', help="set a task's due date ('none' clears it)")
+    due.add_argument('arguments', nargs=2, metavar=('ID', 'YYYY-MM-DD'))
+    priority = commands.add_parser('priority', help="set a task's priority, 1 being the most urgent ('none' clears it)")
+    priority.add_argument('arguments', nargs=2, metavar=('ID', 'N'))
+    commands.add_parser('next', help="list the incomplete tasks due soonest").add_argument(
+        'arguments', nargs='*', metavar='COUNT')
+    commands.add_parser('overdue', help="list the incomplete tasks past their due date").set_defaults(arguments=[])
+    commands.add_parser('archive', help=f"move tasks completed DAYS ago (default {ARCHIVE_AFTER_DAYS}) "
+                                       "to the archive").add_argument('arguments', nargs='*', metavar='DAYS')
+    commands.add_parser('archived', help="list archived tasks, optionally only those containing WORDS").add_argument(
+        'arguments', nargs='*', metavar='WORDS')
+    commands.add_parser('undo', help="take back the latest COUNT changes (default 1)").add_argument(
+        'arguments', nargs='*', metavar='COUNT')
+    commands.add_parser('redo', help="make the latest COUNT undone changes again (default 1)").add_argument(
+        'arguments', nargs='*', metavar='COUNT')
+    commands.add_parser('sorted', help="list tasks by description, created (ID) or status, "
+                                       "optionally from FROM up to TO").add_argument(
+        'arguments', nargs='+', metavar='VIEW [FROM [TO]]')
+    commands.add_parser('find', help="search task descriptions; end a word with * for a prefix").add_argument(
+        'arguments', nargs='+', metavar='WORD')
+    commands.add_parser('run', help="run commands read from a file, one per line").add_argument(
+        'file', nargs='?', default='-', help="command file ('-' for stdin)")
+    import_parser = commands.add_parser('import', help="add the tasks of a .jsonl or .csv file ('-' for stdin)")
+    import_parser.add_argument('file')
+    import_parser.add_argument('--format', choices=FORMATS, help="file format (default: from the extension)")
+    import_parser.add_argument('--dedupe', action='store_true',
+                               help="skip tasks whose description is already listed")
+    export_parser = commands.add_parser('export', help="write every task to a .jsonl or .csv file ('-' for stdout)")
+    export_parser.add_argument('file')
+    export_parser.add_argument('--format', choices=FORMATS, help="file format (default: from the extension)")
+    serve = commands.add_parser('serve', help="serve the tasks as an HTTP/JSON service")
+    serve.add_argument('--host', default=HOST, help=f"address to listen on (default {HOST})")
+    serve.add_argument('--port', type=int, default=PORT, help=f"port to listen on (default {PORT}, 0 for any)")
+    project = commands.add_parser('project', help="list, switch, search across or move tasks between projects")
+    project_actions = project.add_subparsers(dest='project_action', required=True)
+    project_actions.add_parser('list', help="list the projects with their task counts")
+    project_actions.add_parser('use', help="make a project (new or existing) the active one").add_argument('name')
+    project_actions.add_parser('find', help="search the tasks of every project").add_argument('words', nargs='+')
+    move = project_actions.add_parser('move', help="move a task to another project")
+    move.add_argument('task_id', type=int, metavar='ID')
+    move.add_argument('name', metavar='PROJECT')
+    sync = commands.add_parser('sync', help="replicate the list with other copies of it")
+    sync_actions = sync.add_subparsers(dest='sync_action', required=True)
+    sync_actions.add_parser('init', help="name this copy (copy the files of the first one to set up the others)"
+                            ).add_argument('name', nargs='?')
+    sync_actions.add_parser('file', help="exchange changes through a file both copies take turns updating"
+                            ).add_argument('path')
+    for action, help_text in (('serve', "let other copies sync with this one until stopped"),
+                              ('connect', "sync with a copy running 'sync serve'")):
+        sync_action = sync_actions.add_parser(action, help=help_text)
+        sync_action.add_argument('--host', default=HOST, help=f"address (default {HOST})")
+        sync_action.add_argument('--port', type=int, default=SYNC_PORT, help=f"port (default {SYNC_PORT})")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
     """This section is a demonstration of the to-do list's functionality."""
-    start = App()
-    start.menu()
+    args = parse_arguments()
+    if args.metrics:
+        enable_metrics(args.metrics)
+    start = open_app(args.backend, args.project)
+    if args.command is None:
+        if args.autosave is not None and isinstance(start.task_manager, TaskManager):
+            start.task_manager.enable_autosave(args.autosave)
+        start.menu()
+    elif args.command == 'serve':
+        if isinstance(start.task_manager, TaskManager):
+            start.serve(args.host, args.port, args.autosave or AUTOSAVE_DELAY)
+        else:
+            print("Warning: serve needs the JSON or binary backend.")
+    elif args.command == 'project':
+        if args.project_action == 'list':
+            start.list_projects()
+        elif args.project_action == 'use':
+            start.use_project(args.name)
+        elif args.project_action == 'find':
+            start.search_projects(' '.join(args.words))
+        else:
+            start.move_to_project(args.task_id, args.name)
+    elif args.command == 'sync':
+        target = getattr(args, 'name', None) or getattr(args, 'path', None)
+        start.sync(args.sync_action, target, getattr(args, 'host', HOST), getattr(args, 'port', SYNC_PORT))
+    elif args.command == 'import':
+        start.import_tasks(args.file, args.format, args.dedupe)
+    elif args.command == 'export':
+        start.export_tasks(args.file, args.format)
+    elif args.command == 'run':
+        if args.file == '-':
+            start.run_commands(App.parse_command_stream(sys.stdin))
+        else:
+            with open(args.file) as command_file:
+                start.run_commands(App.parse_command_stream(command_file))
+    else:
+        start.run_commands([(args.command, args.arguments)])
@@ -0,0 +1,95 @@
+"""
+Startup cache for the To-Do app's task snapshot.
+
+Parsing To_Do_List.json and rebuilding every task dominates start-up once
+lists grow large. After the snapshot is read or written, its tasks are
+pickled as plain row tuples into a cache file next to it, tagged with the
+snapshot's size, modification time and BLAKE2 digest. The next start
+reuses the rows only if all three still match, which costs one pass of
+hashing instead of a JSON parse. A stale, missing or unreadable cache is
+simply ignored and rebuilt.
+
+The cache is loaded with pickle, so it must be trusted as much as the
+task file itself; keep it in the same private directory.
+"""
+import hashlib
+import os
+import pickle
+
+from search_index import file_signature
+from store_lock import file_identity
+
+# Bumped whenever the row layout changes, so old caches are ignored.
+CACHE_VERSION = 1
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def file_digest(filename):
+    """Returns the hex BLAKE2b digest of a file's contents."""
+    digest = hashlib.blake2b()
+    with open(filename, 'rb') as snapshot_file:
+        for chunk in iter(lambda: snapshot_file.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SnapshotCache:
+    """Pickled task rows kept valid for one exact version of a snapshot file."""
+
+    def __init__(self, filename, cache_filename=None):
+        """
+        Initializes the cache; nothing is read until load() is called.
+
+        args:
+            filename: path of the snapshot file the cache stands in for.
+            cache_filename: path of the cache file (default: the snapshot's
+                name with a .cache extension).
+        """
+        self.filename = filename
+        self.cache_filename = cache_filename or os.path.splitext(filename)[0] + '.cache'
+
+    def load(self):
+        """
+        Returns the cached rows when the cache matches the snapshot file as
+        it is now, otherwise None.
+        """
+        key = file_signature(self.filename)
+        if key is None:
+            return None
+        try:
+            with open(self.cache_filename, 'rb') as cache_file:
+                version, cached_key, digest, rows = pickle.load(cache_file)
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, pickle.UnpicklingError):
+            return None
+        if version != CACHE_VERSION or cached_key != key:
+            return None
+        # Size and mtime can survive an edit (e.g. a copy preserving times).
+        if digest != file_digest(self.filename):
+            return None
+        return rows
+
+    def save(self, rows, identity=None):
+        """
+        Caches rows describing the snapshot file as it is now. Nothing is
+        written if the file changes while it is being hashed.
+
+        args:
+            rows: the snapshot's tasks as Task.to_row() tuples.
+            identity: optional store_lock.file_identity() of the file the
+                rows describe; nothing is written if the file was replaced
+                since.
+        """
+        key = file_signature(self.filename)
+        if key is None or identity is not None and file_identity(self.filename) != identity:
+            return
+        digest = file_digest(self.filename)
+        if file_signature(self.filename) != key:
+            return
+        temporary = self.cache_filename + '.tmp'
+        try:
+            with open(temporary, 'wb') as cache_file:
+                pickle.dump((CACHE_VERSION, key, digest, rows), cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.cache_filename)
+        except OSError:
+            # Only a missed speed-up; the snapshot itself is unaffected.
+            pass
@@ -0,0 +1,118 @@
+"""
+Sorted views over the tasks of the To-Do app.
+
+A view keeps one sort key per task (e.g. (description, ID)) in sorted order
+and is updated a task at a time as tasks are added, completed or deleted,
+so an ordered listing never sorts the whole list. Keys are stored in blocks
+of at most 2 * BLOCK_SIZE sorted keys, with each block's largest key in a
+separate list. One bisect over those maxima and one inside a block find a
+key, and an insert or removal shifts at most one block. Listing k keys from
+any point therefore costs O(log n + k), and a change costs O(log n) plus
+one block's memmove, where a single flat sorted list would move O(n).
+"""
+import bisect
+import itertools
+
+BLOCK_SIZE = 512
+
+
+class SortedKeyList:
+    """Sorted multiset of keys kept in bisectable blocks."""
+
+    def __init__(self, keys=()):
+        """Builds the list from keys in any order in O(n log n)."""
+        keys = sorted(keys)
+        self.blocks = [keys[i:i + BLOCK_SIZE] for i in range(0, len(keys), BLOCK_SIZE)]
+        self.maxes = [block[-1] for block in self.blocks]
+        self.length = len(keys)
+
+    def __len__(self):
+        """Returns the number of keys."""
+        return self.length
+
+    def add(self, key):
+        """Inserts a key, splitting its block once it holds 2 * BLOCK_SIZE keys."""
+        self.length += 1
+        if not self.blocks:
+            self.blocks.append([key])
+            self.maxes.append(key)
+            return
+        i = bisect.bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            i -= 1
+            self.blocks[i].append(key)
+            self.maxes[i] = key
+        else:
+            bisect.insort(self.blocks[i], key)
+        block = self.blocks[i]
+        if len(block) >= 2 * BLOCK_SIZE:
+            self.blocks.insert(i + 1, block[BLOCK_SIZE:])
+            del block[BLOCK_SIZE:]
+            self.maxes.insert(i, block[-1])
+
+    def remove(self, key):
+        """Removes one occurrence of a key; raises ValueError if it is not there."""
+        i = bisect.bisect_left(self.maxes, key)
+        if i < len(self.maxes):
+            block = self.blocks[i]
+            j = bisect.bisect_left(block, key)
+            if block[j] == key:
+                del block[j]
+                self.length -= 1
+                if not block:
+                    del self.blocks[i]
+                    del self.maxes[i]
+                elif j == len(block):
+                    self.maxes[i] = block[-1]
+                return
+        raise ValueError(f"{key!r} is not in the list")
+
+    def irange(self, minimum=None, maximum=None):
+        """
+        Lazily yields the keys k with minimum <= k < maximum in order; either
+        bound may be None for no bound. The list must not change while the
+        generator is in use.
+        """
+        if minimum is None:
+            i = j = 0
+        else:
+            i = bisect.bisect_left(self.maxes, minimum)
+            j = bisect.bisect_left(self.blocks[i], minimum) if i < len(self.blocks) else 0
+        for block in itertools.islice(self.blocks, i, None):
+            for key in itertools.islice(block, j, None):
+                if maximum is not None and not key < maximum:
+                    return
+                yield key
+            j = 0
+
+
+class SortedViews:
+    """Named sorted views of the same tasks, each ordered by its own key."""
+
+    def __init__(self, keys, tasks=()):
+        """
+        Builds every view over the given tasks.
+
+        args:
+            keys: dict mapping each view's name to a callable returning a
+                task's sort key. Keys must be unique per task (end them with
+                the task ID) and must not change while the task is listed.
+            tasks: iterable of the tasks to list.
+        """
+        self.keys = keys
+        tasks = list(tasks)
+        self.views = {name: SortedKeyList(map(key, tasks)) for name, key in keys.items()}
+
+    def add(self, task):
+        """Lists a task in every view under its current keys."""
+        for name, key in self.keys.items():
+            self.views[name].add(key(task))
+
+    def remove(self, task):
+        """Takes a task out of every view; call before its keys change."""
+        for name, key in self.keys.items():
+            self.views[name].remove(key(task))
+
+    def irange(self, name, minimum=None, maximum=None):
+        """Lazily yields the keys of one view from minimum (inclusive) to maximum (exclusive)."""
+        return self.views[name].irange(minimum, maximum)
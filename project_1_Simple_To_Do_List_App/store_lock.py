@@ -0,0 +1,88 @@
+"""
+Advisory inter-process locking for the To-Do app's task files.
+
+Several processes may open the same To_Do_List.json. Readers take a shared
+lock, and a process changing the files takes an exclusive one just long
+enough to catch up with other processes' journal records and append its
+own. The lock lives in a separate '.lock' file, so the task files can be
+replaced by rename while locked.
+
+Locking uses fcntl.flock and so only works on POSIX systems; elsewhere the
+lock does nothing.
+"""
+from contextlib import contextmanager
+import os
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class StoreLock:
+    """Re-entrant shared/exclusive advisory lock on a task file."""
+
+    def __init__(self, filename):
+        """
+        Initializes the lock; the lock file is created on first use.
+
+        args:
+            filename: path of the task file being protected.
+        """
+        self.filename = filename + '.lock'
+        self._file = None
+        self._mode = None
+        self._depth = 0
+
+    @contextmanager
+    def _hold(self, mode):
+        """Holds the lock in a mode; nested holds reuse the outer one."""
+        if self._depth and (self._mode == mode or self._mode == 'exclusive'):
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+        if self._depth:
+            raise RuntimeError("cannot upgrade a shared store lock to exclusive")
+
+        if self._file is None:
+            self._file = open(self.filename, 'a')
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX if mode == 'exclusive' else fcntl.LOCK_SH)
+        self._mode = mode
+        self._depth = 1
+        try:
+            yield
+        finally:
+            self._depth = 0
+            self._mode = None
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def shared(self):
+        """Context manager holding the lock for reading."""
+        return self._hold('shared')
+
+    def exclusive(self):
+        """Context manager holding the lock for writing."""
+        return self._hold('exclusive')
+
+    def close(self):
+        """Closes the lock file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def file_identity(filename):
+    """
+    Returns (inode, size, mtime_ns) for a file, or None if it is missing.
+    A snapshot replaced by rename always gets a new identity.
+    """
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
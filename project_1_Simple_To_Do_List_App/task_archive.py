@@ -0,0 +1,97 @@
+"""
+Cold archive for the To-Do app's completed tasks.
+
+Completed tasks that are old enough are moved out of To_Do_List.json into
+a gzip-compressed file of JSON lines, so loading and saving the task list
+only pay for the tasks still in use. Each archiving run appends one more
+gzip member rather than rewriting the file; gzip readers treat the members
+as a single stream. The archive is only read when it is asked for; a
+small JSON file next to it records the highest archived task ID, so new
+tasks never reuse an archived task's ID.
+"""
+import gzip
+import json
+import os
+import zlib
+
+
+class TaskArchive:
+    """Append-only, compressed store of archived task dictionaries."""
+
+    def __init__(self, filename):
+        """
+        Initializes the archive; the file is created on the first append.
+
+        args:
+            filename: path of the compressed archive file.
+        """
+        self.filename = filename
+        self.meta_filename = os.path.splitext(filename)[0] + '.json'
+        self._max_id = None
+
+    @property
+    def max_id(self):
+        """Returns the highest task ID ever archived (0 for an empty archive)."""
+        if self._max_id is None:
+            try:
+                with open(self.meta_filename, 'r') as meta_file:
+                    self._max_id = json.load(meta_file)['max_id']
+            except (OSError, ValueError, KeyError):
+                self._max_id = 0
+        return self._max_id
+
+    def _write_max_id(self, max_id):
+        """Replaces the metadata file recording the highest archived ID."""
+        temporary = self.meta_filename + '.tmp'
+        with open(temporary, 'w') as meta_file:
+            json.dump({'max_id': max_id}, meta_file)
+            meta_file.flush()
+            os.fsync(meta_file.fileno())
+        os.replace(temporary, self.meta_filename)
+        self._max_id = max_id
+
+    def append(self, task_dicts):
+        """
+        Appends tasks (dictionaries from Task.to_dict()) as one gzip member
+        and forces it to disk before returning, so the tasks can then be
+        safely dropped from the task list. Returns the number appended.
+        """
+        task_dicts = list(task_dicts)
+        # Recorded first: a crash before the append only leaves the mark too high.
+        max_id = max((task_dict['id'] for task_dict in task_dicts), default=0)
+        if max_id > self.max_id:
+            self._write_max_id(max_id)
+        count = 0
+        with open(self.filename, 'ab') as archive_file:
+            with gzip.GzipFile(fileobj=archive_file, mode='wb') as member:
+                for task_dict in task_dicts:
+                    member.write((json.dumps(task_dict) + '\n').encode('utf-8'))
+                    count += 1
+            archive_file.flush()
+            os.fsync(archive_file.fileno())
+        return count
+
+    def iter_tasks(self):
+        """
+        Yields archived task dictionaries in the order they were archived.
+        A member cut short by a crash ends the archive.
+        """
+        if not os.path.exists(self.filename):
+            return
+        with gzip.open(self.filename, 'rt', encoding='utf-8') as archive_file:
+            try:
+                for line in archive_file:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        return
+            except (EOFError, gzip.BadGzipFile, zlib.error):
+                return
+
+    def load(self):
+        """
+        Returns the archived tasks as an ID -> dictionary dict. A task
+        archived twice (after a crash between archiving and saving the task
+        list) appears once.
+        """
+        return {task_dict['id']: task_dict for task_dict in self.iter_tasks()}
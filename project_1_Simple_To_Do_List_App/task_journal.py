@@ -0,0 +1,141 @@
+"""
+Append-only journal for the To-Do app.
+
+Instead of rewriting To_Do_List.json after every change, each add, complete
+and delete is appended here as one JSON line. On startup the snapshot is
+loaded and the journal is replayed on top of it; once the journal grows past
+a threshold it is folded into a fresh snapshot (compaction).
+
+The journal remembers how many bytes of it have been read or written, so
+a process sharing the file with others can later read just the records
+appended since then. A journal trimmed by another process is a new file
+(see discard()); replaced() tells, and append() never writes to the old one.
+"""
+import json
+import os
+
+JOURNAL_FILE = 'To_Do_List.journal'
+COMPACT_THRESHOLD = 1000
+
+
+class TaskJournal:
+    """Write-ahead journal that records task mutations one line at a time."""
+
+    def __init__(self, filename=JOURNAL_FILE, compact_threshold=COMPACT_THRESHOLD, sync=False):
+        """
+        Initializes the journal.
+
+        args:
+            filename: path of the journal file.
+            compact_threshold: number of records after which compaction is due.
+            sync: when True every append is fsync'ed before returning.
+        """
+        self.filename = filename
+        self.compact_threshold = compact_threshold
+        self.sync = sync
+        self.record_count = 0
+        # Bytes of complete records this process has read or written.
+        self.position = 0
+        self._file = None
+
+    def append(self, record):
+        """Appends a single mutation record to the journal."""
+        if self._file is not None and self.replaced():
+            # Trimmed by another process: the old file is gone from the directory.
+            self.close()
+        if self._file is None:
+            self._file = open(self.filename, 'ab')
+        line = (json.dumps(record) + '\n').encode('utf-8')
+        self._file.write(line)
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+        self.record_count += 1
+        self.position += len(line)
+
+    def replay(self, start=0):
+        """
+        Yields the records stored in the journal, in write order.
+
+        A torn last line (from a crash mid-append) is ignored.
+
+        args:
+            start: byte position to read from; 0 replays the whole journal,
+                while `position` reads only records appended since the last
+                replay or append.
+        """
+        if self.replaced():
+            self.close()
+        if not start:
+            self.record_count = 0
+        self.position = start
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, 'rb') as journal_file:
+            journal_file.seek(start)
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                self.record_count += 1
+                self.position += len(line)
+                yield record
+
+    def size(self):
+        """Returns the journal file's current size in bytes."""
+        try:
+            return os.path.getsize(self.filename)
+        except FileNotFoundError:
+            return 0
+
+    def replaced(self):
+        """Returns True when the file this journal has open is no longer the one at its path."""
+        if self._file is None:
+            return False
+        try:
+            return os.stat(self.filename).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def needs_compaction(self):
+        """Returns True once the journal holds enough records to compact."""
+        return self.record_count >= self.compact_threshold
+
+    def reset(self):
+        """Empties the journal after its records were folded into a snapshot."""
+        self.close()
+        with open(self.filename, 'w', encoding='utf-8'):
+            pass
+        self.record_count = 0
+        self.position = 0
+
+    def discard(self, position, record_count):
+        """
+        Drops the first record_count records (the bytes before position)
+        once a snapshot holds them, keeping the records appended since. The
+        kept records are copied to a new file that replaces the journal, so
+        a crash leaves either the old journal or the new one. Processes
+        sharing the journal see the new file through replaced().
+        """
+        if position >= self.position:
+            self.reset()
+            return
+        self.close()
+        with open(self.filename, 'rb') as journal_file:
+            journal_file.seek(position)
+            kept = journal_file.read(self.position - position)
+        temporary = self.filename + '.tmp'
+        with open(temporary, 'wb') as journal_file:
+            journal_file.write(kept)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        os.replace(temporary, self.filename)
+        self.position -= position
+        self.record_count -= record_count
+
+    def close(self):
+        """Closes the underlying file handle, if open."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,351 @@
+"""
+Delta-sync replication between copies of the To-Do list.
+
+Every change a task manager makes is stamped and appended to an operation
+log (To_Do_List.oplog). A stamp is the replica's name, its next sequence
+number and a Lamport clock that is kept ahead of every stamp the replica
+has seen. A replica's version vector maps each replica name to the highest
+sequence number received from it. Two replicas swap vectors, and each then
+sends only the operations the other is missing. The transfer therefore
+grows with how far the copies diverged, not with the size of the list.
+
+Tasks are identified across replicas by a uid minted when they are added.
+Tasks that already existed when replication started use "base-<ID>".
+Operations carry uids. Received operations are applied in stamp order and
+resolve deterministically:
+- status, priority and due date are last-writer-wins registers, compared by
+  (Lamport clock, replica name);
+- a delete wins over everything and leaves a tombstone, so the task is never
+  re-added;
+- undoing a delete restores the task under a new uid.
+Replicas converge to the same tasks with the same fields. Local IDs and list
+order stay local. Archiving is not replicated, since every replica archives
+by the same completion dates on its own.
+
+To set up, run 'sync init' on one machine. Then copy its To_Do_List.*
+files to the others, and run 'sync init' there too to give each copy its
+own name. Copies then exchange changes through a shared file that they
+take turns updating, or over TCP.
+"""
+import json
+import os
+import socket
+import socketserver
+import threading
+import uuid
+
+from task_journal import TaskJournal
+
+# Stamp older than any real one.
+NO_STAMP = (0, '')
+BASE_UID = 'base-'
+FIELDS = ('status', 'priority', 'due')
+
+
+class Replica:
+    """One copy's operation log, version vector and uid bookkeeping."""
+
+    def __init__(self, replica_id, manager, log):
+        """
+        Attaches replication to a task manager, rebuilding the state from
+        the operation log.
+
+        args:
+            replica_id: this copy's unique name.
+            manager: the TaskManager whose changes are replicated; its
+                `replica` attribute is set to this object.
+            log: TaskJournal holding the operation log; it is never
+                compacted, since peers may still be missing any operation.
+        """
+        self.replica_id = replica_id
+        self.manager = manager
+        self.log = log
+        self.lock = threading.RLock()
+        self.clock = 0
+        # Replica name -> highest sequence number held, and its operations in order.
+        self.vector = {}
+        self.operations = {}
+        self.local_by_uid = {}
+        self.uid_by_local = {}
+        # uid -> {field: stamp of the write it holds}
+        self.stamps = {}
+        self.tombstones = set()
+        self.applying = False
+        for entry in log.replay():
+            self._note(entry)
+        manager.replica = self
+
+    @staticmethod
+    def meta_filename(filename):
+        """Returns the file holding the replica's name, next to the task file."""
+        return os.path.splitext(filename)[0] + '.replica'
+
+    @staticmethod
+    def log_filename(filename):
+        """Returns the operation log's path, next to the task file."""
+        return os.path.splitext(filename)[0] + '.oplog'
+
+    @classmethod
+    def initialize(cls, filename, replica_id=None):
+        """
+        Names the copy of the list kept in `filename`; a random name is
+        picked if none is given. Renaming a copy is safe: what it logged
+        under the old name stays valid. Returns the name.
+        """
+        replica_id = replica_id or uuid.uuid4().hex[:8]
+        with open(cls.meta_filename(filename), 'w') as meta_file:
+            json.dump({'replica': replica_id}, meta_file)
+        return replica_id
+
+    @classmethod
+    def open(cls, filename, manager):
+        """
+        Attaches replication to the manager of `filename` if the copy was
+        initialized, and returns the Replica (otherwise None).
+        """
+        try:
+            with open(cls.meta_filename(filename)) as meta_file:
+                replica_id = json.load(meta_file)['replica']
+        except FileNotFoundError:
+            return None
+        return cls(replica_id, manager, TaskJournal(cls.log_filename(filename)))
+
+    def _uid(self, local_id):
+        """Returns the uid of a local task ID."""
+        return self.uid_by_local.get(local_id, f"{BASE_UID}{local_id}")
+
+    def _local(self, uid):
+        """Returns the local ID of a uid, or None if it has none."""
+        local_id = self.local_by_uid.get(uid)
+        if local_id is None and uid.startswith(BASE_UID) and uid not in self.tombstones:
+            candidate = int(uid[len(BASE_UID):])
+            if candidate not in self.uid_by_local:
+                local_id = candidate
+        return local_id
+
+    def _map(self, uid, local_id):
+        """Records that a local task ID now stands for uid."""
+        previous = self.uid_by_local.get(local_id)
+        if previous is not None:
+            self.local_by_uid.pop(previous, None)
+        self.uid_by_local[local_id] = uid
+        self.local_by_uid[uid] = local_id
+
+    def _note(self, entry):
+        """Updates the bookkeeping for an operation that has been applied."""
+        origin = entry['replica']
+        stamp = (entry['lamport'], origin)
+        self.operations.setdefault(origin, []).append(entry)
+        self.vector[origin] = entry['seq']
+        self.clock = max(self.clock, entry['lamport'])
+        op = entry['op']
+        if op == 'add':
+            for task, local_id in zip(entry['tasks'], entry['local']):
+                if local_id is not None:
+                    self._map(task['uid'], local_id)
+                self.stamps[task['uid']] = dict.fromkeys(FIELDS, stamp)
+        elif op == 'delete':
+            for uid in entry['uids']:
+                self.tombstones.add(uid)
+                self.stamps.pop(uid, None)
+                local_id = self.local_by_uid.pop(uid, None)
+                if local_id is not None:
+                    self.uid_by_local.pop(local_id, None)
+        else:
+            for uid in entry['uids']:
+                stamps = self.stamps.setdefault(uid, {})
+                for field in self._fields(entry):
+                    if stamp > stamps.get(field, NO_STAMP):
+                        stamps[field] = stamp
+
+    @staticmethod
+    def _fields(operation):
+        """Returns the registers a complete, reopen or update operation writes."""
+        if operation['op'] in ('complete', 'reopen'):
+            return ('status',)
+        return tuple(field for field in ('priority', 'due') if field in operation)
+
+    def catch_up(self):
+        """
+        Picks up operations other processes sharing the files appended to
+        the log. The manager calls this with the store lock held.
+        """
+        with self.lock:
+            if self.log.size() > self.log.position:
+                for entry in self.log.replay(self.log.position):
+                    self._note(entry)
+
+    def record_local(self, record):
+        """
+        Stamps and logs a change the manager just made (one of its journal
+        records). Changes applied on behalf of other replicas and archiving
+        are not logged.
+        """
+        op = record['op']
+        if self.applying or op == 'archive':
+            return
+        with self.lock:
+            self.clock += 1
+            seq = self.vector.get(self.replica_id, 0) + 1
+            entry = {'replica': self.replica_id, 'seq': seq, 'lamport': self.clock}
+            if op in ('add', 'restore'):
+                tasks = record.get('tasks', [record])
+                entry['op'] = 'add'
+                entry['tasks'] = [{**{field: value for field, value in task.items() if field not in ('id', 'op')},
+                                   'uid': f"{self.replica_id}-{seq}-{i}"} for i, task in enumerate(tasks)]
+                entry['local'] = [task['id'] for task in tasks]
+            else:
+                entry['op'] = op
+                entry['uids'] = [self._uid(task_id) for task_id in record.get('ids', [record.get('id')])]
+                entry.update((field, record[field]) for field in ('on', 'priority', 'due') if field in record)
+            self.log.append(entry)
+            self._note(entry)
+
+    def delta(self, vector):
+        """Returns the operations missing from a replica with the given version vector, oldest first."""
+        with self.lock:
+            missing = []
+            for origin, entries in self.operations.items():
+                for entry in entries[vector.get(origin, 0):]:
+                    missing.append({field: value for field, value in entry.items() if field != 'local'})
+            missing.sort(key=lambda entry: (entry['lamport'], entry['replica']))
+            return missing
+
+    def receive(self, operations):
+        """
+        Applies operations from another replica, skipping those already
+        held. Returns how many were new.
+        """
+        received = 0
+        # Same order as a local change: the manager's lock, then this one.
+        with self.manager.locked(), self.lock:
+            self.applying = True
+            try:
+                for operation in sorted(operations, key=lambda entry: (entry['lamport'], entry['replica'])):
+                    if operation['seq'] != self.vector.get(operation['replica'], 0) + 1:
+                        continue
+                    entry = self._apply(operation)
+                    self.log.append(entry)
+                    self._note(entry)
+                    received += 1
+            finally:
+                self.applying = False
+        return received
+
+    def _apply(self, operation):
+        """Applies one received operation to the tasks; returns its log entry."""
+        stamp = (operation['lamport'], operation['replica'])
+        op = operation['op']
+        manager = self.manager
+        if op == 'add':
+            new = [task for task in operation['tasks']
+                   if task['uid'] not in self.tombstones and self._local(task['uid']) is None]
+            added = {}
+            if new:
+                task_ids = manager.apply_replicated(
+                    {'op': 'add', 'tasks': [{field: value for field, value in task.items() if field != 'uid'}
+                                            for task in new]})
+                added = dict(zip((task['uid'] for task in new), task_ids))
+            return {**operation, 'local': [added.get(task['uid']) for task in operation['tasks']]}
+        local_ids = [(uid, self._local(uid)) for uid in operation['uids'] if uid not in self.tombstones]
+        local_ids = [(uid, local_id) for uid, local_id in local_ids if local_id is not None]
+        if op == 'delete':
+            if local_ids:
+                manager.apply_replicated({'op': 'delete', 'ids': [local_id for _, local_id in local_ids]})
+            return operation
+        # Group the tasks by which of the operation's registers it still wins.
+        groups = {}
+        for uid, local_id in local_ids:
+            stamps = self.stamps.get(uid, {})
+            winning = tuple(field for field in self._fields(operation) if stamp > stamps.get(field, NO_STAMP))
+            if winning:
+                groups.setdefault(winning, []).append(local_id)
+        for winning, task_ids in groups.items():
+            record = {'op': op, 'ids': task_ids}
+            if op == 'complete':
+                record['on'] = operation.get('on')
+            elif op == 'update':
+                record.update((field, operation[field]) for field in winning)
+            manager.apply_replicated(record)
+        return operation
+
+
+def sync_file(replica, path):
+    """
+    Exchanges changes through a file two replicas take turns updating
+    (e.g. on a shared drive). Operations the other replica left in it are
+    applied, then the file is replaced with this replica's vector and the
+    operations the other one lacks. Returns (received, sent).
+    """
+    base = {}
+    received = 0
+    try:
+        with open(path) as bundle_file:
+            bundle = json.load(bundle_file)
+    except FileNotFoundError:
+        bundle = None
+    if bundle is not None:
+        if bundle['replica'] == replica.replica_id:
+            # The other side has not answered yet; resend against the same base.
+            base = bundle['base']
+        else:
+            received = replica.receive(bundle['operations'])
+            base = bundle['vector']
+    operations = replica.delta(base)
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as bundle_file:
+        json.dump({'replica': replica.replica_id, 'vector': replica.vector, 'base': base,
+                   'operations': operations}, bundle_file)
+    os.replace(temporary, path)
+    return received, len(operations)
+
+
+def _send(stream, message):
+    """Writes one JSON message as a line."""
+    stream.write((json.dumps(message) + '\n').encode('utf-8'))
+    stream.flush()
+
+
+def _read(stream):
+    """Reads one JSON message line; raises ConnectionError if the peer hung up."""
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("peer closed the connection")
+    return json.loads(line)
+
+
+def sync_socket(replica, host, port):
+    """
+    Exchanges changes with a replica running serve_sync(). Each side sends
+    its vector and receives the operations it lacks. Returns (received, sent).
+    """
+    with socket.create_connection((host, port)) as connection, connection.makefile('rwb') as stream:
+        _send(stream, {'replica': replica.replica_id, 'vector': replica.vector})
+        answer = _read(stream)
+        received = replica.receive(answer['operations'])
+        operations = replica.delta(answer['vector'])
+        _send(stream, {'operations': operations})
+        _read(stream)
+    return received, len(operations)
+
+
+def serve_sync(replica, host, port, started=None):
+    """
+    Answers sync_socket() calls, one peer at a time, until interrupted.
+
+    args:
+        started: optional callback receiving the server once it listens,
+            e.g. to read the chosen port.
+    """
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            hello = _read(self.rfile)
+            _send(self.wfile, {'replica': replica.replica_id, 'vector': replica.vector,
+                               'operations': replica.delta(hello['vector'])})
+            received = replica.receive(_read(self.rfile)['operations'])
+            _send(self.wfile, {'received': received})
+
+    with socketserver.TCPServer((host, port), Handler) as server:
+        if started is not None:
+            started(server)
+        server.serve_forever()
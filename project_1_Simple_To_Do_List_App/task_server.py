@@ -0,0 +1,254 @@
+"""
+HTTP/JSON service for the To-Do app.
+
+One asyncio event loop serves every client from a single in-memory task
+manager. The loop only reads and writes sockets: handlers run one at a
+time on a single worker thread, so no request ever sees another one half
+applied and no per-request locking is needed, while a handler waiting for
+the manager's lock (held during a snapshot write) never stalls the loop.
+Each change is journaled as usual; the full snapshot is written in the
+background by the manager's autosave once changes go quiet, or as soon as
+the journal is due for compaction, so a burst of requests costs one
+rewrite rather than one per request.
+
+Endpoints (request and response bodies are JSON):
+
+    GET    /tasks?status=complete&offset=0&limit=20   list tasks
+    POST   /tasks  {"description": "buy milk"}         add a task
+    GET    /tasks/<id>                                 show a task
+    POST   /tasks/<id>/complete                        mark a task complete
+    DELETE /tasks/<id>                                 delete a task
+    GET    /search?q=buy+mil*                          search descriptions
+    POST   /save                                       save now
+
+Only the standard library is used: the server speaks just enough HTTP/1.1
+(Content-Length bodies, keep-alive) for JSON clients.
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+PAGE_LIMIT = 100
+MAX_BODY_BYTES = 1 << 20
+
+
+class HTTPError(Exception):
+    """An error answered with an HTTP status and a JSON message."""
+
+    def __init__(self, status, message):
+        """
+        args:
+            status: HTTPStatus of the response.
+            message: text sent back as {"error": message}.
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class TaskServer:
+    """Serves a task manager's operations as JSON over HTTP."""
+
+    def __init__(self, task_manager, task_factory):
+        """
+        Initializes the server.
+
+        args:
+            task_manager: the TaskManager holding the tasks.
+            task_factory: callable turning a description into a new task
+                (simpleToDoList.Task).
+        """
+        self.task_manager = task_manager
+        self.task_factory = task_factory
+        self.requests = 0
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='task-server')
+
+    def _task(self, task_id):
+        """Returns the task with an ID given as text; raises HTTPError if absent."""
+        try:
+            task = self.task_manager.get_task(int(task_id))
+        except ValueError:
+            task = None
+        if task is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"no task with ID {task_id!r}")
+        return task
+
+    @staticmethod
+    def _int_parameter(query, name, default):
+        """Returns an integer query parameter; raises HTTPError when malformed."""
+        try:
+            value = int(query.get(name, [default])[0])
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer")
+        if value < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must not be negative")
+        return value
+
+    def list_tasks(self, query):
+        """Returns a page of tasks, optionally filtered by status."""
+        status = query.get('status', [None])[0]
+        if status is not None:
+            if status.lower() not in ('complete', 'incomplete'):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "status must be 'complete' or 'incomplete'")
+            status = status.capitalize()
+        offset = self._int_parameter(query, 'offset', 0)
+        limit = min(self._int_parameter(query, 'limit', PAGE_LIMIT), PAGE_LIMIT)
+        self.task_manager.refresh()
+        return [{'number': number, 'id': task_id, 'description': description, 'status': task_status}
+                for number, task_id, description, task_status
+                in self.task_manager.iter_task_rows(status, offset, limit)]
+
+    def show_task(self, task_id):
+        """Returns the task with an ID given as text."""
+        return self._task(task_id).to_dict()
+
+    def add_task(self, body):
+        """Adds a task from a {"description": ...} body and returns it."""
+        description = body.get('description') if isinstance(body, dict) else None
+        if not isinstance(description, str) or not description.strip():
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "description must be a non-empty string")
+        task = self.task_factory(description)
+        self.task_manager.add_task(task)
+        return task.to_dict()
+
+    def complete_task(self, task_id):
+        """Marks a task complete; completing it twice is not an error."""
+        task = self._task(task_id)
+        if not task._complete:
+            self.task_manager.mark_as_complete_by_id(task._id)
+        return task.to_dict()
+
+    def delete_task(self, task_id):
+        """Deletes a task and returns it."""
+        task = self._task(task_id)
+        self.task_manager.delete_task_by_id(task._id)
+        return task.to_dict()
+
+    def search(self, query):
+        """Returns the tasks matching the q parameter."""
+        return [task.to_dict() for task in self.task_manager.search(query.get('q', [''])[0])]
+
+    async def _run(self, handler, *args):
+        """Runs a handler on the worker thread and returns its result."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, handler, *args)
+
+    async def save(self):
+        """Writes the snapshot off the event loop and reports whether it was written."""
+        loop = asyncio.get_running_loop()
+        return {'saved': bool(await loop.run_in_executor(None, self.task_manager.data_persistence))}
+
+    async def dispatch(self, method, target, body):
+        """
+        Routes one request.
+
+        args:
+            method: HTTP method, e.g. 'GET'.
+            target: request target, e.g. '/tasks?limit=5'.
+            body: request body bytes (JSON or empty).
+
+        returns:
+            (HTTPStatus, payload) where payload is JSON-serializable.
+        """
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        query = parse_qs(url.query)
+        try:
+            body = json.loads(body) if body else {}
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "body is not valid JSON")
+
+        if parts == ['tasks']:
+            if method == 'GET':
+                return HTTPStatus.OK, await self._run(self.list_tasks, query)
+            if method == 'POST':
+                return HTTPStatus.CREATED, await self._run(self.add_task, body)
+        elif len(parts) == 2 and parts[0] == 'tasks':
+            if method == 'GET':
+                return HTTPStatus.OK, await self._run(self.show_task, parts[1])
+            if method == 'DELETE':
+                return HTTPStatus.OK, await self._run(self.delete_task, parts[1])
+        elif len(parts) == 3 and parts[0] == 'tasks' and parts[2] == 'complete':
+            if method == 'POST':
+                return HTTPStatus.OK, await self._run(self.complete_task, parts[1])
+        elif parts == ['search']:
+            if method == 'GET':
+                return HTTPStatus.OK, await self._run(self.search, query)
+        elif parts == ['save']:
+            if method == 'POST':
+                return HTTPStatus.OK, await self.save()
+        else:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"no such endpoint {url.path!r}")
+        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not allowed on {url.path!r}")
+
+    async def respond(self, method, target, body):
+        """Runs dispatch(), turning errors into JSON error responses."""
+        self.requests += 1
+        try:
+            return await self.dispatch(method, target, body)
+        except HTTPError as error:
+            return error.status, {'error': error.message}
+
+    @staticmethod
+    def render(status, payload, keep_alive=True):
+        """Returns the bytes of an HTTP/1.1 response carrying a JSON payload."""
+        data = json.dumps(payload).encode('utf-8')
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n")
+        if not keep_alive:
+            head += "Connection: close\r\n"
+        return head.encode('latin-1') + b"\r\n" + data
+
+    async def handle_client(self, reader, writer):
+        """Answers requests on one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.split(' ')
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    writer.write(self.render(HTTPStatus.BAD_REQUEST, {'error': "malformed request"}, False))
+                    break
+                if not 0 <= length <= MAX_BODY_BYTES:
+                    writer.write(self.render(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': "body too large"}, False))
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.respond(method, target, body)
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' or (version == 'HTTP/1.1' and connection != 'close')
+                writer.write(self.render(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port, started=None):
+        """
+        Serves until cancelled.
+
+        args:
+            host: address to listen on.
+            port: TCP port (0 picks a free one).
+            started: optional callback receiving the asyncio Server once
+                it is listening, e.g. to read the chosen port.
+        """
+        server = await asyncio.start_server(self.handle_client, host, port)
+        if started is not None:
+            started(server)
+        async with server:
+            await server.serve_forever()
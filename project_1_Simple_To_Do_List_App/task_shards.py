@@ -0,0 +1,137 @@
+"""
+Project shards for the To-Do app.
+
+Each project's tasks live in a shard of their own,
+To_Do_List.shard-<project>.json. The 'shard-' prefix keeps every file a
+shard derives from its name (journal, cache, index, ...) apart from the
+main list's own files, whatever the project is called.
+A shard has its own journal, startup cache, search index, archive and undo
+history, just as the main list does; the main list is the 'default'
+project. The app opens only the active project's shard, so loading and
+saving cost what that project holds, and shards that did not change are
+never written.
+
+A small manifest, To_Do_List.projects.json, names the projects and the
+active one, and keeps each shard's task counts. Counts are tagged with the
+shard file's signature and only trusted while the file is unchanged and its
+journal empty, like the search index. Queries across projects therefore
+read the manifest and the shards' saved indexes. A shard is loaded only
+when it has matches to show or when its entry is out of date.
+"""
+import json
+import os
+import re
+
+from search_index import SearchIndex, file_signature
+
+DEFAULT_PROJECT = 'default'
+SHARD_PREFIX = 'shard-'
+PROJECT_NAME = re.compile(r'[A-Za-z0-9_-]+')
+
+
+def project_name(name):
+    """Returns name if it can name a project (letters, digits, '-' and '_'); raises ValueError otherwise."""
+    if not PROJECT_NAME.fullmatch(name):
+        raise ValueError(f"invalid project name {name!r}; use letters, digits, '-' and '_'")
+    return name
+
+
+class ShardManifest:
+    """The projects of a task list, the active one and each shard's saved counts."""
+
+    def __init__(self, filename):
+        """
+        Reads the manifest kept next to a task list.
+
+        args:
+            filename: the main task file (the default project's shard).
+        """
+        self.filename = filename
+        self.manifest_filename = os.path.splitext(filename)[0] + '.projects.json'
+        try:
+            with open(self.manifest_filename) as manifest_file:
+                saved = json.load(manifest_file)
+        except (OSError, ValueError):
+            saved = {}
+        self.active = saved.get('active', DEFAULT_PROJECT)
+        self.entries = saved.get('projects', {})
+        self.entries.setdefault(DEFAULT_PROJECT, {})
+
+    def projects(self):
+        """Returns the project names, the default project first."""
+        return [DEFAULT_PROJECT] + sorted(name for name in self.entries if name != DEFAULT_PROJECT)
+
+    def shard_filename(self, project):
+        """Returns the task file of a project."""
+        if project == DEFAULT_PROJECT:
+            return self.filename
+        base, extension = os.path.splitext(self.filename)
+        return f"{base}.{SHARD_PREFIX}{project_name(project)}{extension}"
+
+    def journal_filename(self, project):
+        """Returns the journal file of a project."""
+        return os.path.splitext(self.shard_filename(project))[0] + '.journal'
+
+    def add(self, project):
+        """Registers a project, saving the manifest if it is new."""
+        if project not in self.entries:
+            project_name(project)
+            self.entries[project] = {}
+            self.save()
+
+    def use(self, project):
+        """Makes a project the active one, registering it if needed."""
+        self.add(project)
+        self.active = project
+        self.save()
+
+    def _current_signature(self, project):
+        """Returns the shard file's signature if its journal is empty, else None."""
+        journal_filename = self.journal_filename(project)
+        if os.path.exists(journal_filename) and os.path.getsize(journal_filename):
+            return None
+        return file_signature(self.shard_filename(project))
+
+    def counts(self, project):
+        """
+        Returns the saved {'tasks': ..., 'incomplete': ...} of a project,
+        or None when the shard changed since they were recorded.
+        """
+        entry = self.entries.get(project, {})
+        signature = self._current_signature(project)
+        if signature is None or entry.get('signature') != signature:
+            return None
+        return {'tasks': entry['tasks'], 'incomplete': entry['incomplete']}
+
+    def record(self, project, tasks):
+        """
+        Stores a project's counts, computed from its tasks as saved in the
+        shard; does nothing if the shard has unsaved changes (a non-empty
+        journal), whose counts the file would not vouch for.
+        """
+        signature = self._current_signature(project)
+        if signature is None:
+            return
+        tasks = list(tasks)
+        self.entries[project] = {
+            'tasks': len(tasks),
+            'incomplete': sum(1 for task in tasks if not task._complete),
+            'signature': signature,
+        }
+        self.save()
+
+    def saved_index(self, project):
+        """Returns the project's saved search index while it is up to date, else None."""
+        counts = self.counts(project)
+        if counts is None:
+            return None
+        shard_filename = self.shard_filename(project)
+        return SearchIndex.load(os.path.splitext(shard_filename)[0] + '.index',
+                                file_signature(shard_filename) + [counts['tasks']])
+
+    def save(self):
+        """Writes the manifest, replacing the old one atomically."""
+        temporary = self.manifest_filename + '.tmp'
+        with open(temporary, 'w') as manifest_file:
+            json.dump({'active': self.active, 'projects': self.entries}, manifest_file, indent=2)
+        os.replace(temporary, self.manifest_filename)
@@ -0,0 +1,93 @@
+"""
+Streaming import and export of tasks for the To-Do app.
+
+Tasks move in and out as JSON lines (one task dictionary per line, the
+layout of Task.to_dict()) or as CSV with a header row naming the same
+fields. Both formats are read and written one task at a time, so
+migrating a list of any length needs only as much memory as the tasks
+themselves. Reading only parses; checking the values and turning them into
+tasks is left to the app.
+"""
+import csv
+import json
+import os
+
+FORMATS = ('jsonl', 'csv')
+EXTENSIONS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv'}
+CSV_FIELDS = ('id', 'description', 'status', 'priority', 'due', 'completed')
+
+
+def format_of(filename, file_format=None):
+    """
+    Returns the format to use for a file: the one given, or the one its
+    extension names. Raises ValueError when neither says.
+    """
+    if file_format is not None:
+        if file_format not in FORMATS:
+            raise ValueError(f"unknown format {file_format!r}; use {' or '.join(FORMATS)}")
+        return file_format
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in EXTENSIONS:
+        raise ValueError(f"cannot tell the format of {filename!r}; name it .jsonl or .csv or give the format")
+    return EXTENSIONS[extension]
+
+
+def read_tasks(text_file, file_format):
+    """
+    Yields (line number, task dictionary) pairs from an open text file.
+    The dictionary is None for a line that cannot be parsed. CSV cells
+    left empty are omitted from the dictionary, and blank JSON lines are
+    skipped.
+
+    args:
+        text_file: file opened for reading; for CSV with newline=''.
+        file_format: 'jsonl' or 'csv'.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(text_file)
+        for row in reader:
+            if None in row:
+                # More cells than the header has names for.
+                yield reader.line_num, None
+                continue
+            yield reader.line_num, {field: value for field, value in row.items() if value not in (None, '')}
+        return
+    decode = json.JSONDecoder().decode
+    for line_number, line in enumerate(text_file, 1):
+        if not line.strip():
+            continue
+        try:
+            task_dict = decode(line)
+        except json.JSONDecodeError:
+            task_dict = None
+        yield line_number, task_dict if isinstance(task_dict, dict) else None
+
+
+def write_tasks(text_file, file_format, task_dicts):
+    """
+    Writes task dictionaries to an open text file and returns how many
+    were written.
+
+    args:
+        text_file: file opened for writing; for CSV with newline=''.
+        file_format: 'jsonl' or 'csv'.
+        task_dicts: iterable of dictionaries from Task.to_dict().
+    """
+    count = 0
+    if file_format == 'csv':
+        writer = csv.DictWriter(text_file, CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for task_dict in task_dicts:
+            writer.writerow(task_dict)
+            count += 1
+        return count
+    write = text_file.write
+    for task_dict in task_dicts:
+        write(json.dumps(task_dict) + '\n')
+        count += 1
+    return count
+
+
+def description_key(description):
+    """Returns the form of a description compared when skipping duplicates."""
+    return ' '.join(description.split()).casefold()
@@ -0,0 +1,1815 @@
+"""
+Project 1 - B: Testing Core simpleToDoList.py functionalities
+Project Description: This script tests the task manager and its
+persistence layers.
+"""
+
+import asyncio
+from datetime import date, timedelta
+from http import HTTPStatus
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import binary_task_store
+from binary_task_store import BinaryTaskStore
+from json_stream import iter_json_array
+from group_commit import GroupCommitter
+from search_index import SearchIndex
+from snapshot_cache import SnapshotCache
+import sorted_views
+from sorted_views import SortedKeyList
+from store_lock import StoreLock, file_identity
+from task_archive import TaskArchive
+from simpleToDoList import App, BinaryTaskManager, SQLiteTaskManager, Task, TaskManager, TaskManagerInterface
+from task_journal import TaskJournal
+from task_metrics import Instrumentation
+from task_replication import serve_sync, sync_file, sync_socket
+from task_server import TaskServer
+from task_shards import ShardManifest
+from undo_history import UndoHistory
+
+
+TODAY = date.today().isoformat()
+
+
+def listing_lines(manager, *args, **kwargs):
+    """Returns the non-blank lines written by manager.list_tasks()."""
+    with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+        manager.list_tasks(*args, **kwargs)
+    return [line for line in stdout.getvalue().splitlines() if line]
+
+
+class TestJournal(unittest.TestCase):
+    """
+    This class verifies that journaled changes survive a restart and are
+    folded into the snapshot on compaction.
+    """
+
+    def setUp(self):
+        """Creates a scratch directory holding the task and journal files."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        self.journal_file = os.path.join(self.directory, 'To_Do_List.journal')
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        shutil.rmtree(self.directory)
+
+    def _open_app(self, threshold=1000):
+        """Starts an App on the scratch files with journaling enabled."""
+        with mock.patch('builtins.print'):
+            return App(self.filename, TaskJournal(self.journal_file, threshold))
+
+    def test_replay_restores_changes(self):
+        """
+        Adds, completes and deletes tasks without saving, then checks that
+        a new App instance sees the same list.
+        """
+        app = self._open_app()
+        manager = app.task_manager
+        for description in ("ab", "cd", "ef"):
+            manager.add_task(Task(description))
+        manager.mark_as_complete(2)
+        manager.delete_task(0)
+        app.journal.close()
+
+        restarted = self._open_app()
+        self.assertEqual(
+            [task.to_dict() for task in restarted.tasks],
+            [{"id": 2, "description": "cd", "status": "Incomplete"},
+             {"id": 3, "description": "ef", "status": "Complete", "completed": TODAY}])
+        self.assertFalse(os.path.exists(self.filename))
+
+    def test_compaction_resets_journal(self):
+        """
+        Checks that crossing the threshold writes a snapshot and empties
+        the journal.
+        """
+        app = self._open_app(threshold=3)
+        for description in ("ab", "cd", "ef"):
+            app.task_manager.add_task(Task(description))
+
+        self.assertTrue(os.path.exists(self.filename))
+        self.assertEqual(os.path.getsize(self.journal_file), 0)
+        self.assertEqual(len(self._open_app().tasks), 3)
+
+    def test_invalid_operations_are_not_journaled(self):
+        """Checks that failed or no-op changes leave the journal untouched."""
+        manager = TaskManager([Task("ab")], self.filename, TaskJournal(self.journal_file))
+        with mock.patch('builtins.print'):
+            manager.delete_task(5)
+            manager.mark_as_complete(0)
+            manager.mark_as_complete(0)
+        self.assertEqual(manager.journal.record_count, 1)
+
+
+class TestAutosave(unittest.TestCase):
+    """
+    This class verifies dirty tracking and the background autosave.
+    """
+
+    def setUp(self):
+        """Creates a task manager on a scratch file."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        self.manager = TaskManager([], self.filename)
+
+    def tearDown(self):
+        """Stops the autosave thread and removes the scratch directory."""
+        self.manager.disable_autosave()
+        shutil.rmtree(self.directory)
+
+    def test_clean_manager_skips_the_write(self):
+        """Checks that saving twice without changes writes only once."""
+        self.manager.add_task(Task("ab"))
+        self.assertTrue(self.manager.is_dirty)
+        self.assertTrue(self.manager.data_persistence())
+        self.assertFalse(self.manager.is_dirty)
+        self.assertFalse(self.manager.data_persistence())
+
+    def test_burst_of_changes_is_saved_once(self):
+        """Checks that a burst of changes is coalesced into one save."""
+        self.manager.enable_autosave(delay=0.05)
+        for i in range(100):
+            self.manager.add_task(Task(f"task {i}"))
+        self.manager.delete_task_by_id(1)
+        for _ in range(200):
+            if not self.manager.is_dirty:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.manager.autosaver.saves, 1)
+        with open(self.filename) as json_file:
+            self.assertEqual(len(json.load(json_file)), 99)
+
+    def test_stop_saves_pending_changes(self):
+        """Checks that stopping the autosaver flushes a pending change."""
+        self.manager.enable_autosave(delay=60)
+        self.manager.add_task(Task("ab"))
+        self.manager.disable_autosave()
+        self.assertFalse(self.manager.is_dirty)
+        self.assertTrue(os.path.exists(self.filename))
+
+    def test_compaction_is_left_to_the_autosave_thread(self):
+        """Checks that the change that makes the journal due for compaction does not rewrite the snapshot."""
+        journal = TaskJournal(os.path.join(self.directory, 'To_Do_List.journal'), compact_threshold=3)
+        self.manager = TaskManager([], self.filename, journal)
+        self.manager.enable_autosave(delay=60)
+        threads = []
+        reset = journal.reset
+        journal.reset = lambda: (threads.append(threading.current_thread().name), reset())
+        for description in ("ab", "cd", "ef"):
+            self.manager.add_task(Task(description))
+        for _ in range(200):
+            if threads:
+                break
+            time.sleep(0.01)
+        self.assertEqual(threads, ['autosave'])
+        self.assertEqual(journal.record_count, 0)
+
+
+class TestSafeSave(unittest.TestCase):
+    """
+    This class verifies the crash-safe save path and group commit.
+    """
+
+    def setUp(self):
+        """Creates a scratch directory."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        shutil.rmtree(self.directory)
+
+    def test_snapshot_matches_json_dump_layout(self):
+        """Checks that the fast writer produces exactly json.dump's output."""
+        for descriptions in ([], ["ab"], ['quote " and \\ slash', "ünïcödé ✓", "tab\tnew\nline"]):
+            tasks = [Task(d) for d in descriptions]
+            if len(tasks) > 1:
+                tasks[1]._priority = 2
+                tasks[2]._due = "2026-01-31"
+            manager = TaskManager(tasks, self.filename)
+            if tasks:
+                manager.mark_as_complete(0)
+            manager.unsaved_changes = 1
+            manager.data_persistence()
+            with open(self.filename) as json_file:
+                self.assertEqual(json_file.read(),
+                                 json.dumps([task.to_dict() for task in tasks], indent=5))
+
+    def test_failed_save_keeps_the_old_file(self):
+        """Checks that a crash while writing leaves the previous list intact."""
+        manager = TaskManager([Task("ab")], self.filename)
+        manager.data_persistence()
+        manager.add_task(Task("cd"))
+        with mock.patch.object(TaskManager, 'write_json', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                manager.data_persistence()
+        with open(self.filename) as json_file:
+            self.assertEqual([task["description"] for task in json.load(json_file)], ["ab"])
+        self.assertTrue(manager.is_dirty)
+
+    def test_crash_before_journal_reset(self):
+        """Checks that a journal already folded into the snapshot replays harmlessly."""
+        journal_file = os.path.join(self.directory, 'To_Do_List.journal')
+        with mock.patch('builtins.print'):
+            manager = App(self.filename, TaskJournal(journal_file)).task_manager
+            for description in ("ab", "cd", "ef"):
+                manager.add_task(Task(description))
+            manager.data_persistence()
+            manager.delete_task_by_id(1)
+            manager.complete_ids([1, 2])
+            manager.set_due(3, '2030-01-01')
+            # The process dies after the new snapshot is in place but before
+            # the journal it contains is emptied.
+            with mock.patch.object(TaskJournal, 'reset', side_effect=SystemExit):
+                with self.assertRaises(SystemExit):
+                    manager.data_persistence()
+            manager.journal.close()
+            tasks = App(self.filename, TaskJournal(journal_file)).tasks
+        self.assertEqual([(task._id, task.status, task._due) for task in tasks],
+                         [(2, "Complete", None), (3, "Incomplete", "2030-01-01")])
+
+    def test_changes_during_a_save_stay_journaled(self):
+        """Checks that a change made while the snapshot is written is kept in the journal, not lost."""
+        journal_file = os.path.join(self.directory, 'To_Do_List.journal')
+        with mock.patch('builtins.print'):
+            manager = App(self.filename, TaskJournal(journal_file)).task_manager
+            manager.add_task(Task("ab"))
+            manager.add_task(Task("cd"))
+            write_temporary = manager._write_temporary
+
+            def write_during_change(temporary, tasks):
+                # The lock is free while the file is written.
+                manager.mark_as_complete_by_id(1)
+                write_temporary(temporary, tasks)
+
+            with mock.patch.object(manager, '_write_temporary', write_during_change):
+                self.assertTrue(manager.data_persistence())
+            self.assertTrue(manager.is_dirty)
+            self.assertEqual([record['op'] for record in manager.journal.replay()], ['complete'])
+            with open(self.filename) as json_file:
+                self.assertEqual([task['status'] for task in json.load(json_file)], ["Incomplete", "Incomplete"])
+            manager.journal.close()
+            tasks = App(self.filename, TaskJournal(journal_file)).tasks
+        self.assertEqual([(task._id, task.status) for task in tasks], [(1, "Complete"), (2, "Incomplete")])
+
+    def test_damaged_snapshot_with_journal(self):
+        """Checks that journal changes to tasks lost from a damaged snapshot are skipped with a warning."""
+        journal_file = os.path.join(self.directory, 'To_Do_List.journal')
+        with mock.patch('builtins.print'):
+            manager = App(self.filename, TaskJournal(journal_file)).task_manager
+            for description in ("ab", "cd", "ef"):
+                manager.add_task(Task(description))
+            manager.data_persistence()
+            manager.complete_ids([2, 3])
+            manager.journal.close()
+        os.remove(self.filename)
+        with open(self.filename, 'w') as json_file:
+            json_file.write('[{"id": 2, "description": "cd", "status": "Incomplete"}, {"id": 3, "desc')
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            tasks = App(self.filename, TaskJournal(journal_file)).tasks
+        self.assertEqual([(task._id, task.status) for task in tasks], [(2, "Complete")])
+        self.assertIn("Warning: Skipped journal changes to 1 task that", stdout.getvalue())
+
+    def test_concurrent_requests_share_commits(self):
+        """Checks that requests made during a commit are served by one more commit."""
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_commit():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return len(calls)
+
+        committer = GroupCommitter(slow_commit)
+        first = threading.Thread(target=committer.request)
+        first.start()
+        started.wait(5)
+        results = []
+        waiters = [threading.Thread(target=lambda: results.append(committer.request())) for _ in range(8)]
+        for waiter in waiters:
+            waiter.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in [first] + waiters:
+            thread.join(5)
+        self.assertEqual(committer.commits, 2)
+        self.assertEqual(results, [2] * 8)
+
+
+class TestSharedStore(unittest.TestCase):
+    """
+    This class verifies that several processes can change the same task
+    files without losing each other's changes.
+    """
+
+    def setUp(self):
+        """Creates a scratch directory holding the shared files."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        self.journal_file = os.path.join(self.directory, 'To_Do_List.journal')
+        self.managers = []
+
+    def tearDown(self):
+        """Closes the managers' files and removes the scratch directory."""
+        for manager in self.managers:
+            manager.journal.close()
+            manager.store_lock.close()
+        shutil.rmtree(self.directory)
+
+    def _open_manager(self):
+        """Opens the shared files as another process would."""
+        with mock.patch('builtins.print'):
+            app = App(self.filename, TaskJournal(self.journal_file), store_lock=StoreLock(self.filename))
+        self.managers.append(app.task_manager)
+        return app.task_manager
+
+    def test_changes_merge(self):
+        """Checks that each manager sees the other's changes and IDs never collide."""
+        first, second = self._open_manager(), self._open_manager()
+        first.add_task(Task("ab"))
+        second.add_task(Task("cd"))
+        first.mark_as_complete_by_id(2)
+        first.refresh()
+        second.refresh()
+        expected = [{"id": 1, "description": "ab", "status": "Incomplete"},
+                    {"id": 2, "description": "cd", "status": "Complete", "completed": TODAY}]
+        self.assertEqual([task.to_dict() for task in first.task_list], expected)
+        self.assertEqual([task.to_dict() for task in second.task_list], expected)
+        self.assertEqual(first.version, second.version)
+
+    def test_changes_during_another_process_save_are_kept(self):
+        """Checks that changes made while another process writes its snapshot reach the shared journal."""
+        first, second = self._open_manager(), self._open_manager()
+        first.add_task(Task("ab"))
+        write_temporary = first._write_temporary
+
+        def write_during_change(temporary, tasks):
+            # The store is unlocked while the snapshot is written.
+            second.add_task(Task("cd"))
+            write_temporary(temporary, tasks)
+
+        with mock.patch.object(first, '_write_temporary', write_during_change):
+            self.assertTrue(first.data_persistence())
+        second.add_task(Task("ef"))
+        second.mark_as_complete_by_id(1)
+        expected = [(1, "ab", "Complete"), (2, "cd", "Incomplete"), (3, "ef", "Incomplete")]
+        self.assertEqual([(task._id, task._description, task.status) for task in second.task_list], expected)
+        fresh = self._open_manager()
+        self.assertEqual([(task._id, task._description, task.status) for task in fresh.task_list], expected)
+
+    def test_read_only_batch_neither_blocks_nor_saves(self):
+        """Checks that reads in a batch leave other processes free to change the files and write nothing."""
+        first, second = self._open_manager(), self._open_manager()
+        first.add_task(Task("ab"))
+        snapshot = file_identity(self.filename)
+        with first.batch(), mock.patch('sys.stdout', new_callable=io.StringIO):
+            first.list_tasks()
+            adder = threading.Thread(target=second.add_task, args=(Task("cd"),), daemon=True)
+            adder.start()
+            adder.join(5)
+            self.assertFalse(adder.is_alive())
+            first.refresh()
+            self.assertEqual(first.list_tasks(), 2)
+        self.assertEqual(file_identity(self.filename), snapshot)
+        with first.batch():
+            first.mark_as_complete_by_id(2)
+        self.assertNotEqual(file_identity(self.filename), snapshot)
+        self.assertEqual(os.path.getsize(self.journal_file), 0)
+
+    def test_conflicting_change_is_rejected(self):
+        """Checks that changing a task another process deleted is reported."""
+        first, second = self._open_manager(), self._open_manager()
+        first.add_task(Task("ab"))
+        second.refresh()
+        first.delete_task_by_id(1)
+        with mock.patch('builtins.print') as mocked_print:
+            second.mark_as_complete_by_id(1)
+        mocked_print.assert_called_with("Warning: Invalid Task ID!")
+        self.assertEqual(second.task_list, [])
+
+    def test_snapshot_keeps_other_processes_changes(self):
+        """Checks that saving folds in records written by other processes."""
+        first, second = self._open_manager(), self._open_manager()
+        first.add_task(Task("ab"))
+        second.add_task(Task("cd"))
+        first.data_persistence()
+        self.assertEqual(os.path.getsize(self.journal_file), 0)
+        second.add_task(Task("ef"))
+        self.assertEqual([task._id for task in second.task_list], [1, 2, 3])
+        self.assertEqual([task._description for task in self._open_manager().task_list], ["ab", "cd", "ef"])
+
+    def test_concurrent_processes(self):
+        """Checks that tasks added by several processes at once all survive with unique IDs."""
+        script = (
+            "import sys\n"
+            "from unittest import mock\n"
+            "from simpleToDoList import App, Task\n"
+            "from store_lock import StoreLock\n"
+            "from task_journal import TaskJournal\n"
+            "filename, journal_file, name = sys.argv[1:]\n"
+            "with mock.patch('builtins.print'):\n"
+            "    app = App(filename, TaskJournal(journal_file, 20), store_lock=StoreLock(filename))\n"
+            "for n in range(25):\n"
+            "    task = Task(f'{name} {n}')\n"
+            "    app.task_manager.add_task(task)\n"
+            "    app.task_manager.mark_as_complete_by_id(task._id)\n")
+        directory = os.path.dirname(os.path.abspath(__file__))
+        workers = [subprocess.Popen([sys.executable, '-c', script, self.filename, self.journal_file, str(worker)],
+                                    cwd=directory)
+                   for worker in range(4)]
+        for worker in workers:
+            self.assertEqual(worker.wait(60), 0)
+
+        tasks = self._open_manager().task_list
+        self.assertEqual(sorted(task._id for task in tasks), list(range(1, 101)))
+        self.assertEqual(len({task._description for task in tasks}), 100)
+        self.assertTrue(all(task._complete for task in tasks))
+
+
+class TestTaskServer(unittest.TestCase):
+    """
+    This class verifies the HTTP/JSON service's endpoints.
+    """
+
+    def setUp(self):
+        """Creates a scratch directory and a server over an empty list."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        self.server = TaskServer(TaskManager([], self.filename), Task)
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        shutil.rmtree(self.directory)
+
+    def _call(self, method, target, payload=None):
+        """Dispatches one request and returns (status, payload)."""
+        body = json.dumps(payload).encode() if payload is not None else b''
+        return asyncio.run(self.server.respond(method, target, body))
+
+    def test_task_lifecycle(self):
+        """Adds, lists, completes, searches and deletes a task through the endpoints."""
+        self.assertEqual(self._call('POST', '/tasks', {'description': "buy milk"}),
+                         (HTTPStatus.CREATED, {'id': 1, 'description': "buy milk", 'status': 'Incomplete'}))
+        self._call('POST', '/tasks', {'description': "walk dog"})
+        self.assertEqual(self._call('POST', '/tasks/1/complete')[1]['status'], 'Complete')
+        status, rows = self._call('GET', '/tasks?status=incomplete')
+        self.assertEqual(rows, [{'number': 1, 'id': 2, 'description': "walk dog", 'status': 'Incomplete'}])
+        self.assertEqual([task['id'] for task in self._call('GET', '/search?q=mil*')[1]], [1])
+        self.assertEqual(self._call('DELETE', '/tasks/1')[0], HTTPStatus.OK)
+        self.assertEqual(self._call('GET', '/tasks/1')[0], HTTPStatus.NOT_FOUND)
+        self.assertEqual(self._call('POST', '/save'), (HTTPStatus.OK, {'saved': True}))
+        with open(self.filename) as json_file:
+            self.assertEqual([task['id'] for task in json.load(json_file)], [2])
+
+    def test_handlers_run_off_the_event_loop(self):
+        """Checks that a change runs on the worker thread, so a slow one cannot stall the loop."""
+        threads = []
+        add_task = self.server.task_manager.add_task
+        self.server.task_manager.add_task = lambda task: (threads.append(threading.current_thread()), add_task(task))
+        self._call('POST', '/tasks', {'description': "ab"})
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+        self.assertEqual(self._call('GET', '/tasks/1')[1]['description'], "ab")
+
+    def test_bad_requests(self):
+        """Checks the status codes of malformed or unknown requests."""
+        self.assertEqual(self._call('POST', '/tasks', {'text': "x"})[0], HTTPStatus.BAD_REQUEST)
+        self.assertEqual(asyncio.run(self.server.respond('POST', '/tasks', b'{'))[0], HTTPStatus.BAD_REQUEST)
+        self.assertEqual(self._call('GET', '/tasks?limit=x')[0], HTTPStatus.BAD_REQUEST)
+        self.assertEqual(self._call('GET', '/nowhere')[0], HTTPStatus.NOT_FOUND)
+        self.assertEqual(self._call('PUT', '/tasks')[0], HTTPStatus.METHOD_NOT_ALLOWED)
+        self.assertEqual(self._call('POST', '/tasks/abc/complete')[0], HTTPStatus.NOT_FOUND)
+
+    def test_keep_alive_connection(self):
+        """Sends two requests over one socket and reads both responses."""
+        async def exchange():
+            listening = asyncio.get_running_loop().create_future()
+            serving = asyncio.ensure_future(self.server.serve('127.0.0.1', 0, listening.set_result))
+            port = (await listening).sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            body = b'{"description": "ab"}'
+            writer.write(b"POST /tasks HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+            writer.write(b"GET /tasks HTTP/1.1\r\nConnection: close\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+            serving.cancel()
+            return response
+
+        response = asyncio.run(exchange())
+        self.assertEqual(response.count(b"HTTP/1.1 "), 2)
+        self.assertIn(b"HTTP/1.1 201 Created", response)
+        self.assertTrue(response.endswith(b'[{"number": 0, "id": 1, "description": "ab", "status": "Incomplete"}]'))
+
+
+class TestBulkOperations(unittest.TestCase):
+    """
+    This class verifies completing and deleting many tasks in one call.
+    """
+
+    def setUp(self):
+        """Creates a journaled task list of ten tasks."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        self.journal_file = os.path.join(self.directory, 'To_Do_List.journal')
+        with mock.patch('builtins.print'):
+            self.app = App(self.filename, TaskJournal(self.journal_file))
+        self.manager = self.app.task_manager
+        for i in range(10):
+            self.manager.add_task(Task(f"{'buy' if i % 2 else 'sell'} item {i}"))
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        self.manager.journal.close()
+        shutil.rmtree(self.directory)
+
+    def test_predicates_journal_one_record(self):
+        """Checks that each bulk call is one journal record that replays correctly."""
+        self.assertEqual(self.manager.complete_where(lambda task: task._description.startswith('buy')), 5)
+        self.assertEqual(self.manager.delete_where(lambda task: task._complete), 5)
+        self.assertEqual(self.manager.journal.record_count, 12)
+        self.manager.journal.close()
+
+        with mock.patch('builtins.print'):
+            restarted = App(self.filename, TaskJournal(self.journal_file))
+        self.assertEqual([task._id for task in restarted.tasks], [1, 3, 5, 7, 9])
+        self.assertEqual([task._id for task in restarted.task_manager.search("item")], [1, 3, 5, 7, 9])
+
+    def test_ranges_and_ids(self):
+        """Checks range and ID-set variants, including unknown IDs."""
+        self.assertEqual(self.manager.complete_range(2, 5), 3)
+        self.assertEqual(self.manager.complete_range(3, 6), 1)
+        with mock.patch('builtins.print') as mock_print:
+            self.assertEqual(self.manager.delete_ids([1, 2, 2, 42]), 2)
+        mock_print.assert_called_once_with("Warning: Invalid Task IDs 42!")
+        self.assertEqual(self.manager.delete_range(6), 2)
+        self.assertEqual([(task._id, task._complete) for task in self.manager.task_list],
+                         [(3, True), (4, True), (5, True), (6, True), (7, False), (8, False)])
+
+    def test_selections(self):
+        """Checks the selection syntax used by the menu and batch mode."""
+        with mock.patch('builtins.print') as mock_print:
+            self.app.run_commands(App.parse_command_stream(
+                ["done-where has BUY", "rm-where 0-1", "rm-where complete", "done-where id 3 4", "rm-where 9-x"]))
+        mock_print.assert_any_call("Message: Completed 5 tasks.")
+        mock_print.assert_any_call(
+            "Warning: Invalid selection '9-x'! Use '3-10' (task numbers), 'id 4 7', 'complete', "
+            "'incomplete' or 'has WORDS'.")
+        self.assertEqual([(task._id, task.status) for task in self.manager.task_list],
+                         [(3, 'Complete'), (5, 'Incomplete'), (7, 'Incomplete'), (9, 'Incomplete')])
+
+    def test_sqlite_backend(self):
+        """Checks the bulk calls on the SQLite backend."""
+        manager = SQLiteTaskManager(':memory:')
+        manager.import_tasks(self.manager.task_list)
+        self.assertEqual(manager.complete_where(lambda task: task._id % 2), 5)
+        self.assertEqual(manager.complete_ids([1, 2]), 1)
+        self.assertEqual(manager.delete_range(0, 3), 3)
+        self.assertEqual(manager.delete_where(lambda task: task._complete), 3)
+        self.assertEqual([row[1] for row in manager.iter_task_rows()], [4, 6, 8, 10])
+        manager.close()
+
+
+class TestDueDates(unittest.TestCase):
+    """
+    This class verifies priorities, due dates and the next-up queue.
+    """
+
+    def setUp(self):
+        """Creates a scratch directory and a journaled manager."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        self.journal_file = os.path.join(self.directory, 'To_Do_List.journal')
+        with mock.patch('builtins.print'):
+            self.app = App(self.filename, TaskJournal(self.journal_file))
+        self.manager = self.app.task_manager
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        self.manager.journal.close()
+        shutil.rmtree(self.directory)
+
+    def test_next_due_order_and_invalidation(self):
+        """Checks ordering by due date then priority, and that stale entries are skipped."""
+        for description, due, priority in [("a", "2026-03-01", None), ("b", "2026-01-15", 3),
+                                           ("c", None, 1), ("d", "2026-01-15", 1), ("e", "2026-02-01", None)]:
+            self.manager.add_task(Task(description, priority=priority, due=due))
+        self.assertEqual([task._description for task in self.manager.next_due()], ["d", "b", "e", "a"])
+
+        self.manager.mark_as_complete_by_id(4)
+        self.manager.set_due(1, "2026-01-01")
+        self.manager.delete_task_by_id(5)
+        self.manager.set_priority(2, None)
+        self.assertEqual(self.manager._due_queue.stale, 4)
+        self.assertEqual([task._description for task in self.manager.next_due(2)], ["a", "b"])
+        # Four of six entries were stale, so the queue was rebuilt from the live tasks.
+        self.assertEqual(len(self.manager.due_queue.heap), 2)
+        self.assertEqual([task._description for task in self.manager.overdue(date(2026, 1, 20))], ["a", "b"])
+
+    def test_queue_matches_sorting(self):
+        """Compares the queue with a full sort after many random changes."""
+        rng = random.Random(7)
+        for i in range(300):
+            self.manager.add_task(Task(f"t{i}", priority=rng.choice([None, 1, 2, 3]),
+                                       due=rng.choice([None, "2026-01-0%d" % rng.randint(1, 9)])))
+        self.manager.next_due()
+        with mock.patch('builtins.print'):
+            for _ in range(600):
+                task_id = rng.randint(1, 300)
+                action = rng.randrange(4)
+                if action == 0:
+                    self.manager.mark_as_complete_by_id(task_id)
+                elif action == 1:
+                    self.manager.delete_task_by_id(task_id)
+                elif action == 2:
+                    self.manager.set_due(task_id, "2026-01-0%d" % rng.randint(1, 9))
+                else:
+                    self.manager.set_priority(task_id, rng.choice([None, 1, 2]))
+        expected = sorted((task for task in self.manager.task_list if task._due and not task._complete),
+                          key=lambda task: (task._due, task._priority or float('inf'), task._id))
+        self.assertEqual(self.manager.next_due(50), expected[:50])
+        self.assertLessEqual(len(self.manager.due_queue.heap), 2 * len(expected) + 2)
+
+    def test_fields_survive_restart(self):
+        """Checks that priorities and due dates are journaled and commands parse them."""
+        with mock.patch('builtins.print') as mock_print:
+            self.app.run_commands(App.parse_command_stream(
+                ["add buy milk", "add walk dog", "due 2 2026-05-04", "priority 2 1", "due 1 soon", "next 5"]))
+        mock_print.assert_any_call("Warning: Invalid due arguments '1 soon'!")
+        mock_print.assert_any_call("2026-05-04 | Priority: 1 | walk dog | ID: 2")
+        self.manager.set_due(2, None)
+        self.manager.journal.close()
+
+        with mock.patch('builtins.print'):
+            restarted = App(self.filename, TaskJournal(self.journal_file))
+        self.assertEqual([task.to_dict() for task in restarted.tasks],
+                         [{"id": 1, "description": "buy milk", "status": "Incomplete"},
+                          {"id": 2, "description": "walk dog", "status": "Incomplete", "priority": 1}])
+
+
+class TestArchive(unittest.TestCase):
+    """
+    This class verifies that old completed tasks move to the compressed
+    archive and stay out of the task list.
+    """
+
+    def setUp(self):
+        """Creates a journaled list of four tasks, two completed long ago."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        self.journal_file = os.path.join(self.directory, 'To_Do_List.journal')
+        self.manager = self._open().task_manager
+        for description in ("ab", "cd", "ef", "gh"):
+            self.manager.add_task(Task(description))
+        self.manager.complete_ids([1, 2, 4])
+        long_ago = (date.today() - timedelta(days=90)).isoformat()
+        self.manager.get_task(1)._completed_on = long_ago
+        self.manager.get_task(4)._completed_on = long_ago
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        self.manager.journal.close()
+        shutil.rmtree(self.directory)
+
+    def _open(self):
+        """Opens the scratch files with journaling."""
+        with mock.patch('builtins.print'):
+            return App(self.filename, TaskJournal(self.journal_file))
+
+    def test_archive_on_demand(self):
+        """Archives old completed tasks and checks both lists after a restart."""
+        self.assertEqual(self.manager.archive_completed(30), 2)
+        self.assertEqual([task._id for task in self.manager.task_list], [2, 3])
+        self.manager.journal.close()
+
+        restarted = self._open().task_manager
+        self.manager = restarted
+        self.assertEqual([task._id for task in restarted.task_list], [2, 3])
+        self.assertIsNone(restarted._archived)
+        self.assertEqual([task.to_dict()["description"] for task in restarted.archived_tasks()], ["ab", "gh"])
+        restarted.add_task(Task("ij"))
+        self.assertEqual(restarted.task_list[-1]._id, 5)
+
+    def test_save_moves_old_tasks(self):
+        """Checks that saving archives tasks past the threshold and keeps the rest."""
+        self.manager.data_persistence()
+        with open(self.filename) as json_file:
+            self.assertEqual([task["id"] for task in json.load(json_file)], [2, 3])
+        self.assertEqual(sorted(TaskArchive(self.manager.archive.filename).load()), [1, 4])
+
+    def test_undated_completed_tasks_wait(self):
+        """Checks that tasks completed before dates were kept are dated, not archived."""
+        self.manager.get_task(2)._completed_on = None
+        self.assertEqual(self.manager.archive_completed(1), 2)
+        self.assertEqual(self.manager.get_task(2)._completed_on, TODAY)
+        self.assertEqual(self.manager.archive_completed(0), 1)
+
+    def test_torn_archive_is_readable(self):
+        """Checks that a member cut short by a crash does not hide earlier ones."""
+        self.manager.archive_completed(30)
+        with open(self.manager.archive.filename, 'ab') as archive_file:
+            archive_file.write(b'\x1f\x8b\x08\x00partial')
+        self.assertEqual(sorted(TaskArchive(self.manager.archive.filename).load()), [1, 4])
+
+
+class TestSnapshotCache(unittest.TestCase):
+    """
+    This class verifies that the startup cache replaces parsing only while
+    it matches the task file.
+    """
+
+    def setUp(self):
+        """Saves three tasks, one completed with a due date, which fills the cache."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        manager = TaskManager([], self.filename)
+        for description in ("ab", "cd", "ef"):
+            manager.add_task(Task(description))
+        manager.set_due(2, '2030-01-31')
+        manager.complete_ids([2])
+        manager.data_persistence()
+        self.expected = [task.to_dict() for task in manager.task_list]
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        shutil.rmtree(self.directory)
+
+    def _load(self):
+        """Loads the tasks as a fresh start would, returning their dictionaries."""
+        with mock.patch('builtins.print'):
+            return [task.to_dict() for task in App(self.filename).tasks]
+
+    def test_warm_start_skips_parsing(self):
+        """Checks that a valid cache is used without decoding the JSON file."""
+        self.assertTrue(os.path.exists(SnapshotCache(self.filename).cache_filename))
+        with mock.patch('simpleToDoList.iter_json_array') as parse:
+            self.assertEqual(self._load(), self.expected)
+        parse.assert_not_called()
+
+    def test_edited_file_is_parsed(self):
+        """Checks that an edit keeping size and mtime is still noticed."""
+        stat = os.stat(self.filename)
+        with open(self.filename, 'r') as json_file:
+            text = json_file.read()
+        with open(self.filename, 'w') as json_file:
+            json_file.write(text.replace('"ab"', '"xy"'))
+        os.utime(self.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.expected[0]["description"] = "xy"
+        self.assertEqual(self._load(), self.expected)
+        # The parse refilled the cache for the edited file.
+        self.assertEqual(SnapshotCache(self.filename).load()[0][1], "xy")
+
+    def test_unreadable_cache_is_ignored(self):
+        """Checks that a damaged cache falls back to parsing."""
+        with open(SnapshotCache(self.filename).cache_filename, 'wb') as cache_file:
+            cache_file.write(b'not a pickle')
+        self.assertEqual(self._load(), self.expected)
+
+
+class TestUndo(unittest.TestCase):
+    """
+    This class verifies that changes can be undone and redone, also after
+    a restart, and that the history stays bounded.
+    """
+
+    def setUp(self):
+        """Creates a journaled list of three tasks."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        self.journal_file = os.path.join(self.directory, 'To_Do_List.journal')
+        self.manager = self._open()
+        for description in ("buy milk", "call mom", "pay rent"):
+            self.manager.add_task(Task(description))
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        self.manager.journal.close()
+        shutil.rmtree(self.directory)
+
+    def _open(self):
+        """Opens the scratch files with journaling."""
+        with mock.patch('builtins.print'):
+            return App(self.filename, TaskJournal(self.journal_file)).task_manager
+
+    def _descriptions(self):
+        """Returns the task descriptions in list order."""
+        return [task._description for task in self.manager.task_list]
+
+    def test_undo_delete_restores_task(self):
+        """Checks that an undone delete brings the task back at the end, keeping its ID, searchable."""
+        self.manager.search("call")
+        self.manager.delete_task(1)
+        self.assertTrue(self.manager.undo())
+        self.assertEqual(self._descriptions(), ["buy milk", "pay rent", "call mom"])
+        self.assertEqual([task._id for task in self.manager.task_list], [1, 3, 2])
+        self.assertEqual([task._id for task in self.manager.search("call")], [2])
+        self.assertTrue(self.manager.redo())
+        self.assertEqual(self._descriptions(), ["buy milk", "pay rent"])
+
+    def test_undo_complete_and_update(self):
+        """Checks that completing and rescheduling are taken back in reverse order."""
+        self.manager.set_due(1, '2030-01-01')
+        self.manager.set_due(1, '2030-02-01')
+        self.manager.complete_ids([1, 3])
+        self.manager.undo()
+        self.assertEqual([task.status for task in self.manager.task_list], ["Incomplete"] * 3)
+        self.assertIsNone(self.manager.get_task(1)._completed_on)
+        self.manager.undo()
+        self.assertEqual([task._id for task in self.manager.next_due()], [1])
+        self.assertEqual(self.manager.get_task(1)._due, '2030-01-01')
+        self.manager.redo()
+        self.manager.redo()
+        self.assertEqual(self.manager.get_task(3)._completed_on, TODAY)
+        self.assertEqual(self.manager.next_due(), [])
+
+    def test_new_change_clears_redo(self):
+        """Checks that redo is only offered until something else changes."""
+        self.manager.undo()
+        self.manager.add_task(Task("walk dog"))
+        with mock.patch('builtins.print'):
+            self.assertFalse(self.manager.redo())
+        self.assertEqual(self._descriptions(), ["buy milk", "call mom", "walk dog"])
+
+    def test_history_survives_restart(self):
+        """Checks that the history outlives the process and a save."""
+        self.manager.delete_ids([1, 2])
+        self.manager.data_persistence()
+        self.manager.journal.close()
+        self.manager = self._open()
+        self.assertTrue(self.manager.undo())
+        self.assertEqual(self._descriptions(), ["pay rent", "buy milk", "call mom"])
+        self.manager.journal.close()
+        self.manager = self._open()
+        self.assertEqual(self._descriptions(), ["pay rent", "buy milk", "call mom"])
+        self.assertTrue(self.manager.redo())
+        self.assertEqual(self._descriptions(), ["pay rent"])
+
+    def test_archived_tasks_are_skipped(self):
+        """Checks that undoing a change to tasks archived since changes nothing."""
+        self.manager.complete_ids([1])
+        self.manager.archive_completed(0)
+        with mock.patch('builtins.print') as mock_print:
+            self.assertTrue(self.manager.undo())
+        mock_print.assert_called_once_with(
+            "Message: The tasks that change touched have since been deleted or archived.")
+        self.assertEqual(self._descriptions(), ["call mom", "pay rent"])
+
+    def test_history_is_bounded(self):
+        """Checks that only the latest changes are kept, in memory and on disk."""
+        history = UndoHistory(TaskJournal(os.path.join(self.directory, 'bounded.history')), limit=3)
+        for task_id in range(1, 21):
+            history.record({'op': 'delete', 'ids': [task_id]}, {'op': 'restore', 'tasks': []})
+        self.assertEqual(len(history.undo_stack), 3)
+        self.assertLess(history.journal.record_count, 12)
+        history.undo()
+        reloaded = UndoHistory(TaskJournal(history.journal.filename), limit=3)
+        self.assertEqual([change['ids'] for change, _ in reloaded.undo_stack], [[18], [19]])
+        self.assertEqual(reloaded.redo()['ids'], [20])
+
+    def test_batch_appends_to_the_history(self):
+        """Checks that a batch appends its entries when it ends instead of rewriting the history file."""
+        history = self.manager.history
+        recorded = history.journal.record_count
+        with mock.patch.object(UndoHistory, 'rewrite') as rewrite:
+            with self.manager.batch():
+                self.manager.complete_ids([1])
+                self.manager.delete_ids([2])
+                self.assertEqual(history.journal.record_count, recorded)
+        rewrite.assert_not_called()
+        self.assertEqual(history.journal.record_count, recorded + 2)
+        self.manager.journal.close()
+        self.manager = self._open()
+        self.assertTrue(self.manager.undo())
+        self.assertEqual(self._descriptions(), ["buy milk", "pay rent", "call mom"])
+
+    def test_batch_undo(self):
+        """Checks the undo and redo batch commands."""
+        app = App(self.filename, TaskJournal(self.journal_file))
+        with mock.patch('builtins.print') as mock_print:
+            app.run_commands([('rm', ['1', '2']), ('undo', []), ('redo', ['3'])])
+        mock_print.assert_any_call("Message: Undid 1 change.")
+        mock_print.assert_any_call("Message: Redid 1 change.")
+        app.task_manager.journal.close()
+        self.assertEqual([task._description for task in app.task_manager.task_list], ["pay rent"])
+
+
+class TestImportExport(unittest.TestCase):
+    """
+    This class verifies streaming import and export of tasks as JSON lines
+    and CSV.
+    """
+
+    def setUp(self):
+        """Creates a journaled list with two tasks, one completed with a due date."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        self.journal_file = os.path.join(self.directory, 'To_Do_List.journal')
+        with mock.patch('builtins.print'):
+            self.app = App(self.filename, TaskJournal(self.journal_file))
+        self.manager = self.app.task_manager
+        self.manager.add_task(Task("buy milk", priority=2, due='2030-01-31'))
+        self.manager.add_task(Task("call mom"))
+        self.manager.complete_ids([1])
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        self.manager.journal.close()
+        shutil.rmtree(self.directory)
+
+    def _path(self, name, text=None):
+        """Returns a scratch file path, first writing text to it if given."""
+        path = os.path.join(self.directory, name)
+        if text is not None:
+            with open(path, 'w', newline='') as scratch_file:
+                scratch_file.write(text)
+        return path
+
+    def test_round_trip(self):
+        """Checks that both formats carry every field and imports get new IDs."""
+        for name in ('tasks.jsonl', 'tasks.csv'):
+            with mock.patch('builtins.print'):
+                self.assertEqual(self.app.export_tasks(self._path(name)), 2)
+        with mock.patch('builtins.print'):
+            self.assertEqual(self.app.import_tasks(self._path('tasks.jsonl')), 2)
+            self.assertEqual(self.app.import_tasks(self._path('tasks.csv')), 2)
+        originals = [task.to_dict() for task in self.manager.task_list[:2]]
+        for copy in self.manager.task_list[2:4], self.manager.task_list[4:]:
+            self.assertEqual([{**task.to_dict(), "id": original["id"]} for task, original in zip(copy, originals)],
+                             originals)
+        self.assertEqual([task._id for task in self.manager.task_list], [1, 2, 3, 4, 5, 6])
+
+    def test_bad_rows_and_duplicates(self):
+        """Checks that invalid rows are reported and duplicate descriptions skipped."""
+        path = self._path('new.csv', "description,status,due,extra\n"
+                                     "Buy  MILK,,,\n"
+                                     "walk dog,Complete,2030-02-01,\n"
+                                     ",,,\n"
+                                     "pay rent,,31/01/2030,\n"
+                                     "walk dog,,,\n"
+                                     "feed cat,,,,too many\n")
+        with mock.patch('builtins.print') as mock_print:
+            self.assertEqual(self.app.import_tasks(path, dedupe=True), 1)
+        mock_print.assert_any_call("Warning: Skipping line 4: description is missing.")
+        mock_print.assert_any_call("Warning: Skipping line 7: not a task.")
+        self.assertEqual([task._description for task in self.manager.task_list], ["buy milk", "call mom", "walk dog"])
+        self.assertTrue(self.manager.get_task(3)._complete)
+        self.assertEqual(self.manager.get_task(3)._due, '2030-02-01')
+
+    def test_unknown_format(self):
+        """Checks that a file whose format cannot be told is refused."""
+        with mock.patch('builtins.print') as mock_print:
+            self.assertEqual(self.app.import_tasks(self._path('tasks.txt', "buy milk\n")), 0)
+        self.assertTrue(mock_print.call_args[0][0].startswith("Warning: Cannot import"))
+
+    def test_batches(self):
+        """Checks that tasks are journaled per batch and only one batch is undoable."""
+        with mock.patch('simpleToDoList.ADD_BATCH', 2):
+            self.assertEqual(self.manager.add_tasks(Task(f"task {i}") for i in range(2)), 2)
+            self.manager.undo()
+            self.assertEqual(len(self.manager.task_list), 2)
+            self.manager.journal.close()
+            records = list(self.manager.journal.replay())
+            self.assertEqual(self.manager.add_tasks(Task(f"task {i}") for i in range(5)), 5)
+        self.assertEqual(len(list(self.manager.journal.replay())) - len(records), 3)
+        with mock.patch('builtins.print'):
+            self.assertFalse(self.manager.undo())
+        with mock.patch('builtins.print'):
+            restarted = App(self.filename, TaskJournal(self.journal_file)).task_manager
+        restarted.journal.close()
+        self.assertEqual([task._id for task in restarted.task_list], [1, 2, 5, 6, 7, 8, 9])
+
+    def test_sqlite_backend(self):
+        """Checks import and export through the SQLite backend."""
+        path = self._path('tasks.jsonl', '{"description": "ab"}\n\n{"description": "cd", "status": "Complete"}\n')
+        app = App(task_manager=SQLiteTaskManager(':memory:'))
+        with mock.patch('builtins.print'):
+            self.assertEqual(app.import_tasks(path), 2)
+            app.export_tasks(self._path('out.jsonl'))
+        app.task_manager.close()
+        with open(self._path('out.jsonl')) as export_file:
+            self.assertEqual([json.loads(line) for line in export_file],
+                             [{"id": 1, "description": "ab", "status": "Incomplete"},
+                              {"id": 2, "description": "cd", "status": "Complete"}])
+
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    This class verifies that operations are timed only while instrumented
+    and that the figures export as JSON and Prometheus text.
+    """
+
+    def setUp(self):
+        """Instruments the App and task manager classes for one test."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        self.instrumentation = Instrumentation()
+        self.instrumentation.install(App, TaskManagerInterface, TaskManager, skip=('menu',),
+                                     include=('_write_snapshot', '_save_snapshot'))
+        self.addCleanup(self.instrumentation.uninstall)
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        shutil.rmtree(self.directory)
+
+    def test_operations_are_counted(self):
+        """Checks counts, errors and that only eligible methods are wrapped."""
+        with mock.patch('builtins.print'):
+            app = App(self.filename)
+            for description in ("ab", "cd", "ef"):
+                app.task_manager.add_task(Task(description))
+            app.task_manager.list_tasks()
+            app.task_manager.data_persistence()
+            with self.assertRaises(ValueError):
+                app.task_manager.set_due(1, 'soon')
+        operations = self.instrumentation.to_json()['operations']
+        self.assertEqual(operations['TaskManager.add_task']['count'], 3)
+        self.assertEqual(operations['TaskManagerInterface.list_tasks']['count'], 1)
+        self.assertEqual(operations['App.load_tasks']['count'], 1)
+        self.assertEqual(operations['TaskManager._save_snapshot']['count'], 1)
+        self.assertEqual(operations['TaskManager.set_due']['errors'], 1)
+        for name in ('App.menu', 'TaskManager.iter_task_rows', 'TaskManager.batch', 'TaskManager.write_json'):
+            self.assertNotIn(name, operations)
+        add = operations['TaskManager.add_task']
+        self.assertLessEqual(add['p50_seconds'], add['max_seconds'])
+        self.assertEqual(sum(add['buckets'].values()), 3)
+
+    def test_uninstall_restores_methods(self):
+        """Checks that nothing stays wrapped once instrumentation is removed."""
+        original = TaskManager.add_task.__wrapped__
+        self.instrumentation.uninstall()
+        self.assertIs(TaskManager.add_task, original)
+        TaskManager([], self.filename).add_task(Task("ab"))
+        self.assertEqual(self.instrumentation.to_json()['operations'], {})
+
+    def test_dump_formats(self):
+        """Checks the Prometheus text and JSON files written on exit."""
+        self.instrumentation.observe('TaskManager.add_task', 3e-6)
+        self.instrumentation.observe('TaskManager.add_task', 5e-4, failed=True)
+        prometheus_file = os.path.join(self.directory, 'metrics.prom')
+        json_file = os.path.join(self.directory, 'metrics.json')
+        self.instrumentation.dump(prometheus_file)
+        self.instrumentation.dump(json_file)
+        with open(prometheus_file) as metrics_file:
+            lines = metrics_file.read().splitlines()
+        label = 'operation="TaskManager.add_task"'
+        self.assertIn(f'todo_operation_seconds_bucket{{{label},le="2e-06"}} 0', lines)
+        self.assertIn(f'todo_operation_seconds_bucket{{{label},le="4e-06"}} 1', lines)
+        self.assertIn(f'todo_operation_seconds_bucket{{{label},le="+Inf"}} 2', lines)
+        self.assertIn(f'todo_operation_seconds_count{{{label}}} 2', lines)
+        self.assertIn(f'todo_operation_errors_total{{{label}}} 1', lines)
+        with open(json_file) as metrics_file:
+            figures = json.load(metrics_file)['operations']['TaskManager.add_task']
+        self.assertEqual((figures['count'], figures['errors'], figures['max_seconds']), (2, 1, 5e-4))
+
+
+class TestReplication(unittest.TestCase):
+    """
+    This class verifies that copies of the list exchange only the changes
+    the other lacks and converge to the same tasks.
+    """
+
+    def setUp(self):
+        """Creates replica 'a' of a three-task list and copies it as replica 'b'."""
+        self.directory = tempfile.mkdtemp()
+        first = self._open('a')
+        for description in ("buy milk", "call mom", "pay rent"):
+            first.task_manager.add_task(Task(description))
+        with mock.patch('builtins.print'):
+            first.sync('init', 'a')
+        first.task_manager.journal.close()
+        shutil.copytree(os.path.join(self.directory, 'a'), os.path.join(self.directory, 'b'))
+        self.a = self._open('a').task_manager
+        self.b = self._open('b').task_manager
+        with mock.patch('builtins.print'):
+            App(os.path.join(self.directory, 'b', 'To_Do_List.json'), task_manager=self.b).sync('init', 'b')
+        self.bundle = os.path.join(self.directory, 'bundle.json')
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        for manager in (self.a, self.b):
+            manager.journal.close()
+        shutil.rmtree(self.directory)
+
+    def _open(self, name):
+        """Opens (creating if needed) the copy kept in the named subdirectory."""
+        directory = os.path.join(self.directory, name)
+        os.makedirs(directory, exist_ok=True)
+        with mock.patch('builtins.print'):
+            app = App(os.path.join(directory, 'To_Do_List.json'),
+                      TaskJournal(os.path.join(directory, 'To_Do_List.journal')))
+            app.open_replica()
+        return app
+
+    @staticmethod
+    def _state(manager):
+        """Returns the tasks' replicated fields, independent of local IDs and order."""
+        return sorted((task._description, task.status, task._priority, task._due)
+                      for task in manager.task_list)
+
+    def test_concurrent_changes_converge(self):
+        """Syncs conflicting changes through a file and checks both copies agree."""
+        with mock.patch('builtins.print'):
+            self.a.add_task(Task("walk dog"))
+            self.a.mark_as_complete_by_id(1)
+            self.a.set_priority(3, 1)
+            self.b.add_task(Task("feed cat"))
+            self.b.delete_task_by_id(1)
+            self.b.set_priority(3, 2)
+        self.assertEqual(sync_file(self.a.replica, self.bundle), (0, 3))
+        self.assertEqual(sync_file(self.b.replica, self.bundle), (3, 3))
+        self.assertEqual(sync_file(self.a.replica, self.bundle), (3, 0))
+        self.assertEqual(self._state(self.a), self._state(self.b))
+        # The delete wins over the completion; the priorities tie on the clock, so 'b' wins.
+        self.assertEqual(self._state(self.a), [("call mom", "Incomplete", None, None),
+                                               ("feed cat", "Incomplete", None, None),
+                                               ("pay rent", "Incomplete", 2, None),
+                                               ("walk dog", "Incomplete", None, None)])
+
+    def test_only_missing_operations_are_sent(self):
+        """Checks that a sync sends what the peer lacks, and nothing once in step."""
+        self.a.add_task(Task("walk dog"))
+        self.assertEqual(len(self.a.replica.delta(self.b.replica.vector)), 1)
+        sync_file(self.a.replica, self.bundle)
+        sync_file(self.b.replica, self.bundle)
+        self.assertEqual(self.a.replica.delta(self.b.replica.vector), [])
+        self.assertEqual(self.b.replica.receive(self.a.replica.delta({})), 0)
+        self.b.complete_ids([4])
+        self.assertEqual([operation['op'] for operation in self.b.replica.delta(self.a.replica.vector)],
+                         ['complete'])
+
+    def test_socket_sync_and_restart(self):
+        """Syncs over TCP, then checks a reopened copy keeps its vector and uids."""
+        servers = []
+        started = threading.Event()
+
+        def listening(server):
+            servers.append(server)
+            started.set()
+
+        serving = threading.Thread(target=serve_sync, args=(self.b.replica, '127.0.0.1', 0, listening))
+        serving.start()
+        try:
+            started.wait(5)
+            self.a.add_task(Task("walk dog"))
+            self.b.add_task(Task("feed cat"))
+            self.assertEqual(sync_socket(self.a.replica, '127.0.0.1', servers[0].server_address[1]), (1, 1))
+        finally:
+            servers[0].shutdown()
+            serving.join()
+        self.assertEqual(self._state(self.a), self._state(self.b))
+        vector = dict(self.a.replica.vector)
+        self.a.journal.close()
+        self.a = self._open('a').task_manager
+        self.assertEqual(self.a.replica.vector, vector)
+        self.b.delete_ids([5])
+        sync_file(self.b.replica, self.bundle)
+        sync_file(self.a.replica, self.bundle)
+        self.assertNotIn("walk dog", [task._description for task in self.a.task_list])
+        self.assertEqual(self._state(self.a), self._state(self.b))
+
+
+class TestProjects(unittest.TestCase):
+    """
+    This class verifies that projects live in shards of their own, opened
+    and saved only as needed, and can be queried together.
+    """
+
+    def setUp(self):
+        """Creates a default project and a 'work' project of two tasks each."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        app = self._open('default')
+        with mock.patch('builtins.print'):
+            for description in ("buy milk", "call mom"):
+                app.task_manager.add_task(Task(description))
+            work = app.shard('work')
+            for description in ("write report", "buy paper"):
+                work.add_task(Task(description))
+            app.save_shards()
+        self._close(app)
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        shutil.rmtree(self.directory)
+
+    def _open(self, project):
+        """Opens a project's shard as the app's own."""
+        manifest = ShardManifest(self.filename)
+        manifest.add(project)
+        with mock.patch('builtins.print'):
+            return App(manifest.shard_filename(project), TaskJournal(manifest.journal_filename(project)),
+                       manifest=manifest, project=project)
+
+    @staticmethod
+    def _close(app):
+        """Closes the journals of every shard the app opened."""
+        for manager in [app.task_manager, *app.shards.values()]:
+            manager.journal.close()
+
+    def _printed(self, function, *args):
+        """Returns the non-blank lines a call printed."""
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            function(*args)
+        return [line for line in stdout.getvalue().splitlines() if line]
+
+    def test_only_the_active_shard_is_loaded(self):
+        """Checks that listing projects reads the manifest instead of other shards."""
+        app = self._open('default')
+        self.assertEqual(self._printed(app.list_projects), ["* default | Tasks: 2 | Incomplete: 2",
+                                                            "  work | Tasks: 2 | Incomplete: 2"])
+        self.assertEqual(app.shards, {})
+        self.assertEqual([task._description for task in app.task_manager.task_list], ["buy milk", "call mom"])
+        self._close(app)
+
+    def test_move_saves_only_dirty_shards(self):
+        """Moves a task between two projects and checks a third shard is not rewritten."""
+        app = self._open('default')
+        with mock.patch('builtins.print'):
+            app.shard('home').add_task(Task("water plants"))
+            app.save_shards()
+            home_file = app.manifest.shard_filename('home')
+            before = os.stat(home_file).st_mtime_ns
+            app.move_to_project(1, 'work')
+        self.assertEqual(os.stat(home_file).st_mtime_ns, before)
+        self._close(app)
+        app = self._open('work')
+        self.assertEqual([task._description for task in app.task_manager.task_list],
+                         ["write report", "buy paper", "buy milk"])
+        self.assertEqual(self._printed(app.list_projects)[0], "  default | Tasks: 1 | Incomplete: 1")
+        self._close(app)
+
+    def test_search_across_projects_uses_saved_indexes(self):
+        """Checks that projects without matches are skipped without loading them."""
+        app = self._open('default')
+        self.assertEqual(self._printed(app.search_projects, "buy"),
+                         ["default | buy milk | Status: Incomplete | ID: 1",
+                          "work | buy paper | Status: Incomplete | ID: 2"])
+        self._close(app)
+        app = self._open('default')
+        self.assertEqual(self._printed(app.search_projects, "call"),
+                         ["default | call mom | Status: Incomplete | ID: 2"])
+        self.assertEqual(app.shards, {})
+        self.assertEqual(self._printed(app.search_projects, "report"),
+                         ["work | write report | Status: Incomplete | ID: 1"])
+        self.assertEqual(list(app.shards), ['work'])
+        self._close(app)
+
+    def test_project_names_cannot_clash_with_list_files(self):
+        """Checks that projects named like the list's own files get shards of their own."""
+        app = self._open('default')
+        with mock.patch('builtins.print'):
+            for project in ('projects', 'archive', 'index'):
+                app.shard(project).add_task(Task(f"{project} task"))
+            app.save_shards()
+        self._close(app)
+        manifest = ShardManifest(self.filename)
+        self.assertEqual(manifest.projects(), ['default', 'archive', 'index', 'projects', 'work'])
+        shard_files = {manifest.shard_filename(project) for project in manifest.projects()}
+        self.assertEqual(len(shard_files), 5)
+        self.assertNotIn(manifest.manifest_filename, shard_files)
+        app = self._open('projects')
+        self.assertEqual([task._description for task in app.task_manager.task_list], ["projects task"])
+        self._close(app)
+
+    def test_stale_counts_are_recomputed(self):
+        """Checks that a shard changed behind the manifest's back is counted again."""
+        app = self._open('work')
+        with mock.patch('builtins.print'):
+            app.task_manager.mark_as_complete_by_id(1)
+        self.assertIsNone(app.manifest.counts('work'))
+        self.assertEqual(self._printed(app.list_projects)[1], "* work | Tasks: 2 | Incomplete: 1")
+        self._close(app)
+
+
+class TestSortedViews(unittest.TestCase):
+    """
+    This class verifies that the sorted views stay in order through every
+    kind of change and answer range queries.
+    """
+
+    def test_sorted_key_list_matches_sorted(self):
+        """Adds and removes random keys across many small blocks and compares with sorted()."""
+        chooser = random.Random(3)
+        with mock.patch.object(sorted_views, 'BLOCK_SIZE', 4):
+            keys = SortedKeyList(chooser.sample(range(1000), 50))
+            expected = sorted(keys.irange())
+            for _ in range(500):
+                if expected and chooser.random() < 0.4:
+                    key = chooser.choice(expected)
+                    keys.remove(key)
+                    expected.remove(key)
+                else:
+                    key = chooser.randrange(1000, 2000) + chooser.random()
+                    keys.add(key)
+                    expected.append(key)
+                    expected.sort()
+            self.assertEqual(list(keys.irange()), expected)
+            self.assertEqual(len(keys), len(expected))
+            self.assertEqual(list(keys.irange(1200, 1500)), [key for key in expected if 1200 <= key < 1500])
+            with self.assertRaises(ValueError):
+                keys.remove(-1)
+
+    def test_views_follow_changes(self):
+        """Completes, deletes, undoes and archives tasks, checking each view against a full sort."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with mock.patch('builtins.print'):
+            manager = App(os.path.join(directory, 'To_Do_List.json'),
+                          TaskJournal(os.path.join(directory, 'To_Do_List.journal'))).task_manager
+        self.addCleanup(manager.journal.close)
+        for description in ("pay rent", "Buy milk", "call mom", "buy bread"):
+            manager.add_task(Task(description))
+        manager.sorted_views
+        manager.complete_ids([2, 4])
+        manager.delete_task_by_id(3)
+        manager.add_tasks([Task("Answer mail"), Task("zip files")])
+        manager.undo()
+        manager.mark_as_complete_by_id(1)
+        manager.get_task(1)._completed_on = '2000-01-01'
+        manager.archive_completed(30, date(2000, 3, 1))
+        for view, key in (('description', lambda task: (task._description.casefold(), task._id)),
+                          ('created', lambda task: task._id),
+                          ('status', lambda task: (task._complete, task._id))):
+            self.assertEqual(manager.sorted_tasks(view), sorted(manager.task_list, key=key))
+        self.assertEqual([task._description for task in manager.sorted_tasks('description')],
+                         ["buy bread", "Buy milk"])
+
+    def test_range_queries(self):
+        """Lists descriptions, IDs and statuses between bounds, with a limit."""
+        manager = TaskManager([Task(description) for description in ("pear", "Apple", "fig", "banana", "kiwi")])
+        manager.complete_ids([3])
+        descriptions = lambda tasks: [task._description for task in tasks]
+        self.assertEqual(descriptions(manager.sorted_tasks('description', 'b', 'k')), ["banana", "fig"])
+        self.assertEqual(descriptions(manager.sorted_tasks('description', limit=2)), ["Apple", "banana"])
+        self.assertEqual(descriptions(manager.sorted_tasks('created', 2, 4)), ["Apple", "fig"])
+        self.assertEqual(descriptions(manager.sorted_tasks('status', 'Complete')), ["fig"])
+        self.assertEqual(descriptions(manager.sorted_tasks('status', stop='Complete')),
+                         ["pear", "Apple", "banana", "kiwi"])
+
+
+class TestBatchCommands(unittest.TestCase):
+    """
+    This class verifies the non-interactive command mode.
+    """
+
+    def setUp(self):
+        """Creates a scratch directory holding the task and journal files."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        self.journal_file = os.path.join(self.directory, 'To_Do_List.journal')
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        shutil.rmtree(self.directory)
+
+    def test_command_stream_saves_once(self):
+        """
+        Runs a command stream and checks that the result was saved as one
+        snapshot with nothing left in the journal.
+        """
+        lines = ["# setup", "add buy milk", "add walk dog", "", "add call mum",
+                 "done 2", "rm 1 42", "bogus"]
+        with mock.patch('builtins.print'):
+            app = App(self.filename, TaskJournal(self.journal_file))
+            with mock.patch.object(TaskManager, 'data_persistence', autospec=True,
+                                   side_effect=TaskManager.data_persistence) as save:
+                app.run_commands(App.parse_command_stream(lines))
+            save.assert_called_once()
+            restarted = App(self.filename, TaskJournal(self.journal_file))
+
+        self.assertEqual(os.path.getsize(self.journal_file), 0)
+        self.assertEqual([task.to_dict() for task in restarted.tasks],
+                         [{"id": 2, "description": "walk dog", "status": "Complete", "completed": TODAY},
+                          {"id": 3, "description": "call mum", "status": "Incomplete"}])
+
+    def test_menu_loops_without_recursion(self):
+        """Checks that thousands of menu operations do not hit the recursion limit."""
+        with mock.patch('builtins.print'):
+            app = App(self.filename)
+        options = ['3'] * 5000 + ['6']
+        with mock.patch('builtins.input', side_effect=options), \
+                mock.patch('builtins.print'), self.assertRaises(SystemExit):
+            app.menu()
+        self.assertTrue(os.path.exists(self.filename))
+
+
+class TestListing(unittest.TestCase):
+    """
+    This class verifies paged, filtered task listings.
+    """
+
+    def setUp(self):
+        """Creates a task manager with 50 tasks, every third one complete."""
+        self.manager = TaskManager([Task(f"task {i}") for i in range(50)])
+        for task_id in range(1, 51, 3):
+            self.manager.mark_as_complete_by_id(task_id)
+
+    def test_offset_and_limit(self):
+        """Checks that a page keeps the tasks' list numbers."""
+        self.assertEqual(listing_lines(self.manager, offset=48, limit=5),
+                         ["Task 48: task 48 | Status: Complete | ID: 49",
+                          "Task 49: task 49 | Status: Incomplete | ID: 50"])
+
+    def test_status_filter_with_paging(self):
+        """Checks that offset and limit count only matching tasks."""
+        lines = listing_lines(self.manager, 'Complete', 2, 2)
+        self.assertEqual(lines, ["Task 6: task 6 | Status: Complete | ID: 7",
+                                 "Task 9: task 9 | Status: Complete | ID: 10"])
+        self.assertEqual(len(listing_lines(self.manager, 'Incomplete')), 33)
+
+    def test_listing_is_written_in_chunks(self):
+        """Checks that a listing is not written one task at a time."""
+        with mock.patch('sys.stdout') as stdout:
+            self.manager.list_tasks()
+        self.assertEqual(stdout.write.call_count, 3)
+
+    def test_pager_reads_only_the_pages_shown(self):
+        """Checks that quitting the pager stops pulling rows."""
+        with mock.patch('builtins.print'):
+            app = App(task_manager=self.manager)
+        pulled = []
+        rows = self.manager.iter_task_rows
+
+        def counting_rows(status=None, offset=0, limit=None):
+            for row in rows(status, offset, limit):
+                pulled.append(row)
+                yield row
+
+        with mock.patch.object(self.manager, 'iter_task_rows', counting_rows), \
+                mock.patch('builtins.input', return_value='q'), \
+                mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            app.page_tasks(page_size=10)
+        self.assertEqual(len(pulled), 10)
+        self.assertIn("Task 9: task 9", stdout.getvalue())
+
+    def test_pager_survives_archiving_between_pages(self):
+        """Checks that a save archiving tasks while a page is awaited does not break the pager."""
+        with mock.patch('builtins.print'):
+            app = App(task_manager=self.manager)
+
+        def archive(prompt):
+            self.manager._move_to_archive(0, date.today())
+            return ''
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.manager.archive = TaskArchive(os.path.join(directory, 'To_Do_List.archive.gz'))
+        with mock.patch('builtins.input', side_effect=archive), \
+                mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            app.page_tasks(page_size=10)
+        self.assertIn("Task 0: task 0 | Status: Complete | ID: 1", stdout.getvalue())
+        self.assertIn("ID: 50", stdout.getvalue())
+
+
+class TestSearch(unittest.TestCase):
+    """
+    This class verifies description search and its persisted index.
+    """
+
+    def setUp(self):
+        """Creates a task manager on a scratch file."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.json')
+        descriptions = ["Buy milk", "buy bread and milk", "Call the bank", "bank holiday: buy gifts"]
+        self.manager = TaskManager([Task(d) for d in descriptions], self.filename)
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        shutil.rmtree(self.directory)
+
+    def _search_ids(self, query):
+        """Returns the IDs of the tasks matching a query."""
+        return [task._id for task in self.manager.search(query)]
+
+    def test_multi_term_and_prefix_queries(self):
+        """Checks case-insensitive AND matching and trailing-* prefixes."""
+        self.assertEqual(self._search_ids("buy milk"), [1, 2])
+        self.assertEqual(self._search_ids("BANK"), [3, 4])
+        self.assertEqual(self._search_ids("b* mil*"), [1, 2])
+        self.assertEqual(self._search_ids("hol* gift"), [])
+        self.assertEqual(self._search_ids(""), [])
+
+    def test_index_follows_adds_and_deletes(self):
+        """Checks that the built index is updated incrementally."""
+        self.assertEqual(self._search_ids("milk"), [1, 2])
+        self.manager.delete_task_by_id(1)
+        self.manager.add_task(Task("milk the cow"))
+        self.assertEqual(self._search_ids("milk"), [2, 5])
+        self.assertEqual(self._search_ids("cow*"), [5])
+        self.manager.delete_task_by_id(5)
+        self.assertNotIn("cow", self.manager.search_index.vocabulary)
+
+    def test_saved_index_is_reused_only_while_file_is_unchanged(self):
+        """Checks that a persisted index is loaded for the saved file only."""
+        self.manager.search("milk")
+        self.manager.data_persistence()
+        self.assertTrue(os.path.exists(self.manager.index_filename))
+
+        with mock.patch('builtins.print'):
+            restarted = App(self.filename).task_manager
+        with mock.patch.object(SearchIndex, 'build') as build:
+            self.assertEqual([task._id for task in restarted.search("bread")], [2])
+        build.assert_not_called()
+
+        restarted.add_task(Task("more bread"))
+        restarted.data_persistence()
+        with open(self.filename, 'w') as json_file:
+            json.dump([{"id": 9, "description": "bread", "status": "Incomplete"}], json_file)
+        with mock.patch('builtins.print'):
+            edited = App(self.filename).task_manager
+        self.assertEqual([task._id for task in edited.search("bread")], [9])
+
+
+class TestJsonStream(unittest.TestCase):
+    """
+    This class verifies the incremental JSON array reader.
+    """
+
+    def test_matches_json_load_for_any_chunk_size(self):
+        """Checks that chunk boundaries never change the decoded elements."""
+        data = [{"description": "a, ]b", "status": "Complete"}, [1, [2]], -12.5e-3, 345, None]
+        for text in (json.dumps(data), json.dumps(data, indent=5)):
+            for chunk_size in (1, 2, 3, 7, 4096):
+                self.assertEqual(list(iter_json_array(io.StringIO(text), chunk_size)), data)
+
+    def test_rejects_malformed_input(self):
+        """Checks that empty or truncated files raise JSONDecodeError."""
+        for text in ('', '{}', '[1,', '[1 2]', '[1,]'):
+            with self.assertRaises(json.JSONDecodeError):
+                list(iter_json_array(io.StringIO(text), 2))
+
+    def test_truncated_file_keeps_complete_tasks(self):
+        """Checks that App keeps the tasks decoded before the damage."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        filename = os.path.join(directory, 'To_Do_List.json')
+        with open(filename, 'w') as json_file:
+            json_file.write('[{"id": 4, "description": "ab", "status": "Complete"}, {"desc')
+        with mock.patch('builtins.print'):
+            app = App(filename)
+        self.assertEqual([task.to_dict() for task in app.tasks],
+                         [{"id": 4, "description": "ab", "status": "Complete"}])
+
+
+class TestTaskIds(unittest.TestCase):
+    """
+    This class verifies that tasks keep their IDs across deletions.
+    """
+
+    def setUp(self):
+        """Creates a task manager with three tasks."""
+        self.manager = TaskManager([Task("ab"), Task("cd"), Task("ef")])
+
+    def test_ids_are_assigned_in_order(self):
+        """Checks that tasks loaded without IDs are numbered from 1."""
+        self.assertEqual([task._id for task in self.manager.task_list], [1, 2, 3])
+
+    def test_delete_by_id_keeps_other_ids(self):
+        """Checks that deleting a task does not renumber later tasks."""
+        self.manager.delete_task_by_id(1)
+        self.assertIsNone(self.manager.get_task(1))
+        self.assertEqual(self.manager.get_task(3).to_dict()['description'], "ef")
+        self.assertEqual(self.manager.task_list[0].to_dict()['id'], 2)
+
+    def test_new_tasks_never_reuse_ids(self):
+        """Checks that IDs keep increasing after the newest task is removed."""
+        self.manager.delete_task(-1)
+        self.manager.add_task(Task("gh"))
+        self.assertEqual(self.manager.task_list[-1].to_dict()['id'], 4)
+
+    def test_ids_are_not_reused_after_a_restart(self):
+        """Checks that the highest ID stays taken across reloads, from the journal and then from the snapshot."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        filename = os.path.join(directory, 'To_Do_List.json')
+        journal_file = os.path.join(directory, 'To_Do_List.journal')
+
+        def restart():
+            with mock.patch('builtins.print'):
+                return App(filename, TaskJournal(journal_file)).task_manager
+
+        manager = restart()
+        for description in ("ab", "cd", "ef"):
+            manager.add_task(Task(description))
+        manager.delete_task_by_id(3)
+        manager.journal.close()
+        manager = restart()
+        manager.add_task(Task("gh"))
+        self.assertEqual(manager.task_list[-1]._id, 4)
+
+        manager.delete_task_by_id(4)
+        manager.data_persistence()
+        manager = restart()
+        manager.add_task(Task("ij"))
+        self.assertEqual([task._id for task in manager.task_list], [1, 2, 5])
+
+    def test_tasks_have_no_instance_dict(self):
+        """Checks the compact layout and that status round-trips."""
+        task = Task.from_dict({"description": "ab", "status": "Complete"})
+        self.assertFalse(hasattr(task, '__dict__'))
+        self.assertEqual(task.status, 'Complete')
+        self.assertEqual(Task("cd").to_dict()['status'], 'Incomplete')
+
+    def test_invalid_id(self):
+        """Checks that unknown IDs only print a warning."""
+        with mock.patch('builtins.print') as mock_print:
+            self.manager.mark_as_complete_by_id(42)
+        mock_print.assert_called_once_with("Warning: Invalid Task ID!")
+
+
+class TestBinaryTaskStore(unittest.TestCase):
+    """
+    This class verifies the memory-mapped binary task file.
+    """
+
+    def setUp(self):
+        """Creates a scratch binary store."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'To_Do_List.bin')
+
+    def tearDown(self):
+        """Removes the scratch directory."""
+        shutil.rmtree(self.directory)
+
+    def _reopen(self, manager):
+        """Closes a manager's store and loads it again."""
+        manager.store.close()
+        return BinaryTaskManager(BinaryTaskStore(self.filename))
+
+    def test_changes_survive_restart(self):
+        """Adds, completes and deletes tasks, then reopens the file."""
+        manager = BinaryTaskManager(BinaryTaskStore(self.filename))
+        for description in ("ab", "cd", "éf"):
+            manager.add_task(Task(description))
+        manager.mark_as_complete(2)
+        manager.delete_task(0)
+
+        manager = self._reopen(manager)
+        self.assertEqual([task.to_dict() for task in manager.task_list],
+                         [{"id": 2, "description": "cd", "status": "Incomplete"},
+                          {"id": 3, "description": "éf", "status": "Complete"}])
+        manager.store.close()
+
+    def test_complete_updates_file_in_place(self):
+        """Checks that completing a task does not change the file size."""
+        manager = BinaryTaskManager(BinaryTaskStore(self.filename))
+        manager.add_task(Task("ab"))
+        size = os.path.getsize(self.filename)
+        manager.mark_as_complete(0)
+        self.assertEqual(os.path.getsize(self.filename), size)
+        self.assertEqual(manager.store.read(0)[0], binary_task_store.COMPLETE)
+        manager.store.close()
+
+    def test_offset_table_grows_and_compacts(self):
+        """Checks table relocation and that compaction drops deleted records."""
+        with mock.patch.object(binary_task_store, 'INITIAL_CAPACITY', 2):
+            manager = BinaryTaskManager(BinaryTaskStore(self.filename))
+            for i in range(9):
+                manager.add_task(Task(f"task {i}"))
+            self.assertEqual(manager.store.capacity, 16)
+            for task_id in range(1, 8):
+                manager.delete_task_by_id(task_id)
+
+            # Compaction ran after the fifth delete, leaving 4 slots.
+            self.assertEqual(len(manager.store), 4)
+            manager = self._reopen(manager)
+        self.assertEqual([task._description for task in manager.task_list], ["task 7", "task 8"])
+        manager.store.close()
+
+    def test_descriptions_are_read_on_demand(self):
+        """Checks that opening a store decodes no description and compaction keeps them."""
+        with mock.patch.object(binary_task_store, 'INITIAL_CAPACITY', 2):
+            manager = BinaryTaskManager(BinaryTaskStore(self.filename))
+            for i in range(9):
+                manager.add_task(Task(f"task {i}"))
+            manager.store.close()
+            read = BinaryTaskStore.read
+            slots_read = []
+
+            def counting_read(store, slot):
+                slots_read.append(slot)
+                return read(store, slot)
+
+            with mock.patch.object(BinaryTaskStore, 'read', counting_read):
+                manager = BinaryTaskManager(BinaryTaskStore(self.filename))
+                self.assertEqual(slots_read, [])
+                self.assertEqual(manager.get_task(9)._description, "task 8")
+                self.assertEqual(manager.get_task(9)._description, "task 8")
+                self.assertEqual(slots_read, [8])
+            manager.mark_as_complete_by_id(8)
+            for task_id in range(1, 8):
+                manager.delete_task_by_id(task_id)
+            manager = self._reopen(manager)
+        self.assertEqual([task.to_dict() for task in manager.task_list],
+                         [{"id": 8, "description": "task 7", "status": "Complete"},
+                          {"id": 9, "description": "task 8", "status": "Incomplete"}])
+        manager.store.close()
+
+    def test_sidecars_are_not_shared_with_json_list(self):
+        """Checks that the store keeps its own archive and IDs apart from To_Do_List.json's."""
+        json_manager = TaskManager([], os.path.join(self.directory, 'To_Do_List.json'))
+        json_manager.add_task(Task("ab"))
+        json_manager.mark_as_complete(0)
+        json_manager.archive_completed(0)
+        json_manager.data_persistence()
+        manager = BinaryTaskManager(BinaryTaskStore(self.filename))
+        self.assertEqual(manager.archive.filename, self.filename + '.archive.gz')
+        self.assertEqual(manager.archive.max_id, 0)
+        manager.add_task(Task("cd"))
+        self.assertEqual([task._id for task in manager.task_list], [1])
+        manager.store.close()
+
+    def test_rejects_other_files(self):
+        """Checks that a JSON file is not mistaken for a binary store."""
+        with open(self.filename, 'w') as json_file:
+            json_file.write('[]')
+        with self.assertRaises(ValueError):
+            BinaryTaskStore(self.filename)
+
+
+class TestSQLiteTaskManager(unittest.TestCase):
+    """
+    This class verifies that the SQLite backend behaves like TaskManager.
+    """
+
+    def setUp(self):
+        """Creates an in-memory database with three tasks."""
+        self.manager = SQLiteTaskManager(':memory:')
+        self.manager.import_tasks([Task("ab"), Task("cd"), Task("ef")])
+
+    def tearDown(self):
+        """Closes the database."""
+        self.manager.close()
+
+    def test_complete_and_delete_by_position(self):
+        """Checks that task numbers address rows in insertion order."""
+        self.manager.mark_as_complete(1)
+        self.manager.delete_task(0)
+        printed = listing_lines(self.manager)
+        self.assertEqual(printed, ["Task 0: cd | Status: Complete | ID: 2",
+                                   "Task 1: ef | Status: Incomplete | ID: 3"])
+
+    def test_status_filter_keeps_task_numbers(self):
+        """Checks that filtered listings still show each task's position."""
+        self.manager.mark_as_complete(-1)
+        printed = listing_lines(self.manager, status='Complete')
+        self.assertEqual(printed, ["Task 2: ef | Status: Complete | ID: 3"])
+
+    def test_status_page_reads_the_status_index(self):
+        """Checks that a filtered page keeps task numbers and is read off the (status, id) index."""
+        self.manager.import_tasks([Task(f"task {i}") for i in range(10)])
+        for task_id in range(1, 14, 3):
+            self.manager.mark_as_complete_by_id(task_id)
+        self.manager.delete_task_by_id(4)
+        self.assertEqual(listing_lines(self.manager, 'Complete', 1, 2),
+                         ["Task 5: task 3 | Status: Complete | ID: 7",
+                          "Task 8: task 6 | Status: Complete | ID: 10"])
+        plan = self.manager.connection.execute(
+            "EXPLAIN QUERY PLAN " + SQLiteTaskManager.SELECT_BY_STATUS, ('Complete', 2, 1)).fetchall()
+        self.assertIn("tasks_status_id", " ".join(row[-1] for row in plan))
+
+    def test_invalid_task_number(self):
+        """Checks that out-of-range numbers only print a warning."""
+        with mock.patch('builtins.print') as mock_print:
+            self.manager.delete_task(3)
+        mock_print.assert_called_once_with("Warning: Invalid Task Number!")
+        self.assertEqual(self.manager.count_tasks(), 3)
+
+    def test_search(self):
+        """Checks that searching (menu option 9) scans the rows with the index's rules."""
+        self.manager.add_task(Task("Cd player, ab*"))
+        self.assertEqual([task._id for task in self.manager.search("cd")], [2, 4])
+        self.assertEqual([task._id for task in self.manager.search("c* ab")], [4])
+        self.assertEqual(self.manager.search(""), [])
+        app = App(task_manager=self.manager)
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            app.print_search_results("player")
+        self.assertIn("Cd player, ab* | Status: Incomplete | ID: 4", stdout.getvalue())
+
+    def test_operations_by_id(self):
+        """Checks that row IDs stay valid after earlier rows are deleted."""
+        self.manager.delete_task_by_id(1)
+        self.manager.mark_as_complete_by_id(3)
+        with mock.patch('builtins.print') as mock_print:
+            self.manager.delete_task_by_id(1)
+        mock_print.assert_called_once_with("Warning: Invalid Task ID!")
+        printed = listing_lines(self.manager, status='Complete')
+        self.assertEqual(printed, ["Task 1: ef | Status: Complete | ID: 3"])
+
+
+if __name__ == "__main__":
+    """ main function"""
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Undo/redo history for the To-Do app.
+
+Each change is remembered as two journal records: the change itself and
+its inverse (adding a task is undone by deleting it, deleting tasks by
+restoring them, completing by reopening, a new due date by the old one).
+Undoing applies the inverse and redoing applies the change again, so no
+copy of the task list is ever taken and recording a change is O(1). The
+undo stack keeps the last UNDO_LIMIT changes and redo entries are only
+ever moved over from it, so the history's size is bounded. A change
+touching more than UNDO_MAX_TASKS tasks is not kept; it clears the
+history instead, since older entries no longer describe the list.
+
+The history is appended to a journal file of its own, because the task
+journal is emptied at every save, so it survives restarts. Its records
+are {"action": "do", "change": ..., "inverse": ...}, {"action": "undo"},
+{"action": "redo"} and {"action": "clear"}; replaying them rebuilds both
+stacks. Records made inside a batch are buffered and appended together
+when it ends. Once the file holds several times more records than the
+stacks, it is rewritten with just the current stacks.
+"""
+from collections import deque
+
+UNDO_LIMIT = 100
+UNDO_MAX_TASKS = 10000
+# The history file is rewritten once it holds this many records per kept entry.
+REWRITE_FACTOR = 4
+
+
+def record_size(record):
+    """Returns how many tasks a journal record touches."""
+    return len(record.get('ids') or record.get('tasks') or ()) or 1
+
+
+class UndoHistory:
+    """Bounded undo and redo stacks of (change, inverse) journal records."""
+
+    def __init__(self, journal=None, limit=UNDO_LIMIT):
+        """
+        Initializes the history, replaying any saved one.
+
+        args:
+            journal: optional TaskJournal the history is kept in; without
+                one it lasts only as long as the process.
+            limit: number of changes that can be undone.
+        """
+        self.journal = journal
+        self.limit = limit
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+        # Entries recorded without being written yet (see record()).
+        self.pending = []
+        if journal is not None:
+            for entry in journal.replay():
+                self._apply(entry)
+
+    def _apply(self, entry):
+        """Updates the stacks for one history record."""
+        action = entry.get('action')
+        if action == 'do':
+            self.undo_stack.append((entry['change'], entry['inverse']))
+            self.redo_stack.clear()
+        elif action == 'undo' and self.undo_stack:
+            self.redo_stack.append(self.undo_stack.pop())
+        elif action == 'redo' and self.redo_stack:
+            self.undo_stack.append(self.redo_stack.pop())
+        elif action == 'clear':
+            self.undo_stack.clear()
+            self.redo_stack.clear()
+
+    def _write(self, entry, persist):
+        """Applies a history record and, if persist is set, appends it."""
+        self._apply(entry)
+        if self.journal is None:
+            return
+        if not persist:
+            self.pending.append(entry)
+            return
+        self.journal.append(entry)
+        self._compact_if_due()
+
+    def _compact_if_due(self):
+        """Rewrites the history file once it holds too many records."""
+        if self.journal.record_count >= REWRITE_FACTOR * self.limit:
+            self.rewrite()
+
+    def record(self, change, inverse, persist=True):
+        """
+        Remembers a change and the record that takes it back.
+
+        args:
+            change: the change's journal record.
+            inverse: journal record undoing it.
+            persist: False to leave writing it to a later flush(), e.g.
+                inside a batch.
+        """
+        if max(record_size(change), record_size(inverse)) > UNDO_MAX_TASKS:
+            self.clear(persist)
+        else:
+            self._write({'action': 'do', 'change': change, 'inverse': inverse}, persist)
+
+    def clear(self, persist=True):
+        """Forgets every change, e.g. after one too large to keep."""
+        self._write({'action': 'clear'}, persist)
+
+    def undo(self, persist=True):
+        """Moves the latest change to the redo stack and returns its inverse, or None."""
+        if not self.undo_stack:
+            return None
+        inverse = self.undo_stack[-1][1]
+        self._write({'action': 'undo'}, persist)
+        return inverse
+
+    def redo(self, persist=True):
+        """Moves the latest undone change back and returns it, or None."""
+        if not self.redo_stack:
+            return None
+        change = self.redo_stack[-1][0]
+        self._write({'action': 'redo'}, persist)
+        return change
+
+    def sync(self):
+        """
+        Picks up history records other processes sharing the file appended
+        since this one last read or wrote it.
+        """
+        journal = self.journal
+        if journal is None or journal.size() == journal.position:
+            return
+        if journal.size() < journal.position:
+            # Rewritten by another process: start over from the new file.
+            self.undo_stack.clear()
+            self.redo_stack.clear()
+            start = 0
+        else:
+            start = journal.position
+        for entry in journal.replay(start):
+            self._apply(entry)
+
+    def flush(self):
+        """Appends the entries recorded with persist=False."""
+        if not self.pending:
+            return
+        for entry in self.pending:
+            self.journal.append(entry)
+        self.pending.clear()
+        self._compact_if_due()
+
+    def rewrite(self):
+        """
+        Replaces the history file with records rebuilding just the current
+        stacks: every entry is recorded, then the undone ones are undone
+        again. A crash part way through can only shorten the history.
+        """
+        journal = self.journal
+        journal.reset()
+        undone = list(reversed(self.redo_stack))
+        for change, inverse in [*self.undo_stack, *undone]:
+            journal.append({'action': 'do', 'change': change, 'inverse': inverse})
+        for _ in undone:
+            journal.append({'action': 'undo'})
+        self.pending.clear()
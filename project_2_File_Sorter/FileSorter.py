@@ -41,20 +41,33 @@ class FileSorterApp:
         Helper function to perform a single traversal of the directory.
         It populates the `self.extensions` set and `self.files_to_move` dictionary.
         This fixes the `os.walk` bug by listing all files before any file system changes are made.
+        Only the top level is read (see _scan_top_level_files), so files
+        already sorted into subdirectories cost nothing.
         """
-        for root, subdirs, files in os.walk(self.target_directory):
-            for file_name in files:
-                file_path = os.path.join(root, file_name)
-                # Skip any files that are already inside a sorted subdirectory
-                if root != self.target_directory:
-                    continue
-                
-                # Get the extension and add it to the set
-                extension = os.path.splitext(file_name)[1]
-                self.extensions.add(extension)
-                
-                # Store the file path and its extension for later use
-                self.files_to_move[file_path] = extension
+        for entry in self._scan_top_level_files():
+            # Get the extension and add it to the set
+            extension = os.path.splitext(entry.name)[1]
+            self.extensions.add(extension)
+
+            # Store the file path and its extension for later use
+            self.files_to_move[entry.path] = extension
+
+    def _scan_top_level_files(self):
+        """
+        This function yields a DirEntry for every file directly inside the
+        target directory, as os.walk would have listed them: everything
+        that is not a directory (or a link to one).
+        Entries are streamed from a single os.scandir listing, and the file
+        type it caches in each DirEntry is used, so on most systems nothing
+        is stat'ed and subdirectories are never opened.
+
+        returns:
+            iterator of os.DirEntry objects.
+        """
+        with os.scandir(self.target_directory) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    yield entry
 
     def _create_subdirectories_for_specific_extensions(self):
         """
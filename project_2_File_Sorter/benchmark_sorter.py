@@ -0,0 +1,92 @@
+"""
+Project 2 - C: Benchmark for FileSorter.py
+Project Description: Builds a directory holding a few unsorted files next
+to subdirectories that already contain up to a million sorted files, and
+times how long FileSorterApp takes to find the files it has to move. The
+scan is timed with the old os.walk traversal and with the os.scandir one,
+at each subdirectory size, to show that only the second no longer depends
+on what the subdirectories hold. Run with:
+python benchmark_sorter.py [--files N] [--top-files N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from FileSorter import FileSorterApp
+
+SIZES = (0, 10_000, 100_000, 1_000_000)
+TOP_FILES = 100
+FILES_PER_DIRECTORY = 10_000
+
+
+def create_files(directory, names):
+    """Creates an empty file for each name in directory."""
+    for name in names:
+        open(os.path.join(directory, name), 'w').close()
+
+
+def grow_sorted_files(target, start, stop):
+    """
+    Adds the sorted files numbered start to stop - 1, spread over
+    subdirectories of FILES_PER_DIRECTORY files each, as a finished sort
+    would leave them.
+    """
+    for number in range(start, stop):
+        directory = os.path.join(target, f".ext{number // FILES_PER_DIRECTORY}")
+        if number % FILES_PER_DIRECTORY == 0:
+            os.makedirs(directory, exist_ok=True)
+        open(os.path.join(directory, f"sorted_{number}.ext{number // FILES_PER_DIRECTORY}"), 'w').close()
+
+
+def walk_scan(target):
+    """The previous traversal: os.walk over the whole tree, keeping only top-level files."""
+    files_to_move = {}
+    for root, subdirs, files in os.walk(target):
+        for file_name in files:
+            file_path = os.path.join(root, file_name)
+            if root != target:
+                continue
+            files_to_move[file_path] = os.path.splitext(file_name)[1]
+    return files_to_move
+
+
+def scandir_scan(target):
+    """The os.scandir traversal of FileSorterApp."""
+    app = FileSorterApp(target)
+    app._get_all_files_and_extensions()
+    return app.files_to_move
+
+
+def best_time(scan, target, runs=3):
+    """Returns the fastest of `runs` scans in seconds and the files found."""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        found = scan(target)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, found
+
+
+if __name__ == "__main__":
+    """ main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=SIZES[-1], help="largest number of already sorted files")
+    parser.add_argument('--top-files', type=int, default=TOP_FILES, help="number of files left to sort")
+    args = parser.parse_args()
+
+    sizes = sorted({size for size in SIZES if size < args.files} | {args.files})
+    with tempfile.TemporaryDirectory() as target:
+        create_files(target, (f"unsorted_{number}.txt" for number in range(args.top_files)))
+        created = 0
+        print(f"Finding {args.top_files} unsorted files (best of 3):")
+        print(f"  {'sorted files':>14} {'os.walk':>10} {'os.scandir':>11}")
+        for size in sizes:
+            grow_sorted_files(target, created, size)
+            created = size
+            walk_seconds, walk_found = best_time(walk_scan, target)
+            scandir_seconds, scandir_found = best_time(scandir_scan, target)
+            assert walk_found == scandir_found
+            print(f"  {size:>14,} {walk_seconds * 1000:8.2f} ms {scandir_seconds * 1000:8.2f} ms")
@@ -146,6 +146,26 @@ class MyTest(unittest.TestCase):
         # Assert that the file now exists in the correct destination directory
         self.assertTrue(os.path.exists(no_extension_file_destination), "No-extension file was not moved to the correct directory.")
 
+    def test_sorted_subdirectories_are_not_scanned(self):
+        """
+        This function places a file inside an already sorted
+        subdirectory, then runs only the scan. It checks that just the
+        top-level files are picked up to be moved, and that the file
+        in the subdirectory is left out.
+        """
+        os.makedirs(os.path.join(self.TEST_DIRECTORY, '.txt'))
+        with open(os.path.join(self.TEST_DIRECTORY, '.txt', 'sorted.txt'), 'w') as f:
+            f.write("This file is already sorted.")
+
+        self.app._get_all_files_and_extensions()
+
+        expected_files = {
+            os.path.join(self.TEST_DIRECTORY, 'file.txt'): '.txt',
+            os.path.join(self.TEST_DIRECTORY, 'Photo.jpg'): '.jpg',
+            os.path.join(self.TEST_DIRECTORY, 'no_extension_file'): ''
+        }
+        self.assertEqual(self.app.files_to_move, expected_files)
+
 
 if __name__ == "__main__":
     """ main function"""